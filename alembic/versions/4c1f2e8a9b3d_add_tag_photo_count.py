@@ -0,0 +1,37 @@
+"""add tag photo count
+
+Revision ID: 4c1f2e8a9b3d
+Revises: dab980e7db96
+Create Date: 2025-01-20 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4c1f2e8a9b3d"
+down_revision: Union[str, None] = "dab980e7db96"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tags",
+        sa.Column("photo_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute("""
+        UPDATE tags
+        SET photo_count = (
+            SELECT COUNT(*) FROM photo_tags WHERE photo_tags.tag_id = tags.id
+        )
+        """)
+    op.create_index(op.f("ix_tags_photo_count"), "tags", ["photo_count"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_tags_photo_count"), table_name="tags")
+    op.drop_column("tags", "photo_count")
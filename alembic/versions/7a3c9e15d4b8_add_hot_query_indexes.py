@@ -0,0 +1,81 @@
+"""add hot query indexes
+
+Revision ID: 7a3c9e15d4b8
+Revises: d2f6a8c41b57
+Create Date: 2025-01-27 11:42:08.193527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3c9e15d4b8"
+down_revision: Union[str, None] = "d2f6a8c41b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_photos_created_at_id", "photos", ["created_at", "id"]),
+    ("ix_photos_owner_id_created_at_id", "photos", ["owner_id", "created_at", "id"]),
+    ("ix_comments_photo_id", "comments", ["photo_id"]),
+    ("ix_comments_user_id", "comments", ["user_id"]),
+    ("ix_comments_created_at_id", "comments", ["created_at", "id"]),
+    ("ix_photo_tags_tag_id_photo_id", "photo_tags", ["tag_id", "photo_id"]),
+)
+RATING_CONSTRAINT = "uq_photo_ratings_photo_id_user_id"
+
+
+def upgrade() -> None:
+    # Keep the first rating of each user for a photo, then recount the
+    # aggregates that no longer match the remaining ratings.
+    op.execute("""
+        DELETE FROM photo_ratings
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY photo_id, user_id ORDER BY id
+                ) AS position
+                FROM photo_ratings
+            ) AS ranked
+            WHERE position > 1
+        )
+        """)
+    op.execute("""
+        UPDATE photos
+        SET rating_sum = totals.rating_sum,
+            rating_count = totals.rating_count,
+            rating = ROUND(totals.rating_sum::numeric / totals.rating_count, 2)
+        FROM (
+            SELECT photo_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+            FROM photo_ratings
+            GROUP BY photo_id
+        ) AS totals
+        WHERE photos.id = totals.photo_id
+          AND photos.rating_count <> totals.rating_count
+        """)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way does not block writes to the tables.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+        op.create_index(
+            RATING_CONSTRAINT,
+            "photo_ratings",
+            ["photo_id", "user_id"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.execute(
+            f"ALTER TABLE photo_ratings ADD CONSTRAINT {RATING_CONSTRAINT} "
+            f"UNIQUE USING INDEX {RATING_CONSTRAINT}"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_constraint(RATING_CONSTRAINT, "photo_ratings", type_="unique")
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
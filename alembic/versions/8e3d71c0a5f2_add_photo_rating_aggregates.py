@@ -0,0 +1,51 @@
+"""add photo rating aggregates
+
+Revision ID: 8e3d71c0a5f2
+Revises: 4c1f2e8a9b3d
+Create Date: 2025-01-21 18:40:07.512930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3d71c0a5f2"
+down_revision: Union[str, None] = "4c1f2e8a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "photos",
+        sa.Column("rating_sum", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "photos",
+        sa.Column("rating_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE photos
+        SET rating_sum = totals.rating_sum,
+            rating_count = totals.rating_count,
+            rating = ROUND(totals.rating_sum::numeric / totals.rating_count, 2)
+        FROM (
+            SELECT photo_id,
+                   SUM(rating)::integer AS rating_sum,
+                   COUNT(*) AS rating_count
+            FROM photo_ratings
+            GROUP BY photo_id
+        ) AS totals
+        WHERE totals.photo_id = photos.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("photos", "rating_count")
+    op.drop_column("photos", "rating_sum")
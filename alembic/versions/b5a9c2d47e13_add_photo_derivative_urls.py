@@ -0,0 +1,30 @@
+"""add photo derivative urls
+
+Revision ID: b5a9c2d47e13
+Revises: 8e3d71c0a5f2
+Create Date: 2025-01-23 11:02:45.183604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b5a9c2d47e13"
+down_revision: Union[str, None] = "8e3d71c0a5f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("photos", sa.Column("thumbnail_url", sa.String(255), nullable=True))
+    op.add_column("photos", sa.Column("medium_url", sa.String(255), nullable=True))
+    op.add_column("photos", sa.Column("full_url", sa.String(255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("photos", "full_url")
+    op.drop_column("photos", "medium_url")
+    op.drop_column("photos", "thumbnail_url")
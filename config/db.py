@@ -1,18 +1,372 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+"""
+Database engine and sessions.
+
+The engine is configured from the `db_*` settings:
+
+- Pool: `db_pool_size` connections kept open, up to `db_max_overflow` more
+  under load, `db_pool_timeout_seconds` to wait for a free connection,
+  connections recycled after `db_pool_recycle_seconds` and, with
+  `db_pool_pre_ping`, checked before they are handed out.
+- PostgreSQL (asyncpg): `db_connect_timeout_seconds`, a server-side
+  `statement_timeout` of `db_statement_timeout_ms` and a prepared statement
+  cache of `db_statement_cache_size` per connection (0 disables it, which
+  PgBouncer in transaction mode requires).
+- Logging: `db_echo` logs every statement and is meant for development only.
+  In production, statements slower than `db_slow_query_ms` are logged as
+  warnings and a `db_log_sample_rate` fraction of the others at INFO level,
+  through the `config.db` logger.
+
+Read-only routes depend on `get_read_db` instead of `get_db`. Its sessions go
+to the read replicas listed in `settings.database_replica_urls`, taking turns
+between them. A replica that cannot be reached is skipped for
+`settings.replica_retry_seconds`, and when no replica is available (or none is
+configured) the session goes to the primary. Replicas may lag behind the
+primary, so routes that must see their own writes keep using `get_db`. Routes
+that redirect to a read-only page after a write call `pin_to_primary` on their
+response: for `settings.replica_pin_seconds` its cookie sends the visitor's
+read sessions to the primary, so the page shows what they just wrote.
+Read sessions are `ReadOnlySession`s: they never flush and, on PostgreSQL,
+run their transactions with `SET TRANSACTION READ ONLY`.
+
+A `get_db` session is the unit of work of its request: repositories add and
+flush their changes, and the session commits once after the route returns, or
+rolls back if it raises. Work that must only happen once the changes are
+stored, such as dropping cached pages, is registered with `on_commit`. Code
+that opens its own sessions outside a request commits them itself.
+"""
+
+import logging
+import random
+import time
+from typing import Any, Callable, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Connection, make_url
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction, sessionmaker
 
 from config.general import settings
 
-engine = create_async_engine(settings.database_url, echo=True)
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: str | URL) -> tuple[URL, dict]:
+    """
+    Builds the engine URL and options from the settings.
+
+    Args:
+        url (str | URL): The database URL.
+
+    Returns:
+        tuple[URL, dict]: The URL and the keyword arguments of
+        `create_async_engine`.
+    """
+    url = make_url(url)
+    options = {"echo": settings.db_echo}
+    if url.get_backend_name() == "sqlite":
+        return url, options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+        connect_args = {
+            "timeout": settings.db_connect_timeout_seconds,
+            "statement_cache_size": settings.db_statement_cache_size,
+        }
+        if settings.db_statement_timeout_ms:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.db_statement_timeout_ms)
+            }
+        options["connect_args"] = connect_args
+    return url, options
+
+
+def log_queries(engine: AsyncEngine, slow_ms: float, sample_rate: float) -> None:
+    """
+    Logs the slow statements and a sample of the others run by an engine.
+
+    Args:
+        engine (AsyncEngine): The engine.
+        slow_ms (float): Statements taking at least this many milliseconds are
+            logged as warnings; 0 disables slow query logging.
+        sample_rate (float): The fraction of the other statements logged.
+    """
+    if not slow_ms and not sample_rate:
+        return
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def log_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context.query_start) * 1000
+        if slow_ms and elapsed_ms >= slow_ms:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+        elif sample_rate and random.random() < sample_rate:
+            logger.info("Query (%.1f ms): %s", elapsed_ms, statement)
+
+
+def create_engine(url: str | URL) -> AsyncEngine:
+    """
+    Creates an engine configured from the settings.
+
+    Args:
+        url (str | URL): The database URL.
+
+    Returns:
+        AsyncEngine: The engine.
+    """
+    url, options = engine_options(url)
+    engine = create_async_engine(url, **options)
+    log_queries(engine, settings.db_slow_query_ms, settings.db_log_sample_rate)
+    return engine
+
+
+engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    class_=AsyncSession,
 )
 
 
+class ReadOnlySession(Session):
+    """
+    A session for requests that only read.
+
+    Its transactions are read-only on PostgreSQL, which lets the server skip
+    the bookkeeping of writes, and it skips flushes: changes made to loaded
+    objects are never written. It must not be committed.
+    """
+
+    def flush(self, objects=None) -> None:
+        pass
+
+
+@event.listens_for(ReadOnlySession, "after_begin")
+def _set_transaction_read_only(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+def read_only_sessionmaker(engine: AsyncEngine) -> sessionmaker:
+    """
+    Creates a factory of read-only sessions.
+
+    Args:
+        engine (AsyncEngine): The engine the sessions use.
+
+    Returns:
+        sessionmaker: The factory of `AsyncSession`s backed by `ReadOnlySession`.
+    """
+    return sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=engine,
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+    )
+
+
+ReadSessionLocal = read_only_sessionmaker(engine)
+
+
 class Base(DeclarativeBase):
     pass
 
 
+ON_COMMIT = "on_commit"
+
+
+def on_commit(
+    session: Session | AsyncSession, callback: Callable[..., Any], *args: Any
+) -> None:
+    """
+    Runs a callback once the session's current transaction has committed.
+
+    The callback is dropped if the transaction is rolled back instead, so it
+    never acts on changes that were not stored.
+
+    Args:
+        session (Session | AsyncSession): The session.
+        callback (Callable[..., Any]): The callback.
+        *args (Any): The arguments of the callback.
+    """
+    session.info.setdefault(ON_COMMIT, []).append((callback, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session) -> None:
+    for callback, args in session.info.pop(ON_COMMIT, []):
+        callback(*args)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_on_commit(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(ON_COMMIT, None)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Checks whether an error means the database could not be reached.
+
+    Args:
+        error (Exception): The error.
+
+    Returns:
+        bool: True for network errors and lost or refused connections.
+    """
+    if isinstance(error, (OSError, OperationalError, InterfaceError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class ReplicaSet:
+    """
+    Routes read-only sessions to read replicas.
+
+    Replicas are used in turn. One that fails to connect is marked down and
+    skipped for `retry_after` seconds; if all replicas are down, sessions fall
+    back to the primary.
+
+    Args:
+        urls (Sequence[str]): The replica database URLs.
+        primary (sessionmaker): Creates read-only sessions on the primary.
+        retry_after (float): Seconds before a failed replica is tried again.
+        timer (Callable[[], float]): The clock used for the retry delay.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        primary: sessionmaker,
+        retry_after: float = 30,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.urls = [make_url(url).render_as_string() for url in urls]
+        self.session_factories = [
+            read_only_sessionmaker(create_engine(url)) for url in urls
+        ]
+        self.primary = primary
+        self.retry_after = retry_after
+        self._timer = timer
+        self._down_until = [0.0] * len(urls)
+        self._next = 0
+        self.failures = [0] * len(urls)
+        self.fallbacks = 0
+
+    def candidates(self) -> list[int]:
+        """
+        Returns the replicas to try for the next session, in order.
+
+        Returns:
+            list[int]: The indexes of the healthy replicas, starting with the
+            next one in turn.
+        """
+        count = len(self.session_factories)
+        if not count:
+            return []
+        start, self._next = self._next, (self._next + 1) % count
+        now = self._timer()
+        indexes = [(start + offset) % count for offset in range(count)]
+        return [index for index in indexes if self._down_until[index] <= now]
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        """
+        Takes a replica out of rotation for `retry_after` seconds.
+
+        Args:
+            index (int): The index of the replica.
+            error (Exception): The error that made it unavailable.
+        """
+        self._down_until[index] = self._timer() + self.retry_after
+        self.failures[index] += 1
+        logger.warning("Read replica %s is unavailable: %s", self.urls[index], error)
+
+    async def session(self) -> AsyncSession:
+        """
+        Opens a connected session on a healthy replica, or on the primary.
+
+        Returns:
+            AsyncSession: The session; `info["replica"]` holds the index of
+            its replica and is absent for the primary.
+        """
+        for index in self.candidates():
+            session = self.session_factories[index]()
+            try:
+                await session.connection()
+            except Exception as e:
+                await session.close()
+                if not is_connection_error(e):
+                    raise
+                self.mark_down(index, e)
+                continue
+            session.info["replica"] = index
+            return session
+        if self.session_factories:
+            self.fallbacks += 1
+        return self.primary()
+
+    def report_failure(self, session: AsyncSession, error: Exception) -> None:
+        """
+        Marks the replica of a session down if an error means it is unreachable.
+
+        Args:
+            session (AsyncSession): A session opened by `session`.
+            error (Exception): The error raised while using it.
+        """
+        index = session.info.get("replica")
+        if index is not None and is_connection_error(error):
+            self.mark_down(index, error)
+
+    def stats(self) -> dict:
+        """
+        Returns the state of the replicas.
+
+        Returns:
+            dict: For each replica its URL (without password), whether it is in
+            rotation and its failure count, and the number of sessions that
+            fell back to the primary.
+        """
+        now = self._timer()
+        return {
+            "replicas": [
+                {
+                    "url": url,
+                    "healthy": down_until <= now,
+                    "failures": failures,
+                }
+                for url, down_until, failures in zip(
+                    self.urls, self._down_until, self.failures
+                )
+            ],
+            "fallbacks": self.fallbacks,
+        }
+
+
+read_replicas = ReplicaSet(
+    [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()],
+    ReadSessionLocal,
+    retry_after=settings.replica_retry_seconds,
+)
+
+
 class DatabaseSessionManager:
     def __init__(self, session_factory):
         self.session_factory = session_factory
@@ -28,3 +382,44 @@ class DatabaseSessionManager:
 async def get_db():
     async with DatabaseSessionManager(SessionLocal) as session:
         yield session
+        await session.commit()
+
+
+PRIMARY_PIN_COOKIE = "read_primary"
+
+
+def pin_to_primary(response: Response) -> Response:
+    """
+    Sends the next read sessions of the client to the primary.
+
+    Set on the response of a write, so the page it leads to does not come from
+    a replica that has not caught up with the write yet.
+
+    Args:
+        response (Response): The response of the write.
+
+    Returns:
+        Response: The same response, with the pin cookie set.
+    """
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        "1",
+        max_age=settings.replica_pin_seconds,
+        httponly=True,
+        samesite="lax",
+    )
+    return response
+
+
+async def get_read_db(request: Request):
+    if PRIMARY_PIN_COOKIE in request.cookies:
+        session = read_replicas.primary()
+    else:
+        session = await read_replicas.session()
+    try:
+        yield session
+    except Exception as e:
+        read_replicas.report_failure(session, e)
+        raise
+    finally:
+        await session.close()
@@ -24,6 +24,54 @@ class Settings(BaseSettings):
     cloudinary_api_key: str
     cloudinary_api_secret: str
     sendgrid_api: str
+    database_replica_urls: str = ""
+    replica_retry_seconds: float = 30
+    replica_pin_seconds: int = 10
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_connect_timeout_seconds: float = 10
+    db_statement_timeout_ms: int = 30000
+    db_statement_cache_size: int = 100
+    db_slow_query_ms: float = 500
+    db_log_sample_rate: float = 0.0
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_size: int = 10000
+    upload_max_concurrency: int = 4
+    upload_timeout_seconds: float = 60
+    upload_retries: int = 2
+    upload_max_bytes: int = 10 * 1024 * 1024
+    derivative_workers: int = 2
+    transform_cache_ttl_seconds: int = 3600
+    transform_cache_max_size: int = 1024
+    transform_max_dimension: int = 4000
+    qr_cache_max_size: int = 512
+    job_workers: int = 2
+    job_poll_interval_seconds: float = 1
+    job_lease_seconds: float = 300
+    job_max_attempts: int = 5
+    job_retry_backoff_seconds: float = 5
+    job_shutdown_timeout_seconds: float = 30
+    mail_backend: str = "sendgrid"
+    mail_sender: str = "krutsvitya@gmail.com"
+    mail_max_concurrency: int = 4
+    mail_batch_window_seconds: float = 0.05
+    mail_timeout_seconds: float = 30
+    mail_retries: int = 2
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    fragment_cache_ttl_seconds: int = 600
+    fragment_cache_max_size: int = 4096
+    page_cache_ttl_seconds: int = 10
+    page_cache_max_size: int = 512
+    template_auto_reload: bool = False
+    template_cache_dir: str | None = None
+    storage_backend: str = "cloudinary"
+    media_root: str = "media"
+    media_url: str = "/media"
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
@@ -10,8 +11,32 @@ from src.auth.utils import BANNED_CHECK, ACTIV_AND_BANNED
 from src.photos.routers import photo_router
 from src.user_profile.routers import router as user_router
 from src.web.routers import router as web_router
+from src.utils.cloudinary_helper import cloudinary_client
+from src.utils.uploads import UploadSizeLimitMiddleware
+from src.utils.derivatives import derivative_pool
+from src.utils.jobs import job_worker
+from src.utils.mailer import mailer
+from src.utils.templating import template_env, warm_templates
+from config.general import settings
 
-app = FastAPI()
+# Modules that register job handlers with `job_worker`
+from src.auth import mail_utils  # noqa: F401
+from src.photos import jobs as photo_jobs, qr_codes  # noqa: F401
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_templates(template_env)
+    job_worker.start()
+    yield
+    await job_worker.stop(settings.job_shutdown_timeout_seconds)
+    await mailer.shutdown()
+    derivative_pool.shutdown()
+    cloudinary_client.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(UploadSizeLimitMiddleware)
 
 app.include_router(tag_router, prefix="/tags", tags=["tags"], dependencies=BANNED_CHECK)
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -31,3 +56,9 @@ app.include_router(web_router, prefix="/web", tags=["web"])
 
 static_path = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_path), name="static")
+
+if settings.storage_backend == "local":
+    os.makedirs(settings.media_root, exist_ok=True)
+    app.mount(
+        settings.media_url, StaticFiles(directory=settings.media_root), name="media"
+    )
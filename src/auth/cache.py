@@ -0,0 +1,28 @@
+"""
+Principal cache.
+
+Caches the `Principal` of authenticated users by username so that most
+authenticated requests skip the user lookup entirely. Entries live for
+`settings.principal_cache_ttl_seconds`; any change to the fields of a principal
+(ban state, role, activation, username, email or avatar) must call
+`invalidate_principal` so the current worker stops serving the stale entry.
+"""
+
+from config.general import settings
+from src.utils.cache import TTLCache
+
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+def invalidate_principal(*usernames: str) -> None:
+    """
+    Drops the cached principals of the given users.
+
+    Args:
+        *usernames (str): Usernames whose cached principals are stale.
+    """
+    for username in usernames:
+        principal_cache.pop(username)
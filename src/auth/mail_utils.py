@@ -1,47 +1,36 @@
 """
 Mail Utility Module
-This module provides utility functions for sending emails, specifically for email verification in the authentication
-process. It utilizes the FastAPI Mail library for configuring and sending emails.
+This module sends the emails of the authentication process, such as email verification and password reset.
 Components:
-    - `mail_conf`: Configuration object for FastAPI Mail.
-    - `send_verification`: Function to send an email verification message.
+    - `send_email`: The background job that sends a queued email.
 Dependencies:
-    - FastAPI Mail: A library for sending emails using SMTP.
-    - Settings: Application-specific configuration stored in `config.general`.
+    - `src.utils.mailer`: The shared mailer that delivers the emails.
 Usage:
-    Call `send_verification` with an email address and an email body to send a verification email.
+    Queue a `SEND_EMAIL_JOB` with `src.utils.jobs.enqueue` in the transaction of the change
+    that triggers the email; the job workers send it and retry on failure.
 """
 
-from config.general import settings
+from src.utils.jobs import job_handler
+from src.utils.mailer import EmailMessage, mailer
 
-import sendgrid
-from sendgrid.helpers.mail import Mail, Email, To, Content
+SEND_EMAIL_JOB = "send_email"
+VERIFICATION_SUBJECT = "Please verify your email address"
+RESET_PASSWORD_SUBJECT = "Reset your password"
 
 
-def send_verification_grid(email: str, email_body: str):
+@job_handler(SEND_EMAIL_JOB)
+async def send_email(
+    email: str, email_body: str, subject: str = VERIFICATION_SUBJECT
+) -> None:
     """
-    Sends a verification email to the specified email address using SendGrid.
+    Sends a queued email through the shared mailer.
 
     Args:
         email (str): The recipient's email address.
-        email_body (str): The HTML content of the email to be sent.
+        email_body (str): The HTML content of the email.
+        subject (str): The subject line.
 
     Raises:
-        Exception: If an error occurs while sending the email, the exception details are logged.
-
-    Returns:
-        None
+        Exception: If the email could not be sent; the job is then retried.
     """
-    sg = sendgrid.SendGridAPIClient(settings.sendgrid_api)
-    from_email = Email("krutsvitya@gmail.com")
-    to_email = To(email)
-    subject = "Please verify your email address"
-    content = Content("text/html", email_body)
-
-    mail = Mail(from_email, to_email, subject, content)
-
-    try:
-        response = sg.send(mail)
-        print(f"Email sent to {email}. Response: {response.status_code}")
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
+    await mailer.send(EmailMessage(to=email, subject=subject, html=email_body))
@@ -11,7 +11,7 @@ Components:
 
 Dependencies:
     - Passlib: A library for password hashing and verification.
-    
+
 Usage:
     - Use `get_password_hash` to hash a password before storing it.
     - Use `verify_password` to check if the input password matches the stored hash.
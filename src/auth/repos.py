@@ -19,13 +19,14 @@ Classes:
 from fastapi import UploadFile, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import cloudinary
-import cloudinary.uploader
 
-from config.general import settings
+from config.db import on_commit
 from src.models.models import User, Role
+from src.models.loaders import loader_profile
 from src.auth.pass_utils import get_password_hash
-from src.auth.schemas import UserCreate, RoleEnum
+from src.auth.schemas import UserCreate, RoleEnum, Principal
+from src.auth.cache import invalidate_principal
+from src.utils.storage import storage
 
 
 class UserRepository:
@@ -70,8 +71,7 @@ class UserRepository:
             is_active=False,
         )
         self.session.add(new_user)
-        await self.session.commit()
-        await self.session.refresh(new_user)
+        await self.session.flush()
         return new_user
 
     async def get_user_by_email(self, email: str):
@@ -84,7 +84,7 @@ class UserRepository:
         Returns:
             User or None: The `User` object if found, otherwise `None`.
         """
-        query = select(User).where(User.email == email)
+        query = select(User).options(*loader_profile("auth")).where(User.email == email)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
@@ -98,10 +98,47 @@ class UserRepository:
         Returns:
             User or None: The `User` object if found, otherwise `None`.
         """
-        query = select(User).where(User.username == username)
+        query = (
+            select(User)
+            .options(*loader_profile("auth"))
+            .where(User.username == username)
+        )
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_principal_by_username(self, username: str) -> Principal | None:
+        """
+        Retrieves the authentication principal of a user by their username.
+
+        Selects only the columns needed for authentication and access checks,
+        joined with the role name, in a single query.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            Principal or None: The user's `Principal` if found, otherwise `None`.
+        """
+        query = (
+            select(
+                User.id,
+                User.username,
+                User.email,
+                User.role_id,
+                Role.name.label("role_name"),
+                User.avatar_url,
+                User.is_active,
+                User.is_banned,
+            )
+            .outerjoin(Role, Role.id == User.role_id)
+            .where(User.username == username)
+        )
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return Principal.model_validate(row)
+
     async def get_user_by_id(self, user_id: int):
         """
         Retrieves a user by their unique ID.
@@ -112,7 +149,7 @@ class UserRepository:
         Returns:
             User or None: The `User` object if found, otherwise `None`.
         """
-        query = select(User).where(User.id == user_id)
+        query = select(User).options(*loader_profile("auth")).where(User.id == user_id)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
@@ -129,15 +166,8 @@ class UserRepository:
         Raises:
             HTTPException: If the upload fails.
         """
-        cloudinary.config(
-            cloud_name=settings.cloudinary_cloud_name,
-            api_key=settings.cloudinary_api_key,
-            api_secret=settings.cloudinary_api_secret,
-            secure=True,
-        )
         try:
-            result = cloudinary.uploader.upload(file.file)
-            return result["secure_url"]
+            return await storage.put(file.file)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,8 +188,8 @@ class UserRepository:
         user = await self.get_user_by_email(email)
         user.avatar_url = url
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        on_commit(self.session, invalidate_principal, user.username)
         return user
 
     async def activate_user(self, user: User):
@@ -174,8 +204,8 @@ class UserRepository:
         """
         user.is_active = True
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        on_commit(self.session, invalidate_principal, user.username)
 
     async def update_user_password(self, user: User, hashed_password: str):
         """
@@ -189,7 +219,7 @@ class UserRepository:
             None
         """
         user.hashed_password = hashed_password
-        await self.session.commit()
+        await self.session.flush()
 
 
 class RoleRepository:
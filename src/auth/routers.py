@@ -11,7 +11,6 @@ Dependencies include:
 
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     HTTPException,
     UploadFile,
     status,
@@ -22,13 +21,15 @@ from fastapi import (
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from jinja2 import Environment, FileSystemLoader
 
 from config.db import get_db
 from src.auth.repos import UserRepository
 from src.auth.schemas import UserCreate, UserResponse, Token
-from src.auth.mail_utils import send_verification_grid
+from src.auth.mail_utils import RESET_PASSWORD_SUBJECT, SEND_EMAIL_JOB
 from src.auth.pass_utils import verify_password, get_password_hash
+from src.utils.jobs import enqueue
+from src.utils.templating import template_env
+from src.utils.uploads import ingest_upload
 from src.auth.utils import (
     create_access_token,
     create_refresh_token,
@@ -38,7 +39,6 @@ from src.auth.utils import (
 )
 
 router = APIRouter()
-env = Environment(loader=FileSystemLoader("src/templates"))
 
 
 @router.post(
@@ -47,7 +47,6 @@ env = Environment(loader=FileSystemLoader("src/templates"))
     status_code=status.HTTP_201_CREATED,
 )
 async def register(
-    background_tasks: BackgroundTasks,
     username: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -57,8 +56,9 @@ async def register(
     """
     Register a new user.
 
+    The verification email is queued in the same transaction as the new user.
+
     Args:
-        background_tasks (BackgroundTasks): Background task manager for sending verification email.
         username (str): The username of the new user.
         email (str): The email of the new user.
         password (str): The password of the new user.
@@ -74,18 +74,20 @@ async def register(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Account already register"
         )
+    if avatar:
+        await ingest_upload(avatar)
     user_create = UserCreate(
         username=username, email=email, password=password, avatar=avatar
     )
+    verification_token = create_verification_token(email)
+    verification_link = f"https://desperate-brina-viktor-96af857c.koyeb.app/auth/verify-email?token={verification_token}"
+    template = template_env.get_template("email.html")
+    email_body = template.render(verification_link=verification_link)
+    enqueue(db, SEND_EMAIL_JOB, email=email, email_body=email_body)
     user = await user_repo.create_user(user_create)
     if avatar:
         avatar_url = await user_repo.upload_to_cloudinary(avatar)
         await user_repo.update_avatar(user.email, avatar_url)
-    verification_token = create_verification_token(user.email)
-    verification_link = f"https://desperate-brina-viktor-96af857c.koyeb.app/auth/verify-email?token={verification_token}"
-    template = env.get_template("email.html")
-    email_body = template.render(verification_link=verification_link)
-    background_tasks.add_task(send_verification_grid, user.email, email_body)
     return UserResponse(
         username=user.username,
         email=user.email,
@@ -120,7 +122,6 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
 
 @router.post("/resend-verifi-email", status_code=status.HTTP_200_OK)
 async def resend_verifi_email(
-    background_tasks: BackgroundTasks,
     email: str = Form(...),
     db: AsyncSession = Depends(get_db),
 ):
@@ -128,7 +129,6 @@ async def resend_verifi_email(
     Resend the email verification link to the user.
 
     Args:
-        background_tasks (BackgroundTasks): Background task manager for sending verification email.
         email (str): The email address of the user to resend the verification link to.
         db (AsyncSession): Database session dependency.
 
@@ -144,9 +144,9 @@ async def resend_verifi_email(
         )
     verification_token = create_verification_token(user.email)
     verification_link = f"https://desperate-brina-viktor-96af857c.koyeb.app/auth/verify-email?token={verification_token}"
-    template = env.get_template("email.html")
+    template = template_env.get_template("email.html")
     email_body = template.render(verification_link=verification_link)
-    background_tasks.add_task(send_verification_grid, user.email, email_body)
+    enqueue(db, SEND_EMAIL_JOB, email=user.email, email_body=email_body)
     return {
         "detail": "A new verification email has been sent. Please check your inbox."
     }
@@ -213,15 +213,12 @@ async def refresh_token(
 
 
 @router.get("/forgot-password")
-async def forgot_password(
-    email: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)
-):
+async def forgot_password(email: str, db: AsyncSession = Depends(get_db)):
     """
     Send a password reset email to the user.
 
     Args:
         email (str): The email address of the user requesting the password reset.
-        background_tasks (BackgroundTasks): Background task manager for sending the reset email.
         db (AsyncSession): Database session dependency.
 
     Returns:
@@ -235,9 +232,15 @@ async def forgot_password(
         )
     reset_token = create_verification_token(user.email)
     reset_link = f"https://desperate-brina-viktor-96af857c.koyeb.app/auth/reset-password?token={reset_token}"
-    template = env.get_template("reset_password_email.html")
+    template = template_env.get_template("reset_password_email.html")
     email_body = template.render(reset_link=reset_link)
-    background_tasks.add_task(send_verification_grid, user.email, email_body)
+    enqueue(
+        db,
+        SEND_EMAIL_JOB,
+        email=user.email,
+        email_body=email_body,
+        subject=RESET_PASSWORD_SUBJECT,
+    )
     return {"detail": "Password reset email sent"}
 
 
@@ -259,7 +262,7 @@ async def reset_password_form(token: str):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid or expired token",
             )
-        template = env.get_template("reset_password_form.html")
+        template = template_env.get_template("reset_password_form.html")
         html_content = template.render(token=token)
         return HTMLResponse(content=html_content)
     except Exception as e:
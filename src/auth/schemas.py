@@ -28,6 +28,21 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class Principal(BaseModel):
+    id: int
+    username: str
+    email: str
+    role_id: Optional[int] = None
+    role_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    is_active: bool
+    is_banned: bool
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class TokenData(BaseModel):
     username: str | None = None
 
@@ -3,7 +3,8 @@ This module provides utility functions and dependencies for authentication, toke
 
 It includes:
 - JWT token creation and decoding for verification, access, and refresh tokens.
-- Dependency functions for retrieving and validating the current user.
+- A request-scoped principal dependency: the token is decoded and the user is loaded
+  once per request, and every other auth dependency shares that result.
 - Role-based access control using a RoleChecker dependency.
 - User status checks for active and banned accounts.
 """
@@ -14,9 +15,9 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 
-from src.auth.schemas import TokenData, RoleEnum
+from src.auth.schemas import TokenData, RoleEnum, Principal
 from src.auth.repos import UserRepository
-from src.models.models import User
+from src.auth.cache import principal_cache
 from config.general import settings
 from config.db import get_db
 
@@ -120,18 +121,42 @@ def decode_access_token(token: str) -> TokenData | None:
         return None
 
 
+async def get_principal(db: AsyncSession, username: str) -> Principal | None:
+    """
+    Returns a user's principal, served from the principal cache when possible.
+
+    Args:
+        db (AsyncSession): The database session, used on a cache miss.
+        username (str): The username from the token's `sub` claim.
+
+    Returns:
+        Optional[Principal]: The user's principal, or None if the user does not exist.
+    """
+    principal = principal_cache.get(username)
+    if principal is None:
+        principal = await UserRepository(db).get_principal_by_username(username)
+        if principal is not None:
+            principal_cache.set(username, principal)
+    return principal
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
-    Retrieves the current user based on the access token.
+    Retrieves the principal of the current user based on the access token.
+
+    This is the single request-scoped auth dependency: FastAPI caches its result
+    per request, so `RoleChecker`, `check_user_active`, `check_user_banned` and
+    the handlers that depend on it share one token decode and at most one user
+    query, which is skipped entirely while the principal is cached.
 
     Args:
         token (str): The access token.
         db (AsyncSession): The database session.
 
     Returns:
-        User: The current authenticated user.
+        Principal: The current authenticated user's principal.
 
     Raises:
         HTTPException: If the token is invalid or the user does not exist.
@@ -144,19 +169,20 @@ async def get_current_user(
     token_data = decode_access_token(token)
     if token_data is None:
         raise credentials_exception
-    user_repo = UserRepository(db)
-    user = await user_repo.get_user_by_username(token_data.username)
+    user = await get_principal(db, token_data.username)
     if user is None:
         raise credentials_exception
     return user
 
 
-async def check_user_active(current_user: User = Depends(get_current_user)) -> None:
+async def check_user_active(
+    current_user: Principal = Depends(get_current_user),
+) -> None:
     """
     Checks if the current user's account is active.
 
     Args:
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated user.
 
     Raises:
         HTTPException: If the user account is not active.
@@ -168,12 +194,12 @@ async def check_user_active(current_user: User = Depends(get_current_user)) -> N
         )
 
 
-async def check_user_banned(user: User = Depends(get_current_user)) -> None:
+async def check_user_banned(user: Principal = Depends(get_current_user)) -> None:
     """
     Checks if the current user's account is banned.
 
     Args:
-        user (User): The currently authenticated user.
+        user (Principal): The currently authenticated user.
 
     Raises:
         HTTPException: If the user account is banned.
@@ -197,27 +223,26 @@ class RoleChecker:
         self.allowed_roles = allowed_roles
 
     async def __call__(
-        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-    ) -> User:
+        self, user: Principal = Depends(get_current_user)
+    ) -> tuple[Principal, bool]:
         """
         Checks if the user has the required role to access a resource.
 
         Args:
-            token (str): The access token.
-            db (AsyncSession): The database session.
+            user (Principal): The currently authenticated user.
 
         Returns:
-            User: The current authenticated user.
+            tuple[Principal, bool]: The current authenticated user and whether
+            they are an admin or a moderator.
 
         Raises:
             HTTPException: If the user does not have the required role.
         """
-        user = await get_current_user(token, db)
-        is_admin_or_moderator = user.role.name in [
+        is_admin_or_moderator = user.role_name in [
             RoleEnum.ADMIN.value,
             RoleEnum.MODERATOR.value,
         ]
-        if user.role.name not in [role.value for role in self.allowed_roles]:
+        if user.role_name not in [role.value for role in self.allowed_roles]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to perform this action",
@@ -1,9 +1,12 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.db import on_commit
 from src.comments.schemas import CommentResponse
+from src.models.loaders import row_select
 from src.models.models import Comment
+from src.web.cache import invalidate_pages
 
 
 class CommentsRepository:
@@ -35,34 +38,35 @@ class CommentsRepository:
         """
         new_comment = Comment(user_id=user_id, photo_id=photo_id, content=content)
         self.session.add(new_comment)
-        await self.session.commit()
-        await self.session.refresh(new_comment)
+        await self.session.flush()
+        on_commit(self.session, invalidate_pages)
         return new_comment
 
-    async def get_comments_by_user(self, user_id: int):
+    async def get_comments_by_user(self, user_id: int, rows: bool = False):
         """
         Retrieves all comments made by a specific user.
 
         :param user_id: The ID of the user whose comments are to be retrieved.
+        :param rows: Return plain rows instead of Comment objects, for read-only use.
         :return: A list of Comment objects.
         """
-        query = select(Comment).where(Comment.user_id == user_id)
-        comments = await self.session.execute(query)
-        return comments.scalars().all()
+        query = row_select(Comment) if rows else select(Comment)
+        comments = await self.session.execute(query.where(Comment.user_id == user_id))
+        return comments.all() if rows else comments.scalars().all()
 
     async def get_comments_by_photo(
-        self, photo_id: int
-    ) -> list[Comment:CommentResponse]:
+        self, photo_id: int, rows: bool = False
+    ) -> list[Comment | Row]:
         """
         Retrieves all comments associated with a specific photo.
 
         :param photo_id: The ID of the photo whose comments are to be retrieved.
+        :param rows: Return plain rows instead of Comment objects, for read-only use.
         :return: A list of Comment objects.
         """
-        result = await self.session.execute(
-            select(Comment).where(Comment.photo_id == photo_id)
-        )
-        return result.scalars().all()
+        query = row_select(Comment) if rows else select(Comment)
+        result = await self.session.execute(query.where(Comment.photo_id == photo_id))
+        return result.all() if rows else result.scalars().all()
 
     async def update_comment(
         self, comment_id: int, user_id: int, content: str
@@ -91,8 +95,8 @@ class CommentsRepository:
         import datetime
 
         comment.updated_at = datetime.datetime.now(datetime.timezone.utc)
-        await self.session.commit()
-        await self.session.refresh(comment)
+        await self.session.flush()
+        on_commit(self.session, invalidate_pages)
         return comment
 
     async def delete_comment(self, comment_id: int) -> None:
@@ -108,7 +112,8 @@ class CommentsRepository:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
             )
         await self.session.delete(comment)
-        await self.session.commit()
+        await self.session.flush()
+        on_commit(self.session, invalidate_pages)
 
     async def get_comment_by_id(self, comment_id: int) -> Comment | None:
         """
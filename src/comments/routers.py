@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.db import get_db
+from config.db import get_db, get_read_db
 from src.auth.utils import get_current_user, FORALL, FORMODER
 from src.comments.repos import CommentsRepository
 from src.comments.schemas import CommentResponse, CommentCreate
-from src.models.models import User
+from src.auth.schemas import Principal
 
 router = APIRouter()
 
@@ -18,7 +18,7 @@ router = APIRouter()
 )
 async def create_comment(
     comment: CommentCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -35,7 +35,7 @@ async def create_comment(
 
 @router.get("/user/", response_model=list[CommentResponse], dependencies=FORALL)
 async def get_user_comments(
-    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)
 ):
     """
     Retrieves all comments created by the current authenticated user.
@@ -45,7 +45,7 @@ async def get_user_comments(
     :return: A list of comments made by the user.
     """
     comment_repo = CommentsRepository(db)
-    return await comment_repo.get_comments_by_user(user.id)
+    return await comment_repo.get_comments_by_user(user.id, rows=True)
 
 
 @router.get(
@@ -53,8 +53,8 @@ async def get_user_comments(
 )
 async def get_photo_comments(
     photo_id: int,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Retrieves all comments associated with a specific photo.
@@ -65,7 +65,7 @@ async def get_photo_comments(
     :return: A list of comments for the specified photo.
     """
     comment_repo = CommentsRepository(db)
-    return await comment_repo.get_comments_by_photo(photo_id)
+    return await comment_repo.get_comments_by_photo(photo_id, rows=True)
 
 
 @router.get(
@@ -73,7 +73,7 @@ async def get_photo_comments(
     response_model=list[CommentResponse],
     dependencies=FORMODER,
 )
-async def get_comments_by_user(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_comments_by_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Retrieves all comments made by a specific user.
 
@@ -82,14 +82,14 @@ async def get_comments_by_user(user_id: int, db: AsyncSession = Depends(get_db))
     :return: A list of comments made by the specified user.
     """
     comment_repo = CommentsRepository(db)
-    return await comment_repo.get_comments_by_user(user_id)
+    return await comment_repo.get_comments_by_user(user.id, rows=True)
 
 
 @router.put("/{comment_id}/", response_model=CommentResponse, dependencies=FORALL)
 async def update_comment(
     comment_id: int,
     content: str,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -112,7 +112,7 @@ async def update_comment(
 )
 async def delete_own_comment(
     comment_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -0,0 +1,82 @@
+"""
+Relationship loader profiles.
+
+Every relationship on the models is declared with ``lazy="raise"``, so nothing
+is loaded behind a query's back: touching a relationship that was not asked for
+raises instead of silently cascading into more SELECTs. Repositories opt into
+one of the named profiles below, which describe exactly which relationships a
+use case needs.
+
+Profiles:
+    - `auth`: a user with their role, for authentication and role checks.
+    - `photo_summary`: a photo with its tags, as serialized by `PhotoResponse`.
+    - `photo_tile`: a photo with its owner, for thumbnail tiles.
+    - `photo_card`: a photo with its owner, tags and comments (with authors),
+      as rendered by the card grids in the web templates.
+    - `photo_detail`: everything the single photo page renders.
+    - `tag_listing`: plain tags without their photos.
+    - `comment_feed`: comments with their authors.
+
+Usage:
+    select(Photo).options(*loader_profile("photo_card"))
+
+Listings that need no relationships can skip the ORM instead and select plain
+rows with `row_select`, which the session does not track.
+"""
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import selectinload
+
+from src.models.models import User, Photo, Comment
+
+_PHOTO_CARD = (
+    selectinload(Photo.owner),
+    selectinload(Photo.tags),
+    selectinload(Photo.comments).selectinload(Comment.user),
+)
+
+LOADER_PROFILES = {
+    "auth": (selectinload(User.role),),
+    "photo_summary": (selectinload(Photo.tags),),
+    "photo_tile": (selectinload(Photo.owner),),
+    "photo_card": _PHOTO_CARD,
+    "photo_detail": _PHOTO_CARD,
+    "tag_listing": (),
+    "comment_feed": (selectinload(Comment.user),),
+}
+
+
+def loader_profile(name: str) -> tuple:
+    """
+    Returns the loader options of a named profile.
+
+    Args:
+        name (str): The profile name, one of `LOADER_PROFILES`.
+
+    Returns:
+        tuple: Loader options to pass to `Select.options()` or `Session.get()`.
+
+    Raises:
+        ValueError: If the profile is not defined.
+    """
+    try:
+        return LOADER_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown loader profile: {name}")
+
+
+def row_select(model) -> Select:
+    """
+    Selects all columns of a model as plain rows.
+
+    Rows are not added to the session's identity map and carry no change
+    tracking, but expose the columns as attributes, so response schemas with
+    `from_attributes` and templates accept them like instances.
+
+    Args:
+        model: The mapped class.
+
+    Returns:
+        Select: The query; read its result with `Result.all()`.
+    """
+    return select(*model.__table__.columns)
@@ -2,6 +2,7 @@ from datetime import datetime, date
 
 from sqlalchemy import (
     Integer,
+    Float,
     String,
     Boolean,
     func,
@@ -12,6 +13,9 @@ from sqlalchemy import (
     Column,
     Text,
     Date,
+    JSON,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -35,7 +39,9 @@ class Role(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
-    users: Mapped[list["User"]] = relationship("User", back_populates="role")
+    users: Mapped[list["User"]] = relationship(
+        "User", back_populates="role", lazy="raise"
+    )
 
 
 """
@@ -46,12 +52,16 @@ Represents a many-to-many relationship between Photos and Tags.
 Columns:
     photo_id (int): Foreign key referencing the ID of the Photo.
     tag_id (int): Foreign key referencing the ID of the Tag.
+
+The primary key leads with `photo_id`; `ix_photo_tags_tag_id_photo_id` serves
+the lookups by tag.
 """
 photo_tags = Table(
     "photo_tags",
     Base.metadata,
     Column("photo_id", ForeignKey("photos.id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_photo_tags_tag_id_photo_id", "tag_id", "photo_id"),
 )
 
 
@@ -82,6 +92,9 @@ class User(Base):
     """
 
     __tablename__ = "users"
+    # Fetch the `updated_at` set by an UPDATE in the same statement, so a
+    # flushed row can be used without reloading it.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     username: Mapped[str] = mapped_column(
@@ -108,12 +121,12 @@ class User(Base):
         onupdate=text("CURRENT_TIMESTAMP"),
     )
 
-    role: Mapped["Role"] = relationship("Role", back_populates="users", lazy="selectin")
+    role: Mapped["Role"] = relationship("Role", back_populates="users", lazy="raise")
     photos: Mapped[list["Photo"]] = relationship(
-        "Photo", back_populates="owner", lazy="selectin"
+        "Photo", back_populates="owner", lazy="raise"
     )
     comments: Mapped[list["Comment"]] = relationship(
-        "Comment", back_populates="user", lazy="selectin"
+        "Comment", back_populates="user", lazy="raise"
     )
 
 
@@ -125,9 +138,15 @@ class Photo(Base):
 
     Attributes:
         id (int): The unique identifier of the photo.
-        url_link (str): The URL of the photo.
+        url_link (str): The URL of the original photo.
+        thumbnail_url (str | None): The URL of the card-sized derivative.
+        medium_url (str | None): The URL of the medium-sized derivative.
+        full_url (str | None): The URL of the web-optimized full-size derivative.
         description (str | None): The description of the photo (optional).
-        rating (int | None): The rating of the photo (optional).
+        rating (float | None): The average rating of the photo, derived from
+            `rating_sum` and `rating_count` (None until the photo is rated).
+        rating_sum (int): The sum of all ratings given to the photo.
+        rating_count (int): The number of ratings given to the photo.
         qr_core_url (str | None): The QR code URL for the photo (optional).
         owner_id (int): The user ID of the photo's owner.
         created_at (datetime): The timestamp when the photo was created.
@@ -138,11 +157,25 @@ class Photo(Base):
     """
 
     __tablename__ = "photos"
+    # Listings are ordered newest first by (created_at, id), overall or by owner.
+    __table_args__ = (
+        Index("ix_photos_created_at_id", "created_at", "id"),
+        Index("ix_photos_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     url_link: Mapped[str] = mapped_column(String(255), nullable=False)
+    thumbnail_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    medium_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    full_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
-    rating: Mapped[int] = mapped_column(Integer, nullable=True)
+    rating: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rating_sum: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    rating_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     qr_core_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     created_at: Mapped["datetime"] = mapped_column(
@@ -150,19 +183,17 @@ class Photo(Base):
     )
 
     # Відношення з User
-    owner: Mapped["User"] = relationship(
-        "User", back_populates="photos", lazy="selectin"
-    )
+    owner: Mapped["User"] = relationship("User", back_populates="photos", lazy="raise")
     # Відношення з Comment
     comments: Mapped[list["Comment"]] = relationship(
-        "Comment", back_populates="photo", lazy="selectin"
+        "Comment", back_populates="photo", lazy="raise"
     )
     # Відношення з Tag через проміжну таблицю
     tags: Mapped[list["Tag"]] = relationship(
-        "Tag", secondary=photo_tags, back_populates="photos", lazy="selectin"
+        "Tag", secondary=photo_tags, back_populates="photos", lazy="raise"
     )
     ratings: Mapped[list["PhotoRating"]] = relationship(
-        "PhotoRating", back_populates="photo", lazy="selectin"
+        "PhotoRating", back_populates="photo", lazy="raise"
     )
 
 
@@ -184,11 +215,18 @@ class Comment(Base):
     """
 
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_created_at_id", "created_at", "id"),)
+    # See `User`.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     content: Mapped[str] = mapped_column(String, nullable=False)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    photo_id: Mapped[int] = mapped_column(ForeignKey("photos.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
+    photo_id: Mapped[int] = mapped_column(
+        ForeignKey("photos.id"), nullable=False, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=text("CURRENT_TIMESTAMP")
     )
@@ -198,8 +236,8 @@ class Comment(Base):
         onupdate=text("CURRENT_TIMESTAMP"),
     )
 
-    user: Mapped["User"] = relationship("User", lazy="selectin")
-    photo: Mapped["Photo"] = relationship("Photo", lazy="selectin")
+    user: Mapped["User"] = relationship("User", lazy="raise")
+    photo: Mapped["Photo"] = relationship("Photo", lazy="raise")
 
 
 class Tag(Base):
@@ -211,6 +249,8 @@ class Tag(Base):
     Attributes:
         id (int): The unique identifier of the tag.
         name (str): The unique name of the tag.
+        photo_count (int): The number of photos carrying the tag, maintained
+            whenever `photo_tags` rows are added or removed.
         photos (list[Photo]): A many-to-many relationship with the Photo model via the photo_tags table.
     """
 
@@ -218,10 +258,13 @@ class Tag(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    photo_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", index=True
+    )
 
     # Відношення з Photo через проміжну таблицю
     photos: Mapped[list["Photo"]] = relationship(
-        "Photo", secondary=photo_tags, back_populates="tags", lazy="selectin"
+        "Photo", secondary=photo_tags, back_populates="tags", lazy="raise"
     )
 
 
@@ -241,6 +284,11 @@ class PhotoRating(Base):
     """
 
     __tablename__ = "photo_ratings"
+    __table_args__ = (
+        UniqueConstraint(
+            "photo_id", "user_id", name="uq_photo_ratings_photo_id_user_id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     photo_id: Mapped[int] = mapped_column(
@@ -253,7 +301,52 @@ class PhotoRating(Base):
 
     # Відношення з Photo
     photo: Mapped["Photo"] = relationship(
-        "Photo", back_populates="ratings", lazy="selectin"
+        "Photo", back_populates="ratings", lazy="raise"
     )
     # Відношення з User
-    user: Mapped["User"] = relationship("User", lazy="selectin")
+    user: Mapped["User"] = relationship("User", lazy="raise")
+
+
+class Job(Base):
+    """
+    Job Model.
+
+    Represents a unit of deferred work in the outbox. Jobs are written in the
+    same transaction as the change that needs them and run by the job workers.
+
+    Attributes:
+        id (int): The unique identifier of the job.
+        name (str): The name of the handler that runs the job.
+        payload (dict): The keyword arguments of the handler.
+        status (str): "pending", "running" or "failed"; finished jobs are
+            deleted.
+        attempts (int): The number of times the job has been started.
+        run_at (datetime): The time from which the job may run.
+        locked_until (datetime | None): When the lease of the worker running
+            the job expires.
+        last_error (str | None): The error of the last failed attempt.
+        created_at (datetime): The timestamp when the job was created.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="pending", server_default="pending"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    run_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
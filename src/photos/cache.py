@@ -0,0 +1,84 @@
+"""
+Photo transform and QR code caches.
+
+`transform_cache` maps a photo and normalized transformation to the original
+and transformed URLs, so repeated hits on a shared link skip the photo lookup
+and the storage transform. Transformed URLs are deterministic, so entries only
+go stale when the photo is deleted, which must call `invalidate_transforms`.
+Entries also expire after `settings.transform_cache_ttl_seconds`, which bounds
+how long other workers keep serving transforms of a deleted photo.
+
+`qr_cache` holds rendered QR codes under a hash of what they encode and how
+they are rendered. Such an entry never goes stale; it only leaves the cache
+through eviction.
+"""
+
+import hashlib
+
+from config.general import settings
+from src.utils.cache import TTLCache
+
+transform_cache = TTLCache(
+    maxsize=settings.transform_cache_max_size,
+    ttl=settings.transform_cache_ttl_seconds,
+)
+
+qr_cache = TTLCache(maxsize=settings.qr_cache_max_size)
+
+
+def normalize_transformation(**transformation) -> dict:
+    """
+    Drops unset parameters and normalizes the spelling of the others.
+
+    Args:
+        **transformation: The transformation parameters.
+
+    Returns:
+        dict: The set parameters sorted by name, with string values stripped
+        and lowercased.
+    """
+    return {
+        name: value.strip().lower() if isinstance(value, str) else value
+        for name, value in sorted(transformation.items())
+        if value is not None
+    }
+
+
+def transform_key(photo_id: int, transformation: dict) -> tuple:
+    """
+    Builds the cache key of a transform.
+
+    Args:
+        photo_id (int): The ID of the photo.
+        transformation (dict): A normalized transformation.
+
+    Returns:
+        tuple: The cache key.
+    """
+    return photo_id, tuple(transformation.items())
+
+
+def invalidate_transforms(*photo_ids: int) -> None:
+    """
+    Drops the cached transforms of the given photos.
+
+    Args:
+        *photo_ids (int): IDs of photos whose transforms are stale.
+    """
+    stale = set(photo_ids)
+    transform_cache.discard_where(lambda key: key[0] in stale)
+
+
+def qr_code_key(url: str, image_format: str, size: int | None) -> str:
+    """
+    Builds the content address of a QR code.
+
+    Args:
+        url (str): The encoded URL.
+        image_format (str): The image format.
+        size (int | None): The requested size.
+
+    Returns:
+        str: The cache key.
+    """
+    return hashlib.sha256(f"{image_format}|{size}|{url}".encode()).hexdigest()
@@ -0,0 +1,71 @@
+"""
+Background jobs of photos.
+
+The jobs are queued in the transaction that creates or deletes a photo (see
+`src.utils.jobs`):
+
+- `create_qr_code` (in `src.photos.qr_codes`) stores the QR code of a new photo.
+- `create_photo_derivatives` renders the thumbnail, medium and full-size
+  versions of a new photo; pages show the original until they exist.
+- `delete_photo_files` removes the stored files of a deleted photo that no
+  other photo uses.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import PurePosixPath
+from urllib.parse import urlparse
+
+from config.db import DatabaseSessionManager, SessionLocal
+from src.photos.repos import DELETE_FILES_JOB, DERIVATIVES_JOB, PhotoRepository
+from src.utils.derivatives import create_derivatives
+from src.utils.jobs import job_handler
+from src.utils.storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler(DERIVATIVES_JOB)
+async def create_photo_derivatives(photo_id: int, photo_url: str) -> None:
+    """
+    Renders the derivatives of a photo and stores their URLs on the photo.
+
+    The original is spooled to a temporary file for the render workers to
+    read. The derivatives are named after the stored original, which is named
+    after its content hash.
+
+    Args:
+        photo_id (int): The ID of the photo.
+        photo_url (str): The URL of the original.
+    """
+    path = PurePosixPath(urlparse(photo_url).path)
+    fd, original = tempfile.mkstemp(suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            await storage.download(photo_url, file)
+        derivatives = await create_derivatives(original, path.stem)
+    finally:
+        await asyncio.to_thread(os.unlink, original)
+    if derivatives:
+        async with DatabaseSessionManager(SessionLocal) as session:
+            await PhotoRepository(session).set_derivative_urls(photo_id, derivatives)
+            await session.commit()
+
+
+@job_handler(DELETE_FILES_JOB)
+async def delete_photo_files(urls: list[str]) -> None:
+    """
+    Deletes the stored files of a deleted photo that no other photo uses.
+
+    Args:
+        urls (list[str]): The file URLs of the deleted photo.
+    """
+    async with DatabaseSessionManager(SessionLocal) as session:
+        in_use = await PhotoRepository(session).get_file_urls_in_use(urls)
+    for url in set(urls) - in_use:
+        try:
+            await storage.delete(url)
+        except ValueError:
+            logger.warning("Not deleting %s: not stored by this backend", url)
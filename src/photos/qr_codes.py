@@ -0,0 +1,105 @@
+"""
+QR codes of photos.
+
+Every photo gets a QR code of its URL, stored in `Photo.qr_core_url`. Uploads
+only queue the `create_qr_code` job with the new photo, so the response does
+not wait for the code to be rendered and uploaded. Photos left without a code,
+e.g. because they predate the job or it failed for good, are filled in by the
+backfill:
+
+    python -m src.photos.qr_codes --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+
+from config.db import DatabaseSessionManager, SessionLocal
+from config.general import settings
+from src.photos.repos import PhotoRepository, QR_BACKFILL_BATCH_SIZE, QR_CODE_JOB
+from src.utils.jobs import job_handler
+from src.utils.qr_code_helper import generate_qr_code
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler(QR_CODE_JOB)
+async def create_qr_code(photo_id: int, photo_url: str) -> None:
+    """
+    Generates the QR code of a photo and stores its URL on the photo.
+
+    Args:
+        photo_id (int): The ID of the photo.
+        photo_url (str): The URL of the photo.
+    """
+    qr_code_url = await generate_qr_code(photo_url)
+    async with DatabaseSessionManager(SessionLocal) as session:
+        await PhotoRepository(session).set_qr_code_urls({photo_id: qr_code_url})
+        await session.commit()
+
+
+async def backfill_qr_codes(
+    concurrency: int = settings.upload_max_concurrency,
+    batch_size: int = QR_BACKFILL_BATCH_SIZE,
+) -> int:
+    """
+    Generates the QR codes of all photos that do not have one.
+
+    Photos are processed in batches in ID order; within a batch at most
+    `concurrency` codes are generated at once, and the batch is stored with one
+    UPDATE. Photos whose code fails are skipped and left for the next run.
+
+    Args:
+        concurrency (int): The maximum number of codes generated at once.
+        batch_size (int): The number of photos loaded per batch.
+
+    Returns:
+        int: The number of photos that got a QR code.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate(photo_url: str) -> str:
+        async with semaphore:
+            return await generate_qr_code(photo_url)
+
+    filled = 0
+    after_id = 0
+    async with DatabaseSessionManager(SessionLocal) as session:
+        photo_repo = PhotoRepository(session)
+        while photos := await photo_repo.get_photos_without_qr_code(
+            after_id, batch_size
+        ):
+            results = await asyncio.gather(
+                *(generate(photo_url) for _, photo_url in photos),
+                return_exceptions=True,
+            )
+            qr_code_urls = {}
+            for (photo_id, _), result in zip(photos, results):
+                if isinstance(result, Exception):
+                    logger.warning("QR code of photo %s failed: %s", photo_id, result)
+                else:
+                    qr_code_urls[photo_id] = result
+            await photo_repo.set_qr_code_urls(qr_code_urls)
+            await session.commit()
+            filled += len(qr_code_urls)
+            after_id = photos[-1][0]
+            logger.info("Generated %d QR codes", filled)
+    return filled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate the QR codes of photos that do not have one."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.upload_max_concurrency
+    )
+    parser.add_argument("--batch-size", type=int, default=QR_BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    filled = asyncio.run(backfill_qr_codes(args.concurrency, args.batch_size))
+    print(f"Generated {filled} QR codes")
+
+
+if __name__ == "__main__":
+    main()
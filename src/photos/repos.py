@@ -1,13 +1,47 @@
-from sqlalchemy import insert, func
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Numeric, Update, cast, func, or_, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
+from config.db import on_commit
 from src.models.models import Photo, photo_tags, User, PhotoRating
+from src.models.loaders import loader_profile, row_select
+from src.photos.cache import invalidate_transforms
+from src.web.fragments import invalidate_fragments
+from src.web.cache import invalidate_pages
 from src.tags.repos import TagRepository
+from src.utils.jobs import enqueue
+from src.utils.pagination import Page, paginate_keyset
 
 MAX_TAGS_COUNT = 5
+PHOTOS_PAGE_SIZE = 20
+MAX_PHOTOS_PAGE_SIZE = 100
+QR_BACKFILL_BATCH_SIZE = 100
+QR_CODE_JOB = "create_qr_code"
+DERIVATIVES_JOB = "create_photo_derivatives"
+DELETE_FILES_JOB = "delete_photo_files"
+PHOTO_FILE_COLUMNS = (
+    "url_link",
+    "thumbnail_url",
+    "medium_url",
+    "full_url",
+    "qr_core_url",
+)
+
+
+def photo_file_urls(photo: Photo) -> list[str]:
+    """
+    List the URLs of the stored files of a photo.
+
+    Args:
+        photo (Photo): The photo.
+
+    Returns:
+        list[str]: The URLs of the original, its derivatives and its QR code.
+    """
+    return [url for column in PHOTO_FILE_COLUMNS if (url := getattr(photo, column))]
 
 
 class PhotoRepository:
@@ -21,11 +55,18 @@ class PhotoRepository:
         self.session = session
 
     async def create_photo(
-        self, url_link: str, description: str, user: User, tags: list
+        self,
+        url_link: str,
+        description: str,
+        user: User,
+        tags: list,
     ) -> Photo:
         """
         Create a new photo with optional tags.
 
+        The jobs that create the photo's QR code and derivatives are queued in
+        the same transaction, which the caller commits.
+
         Args:
             url_link (str): The URL of the photo.
             description (str): Description of the photo.
@@ -39,61 +80,183 @@ class PhotoRepository:
             HTTPException: If more than 5 tags are provided or an SQL error occurs.
         """
         try:
-
             new_photo = Photo(
-                url_link=url_link, description=description, owner_id=user.id
+                url_link=url_link,
+                description=description,
+                owner_id=user.id,
             )
             self.session.add(new_photo)
-            await self.session.commit()  # Отримуємо ID фото
-            await self.session.refresh(new_photo)
-            if len(tags) > 5:
+            await self.session.flush()  # Отримуємо ID фото
+            if len(tags) > MAX_TAGS_COUNT:
                 print("You can add only 5 tags, tags 6 and above will be ignored")
 
-            tags = tags[:MAX_TAGS_COUNT]
-            tag_repo = TagRepository(self.session)
-            tag_ids = []
+            await self.add_tags(new_photo.id, tags[:MAX_TAGS_COUNT])
+            self.enqueue_photo_jobs(new_photo.id, url_link)
+            await self.session.flush()
+            on_commit(self.session, invalidate_pages)
+            await self.session.refresh(new_photo, attribute_names=["tags"])
+            return new_photo
 
-            for tag_name in tags:
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise e
 
-                tag = await tag_repo.create_tag(tag_name)
-                tag_ids.append(tag.id)
+    def enqueue_photo_jobs(self, photo_id: int, photo_url: str) -> None:
+        """
+        Queue the jobs that complete a new photo, without committing.
 
-            if tag_ids:
-                for tag_id in tag_ids:
+        Args:
+            photo_id (int): The ID of the photo.
+            photo_url (str): The URL of the photo.
+        """
+        enqueue(self.session, QR_CODE_JOB, photo_id=photo_id, photo_url=photo_url)
+        enqueue(self.session, DERIVATIVES_JOB, photo_id=photo_id, photo_url=photo_url)
 
-                    await self.session.refresh(new_photo)
-                    existing_relation = await self.session.execute(
-                        select(photo_tags).filter_by(
-                            photo_id=new_photo.id, tag_id=tag_id
-                        )
-                    )
-                    if not existing_relation.scalar():
-                        stmt = insert(photo_tags).values(
-                            photo_id=new_photo.id, tag_id=tag_id
-                        )
-                        await self.session.execute(stmt)
+    async def add_tags(self, photo_id: int, tag_names: list[str]) -> list[int]:
+        """
+        Attach tags to a photo, creating the tags that do not exist yet.
 
-            await self.session.commit()
-            await self.session.refresh(new_photo)
-            return new_photo
+        Tags are upserted in bulk, the links are written with one multi-row
+        INSERT and the photo counters of newly linked tags are updated, all
+        without committing, so the caller can store the photo and its tags in a
+        single transaction.
 
-        except SQLAlchemyError as e:
-            await self.session.rollback()
-            raise e
+        Args:
+            photo_id (int): The ID of the photo.
+            tag_names (list[str]): The tag names; blank and duplicate names are skipped.
 
-    async def get_photo_by_id(self, photo_id: int) -> Photo:
+        Returns:
+            list[int]: The IDs of the attached tags.
+        """
+        tag_names = [tag_name.strip() for tag_name in tag_names if tag_name.strip()]
+        tag_repo = TagRepository(self.session)
+        tag_ids = await tag_repo.upsert_tags(tag_names)
+        if not tag_ids:
+            return []
+
+        linked = await self.session.execute(
+            insert(photo_tags)
+            .values([{"photo_id": photo_id, "tag_id": tag_id} for tag_id in tag_ids])
+            .on_conflict_do_nothing()
+            .returning(photo_tags.c.tag_id)
+        )
+        await tag_repo.adjust_photo_counts(linked.scalars().all(), 1)
+        return tag_ids
+
+    async def get_photo_by_id(
+        self, photo_id: int, profile: str = "photo_summary"
+    ) -> Photo:
         """
         Retrieve a photo by its ID.
 
         Args:
             photo_id (int): The ID of the photo.
+            profile (str): The loader profile for the photo's relationships.
 
         Returns:
             Photo: The photo object if found, else None.
         """
-        result = await self.session.execute(select(Photo).filter(Photo.id == photo_id))
+        result = await self.session.execute(
+            select(Photo).options(*loader_profile(profile)).filter(Photo.id == photo_id)
+        )
         return result.scalar_one_or_none()
 
+    async def get_photo_url(self, photo_id: int) -> str | None:
+        """
+        Retrieve the URL of a photo without loading the photo itself.
+
+        Args:
+            photo_id (int): The ID of the photo.
+
+        Returns:
+            str | None: The URL of the photo, or None if it does not exist.
+        """
+        return await self.session.scalar(
+            select(Photo.url_link).where(Photo.id == photo_id)
+        )
+
+    async def get_photos_without_qr_code(
+        self, after_id: int = 0, limit: int = QR_BACKFILL_BATCH_SIZE
+    ) -> list[tuple[int, str]]:
+        """
+        Retrieve the next photos that have no QR code yet, in ID order.
+
+        Args:
+            after_id (int): Only return photos with a greater ID.
+            limit (int): The maximum number of photos to return.
+
+        Returns:
+            list[tuple[int, str]]: The IDs and URLs of the photos.
+        """
+        result = await self.session.execute(
+            select(Photo.id, Photo.url_link)
+            .where(Photo.qr_core_url.is_(None), Photo.id > after_id)
+            .order_by(Photo.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def set_qr_code_urls(self, qr_code_urls: dict[int, str]) -> None:
+        """
+        Store the QR code URLs of photos with a single bulk UPDATE.
+
+        Args:
+            qr_code_urls (dict[int, str]): The QR code URLs by photo ID.
+        """
+        if not qr_code_urls:
+            return
+        try:
+            await self.session.execute(
+                update(Photo),
+                [
+                    {"id": photo_id, "qr_core_url": url}
+                    for photo_id, url in qr_code_urls.items()
+                ],
+            )
+            on_commit(self.session, invalidate_pages)
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise e
+
+    async def set_derivative_urls(
+        self, photo_id: int, derivatives: dict[str, str]
+    ) -> None:
+        """
+        Store the derivative URLs of a photo.
+
+        Args:
+            photo_id (int): The ID of the photo.
+            derivatives (dict[str, str]): The derivative URLs by column name, as
+                returned by `create_derivatives`.
+        """
+        try:
+            await self.session.execute(
+                update(Photo).where(Photo.id == photo_id).values(**derivatives)
+            )
+            on_commit(self.session, invalidate_pages)
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise e
+
+    async def get_file_urls_in_use(self, urls: list[str]) -> set[str]:
+        """
+        Find which of the given file URLs are still referenced by a photo.
+
+        Files are stored under their content hash, so several photos can share
+        one file.
+
+        Args:
+            urls (list[str]): File URLs of photos, QR codes or derivatives.
+
+        Returns:
+            set[str]: The URLs that some photo still references.
+        """
+        columns = [getattr(Photo, column) for column in PHOTO_FILE_COLUMNS]
+        result = await self.session.execute(
+            select(*columns).where(or_(*(column.in_(urls) for column in columns)))
+        )
+        return {url for row in result.all() for url in row} & set(urls)
+
     async def update_photo_description(
         self, photo_id: int, description: str, user_id: int
     ) -> Photo:
@@ -111,13 +274,16 @@ class PhotoRepository:
         Raises:
             HTTPException: If the photo does not exist or the user is not the owner.
         """
-        photo = await self.session.get(Photo, photo_id)
+        photo = await self.session.get(
+            Photo, photo_id, options=loader_profile("photo_summary")
+        )
 
         if photo is None:
             return None
         photo.description = description
-        await self.session.commit()
-        await self.session.refresh(photo)
+        await self.session.flush()
+        on_commit(self.session, invalidate_fragments, photo_id)
+        on_commit(self.session, invalidate_pages)
         return photo
 
     async def delete_photo(self, photo_id: int):
@@ -140,28 +306,83 @@ class PhotoRepository:
             photo = query.scalars().first()
             if not photo:
                 return None
+            enqueue(self.session, DELETE_FILES_JOB, urls=photo_file_urls(photo))
+            tag_ids = await self.session.scalars(
+                select(photo_tags.c.tag_id).where(photo_tags.c.photo_id == photo_id)
+            )
+            await TagRepository(self.session).adjust_photo_counts(tag_ids.all(), -1)
             await self.session.delete(photo)
-            await self.session.commit()
+            await self.session.flush()
+            on_commit(self.session, invalidate_transforms, photo_id)
+            on_commit(self.session, invalidate_fragments, photo_id)
+            on_commit(self.session, invalidate_pages)
             return "Deleted"
         except SQLAlchemyError as e:
             await self.session.rollback()
             raise e
 
-    async def get_users_all_photos(self, user: User):
-        query = select(Photo).where(Photo.owner_id == user.id)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+    async def get_photos_page(
+        self,
+        cursor: str | None = None,
+        limit: int = PHOTOS_PAGE_SIZE,
+        owner_id: int | None = None,
+        tag_id: int | None = None,
+        profile: str = "photo_summary",
+    ) -> Page:
+        """
+        Retrieve one page of photos, newest first, using keyset pagination.
+
+        Args:
+            cursor (str | None): A cursor from a previous page, or None for the first page.
+            limit (int): The page size.
+            owner_id (int | None): Only return photos owned by this user.
+            tag_id (int | None): Only return photos with this tag.
+            profile (str): The loader profile for the photos' relationships.
+
+        Returns:
+            Page: The photos with cursors to the next and previous pages.
+        """
+        query = select(Photo).options(*loader_profile(profile))
+        if owner_id is not None:
+            query = query.where(Photo.owner_id == owner_id)
+        if tag_id is not None:
+            query = query.join(photo_tags, photo_tags.c.photo_id == Photo.id).where(
+                photo_tags.c.tag_id == tag_id
+            )
+        return await paginate_keyset(self.session, query, Photo, cursor, limit)
 
-    async def get_all_photos(self):
+    async def count_photos(
+        self, owner_id: int | None = None, approximate: bool = False
+    ) -> int:
         """
-        Retrieve all photos in the database.
+        Count photos, optionally only those owned by a user.
+
+        With `approximate=True` the total over all photos is read from the
+        PostgreSQL planner statistics instead of scanning the table.
+
+        Args:
+            owner_id (int | None): Only count photos owned by this user.
+            approximate (bool): Allow an estimate for the unfiltered total.
 
         Returns:
-            list[Photo]: A list of all photos in the database.
+            int: The number of photos.
         """
-        query = select(Photo)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        if (
+            approximate
+            and owner_id is None
+            and self.session.bind.dialect.name == "postgresql"
+        ):
+            estimate = await self.session.scalar(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'photos'::regclass"
+                )
+            )
+            if estimate is not None and estimate >= 0:
+                return estimate
+        query = select(func.count(Photo.id))
+        if owner_id is not None:
+            query = query.where(Photo.owner_id == owner_id)
+        return await self.session.scalar(query)
 
 
 class PhotoRatingRepository:
@@ -174,9 +395,45 @@ class PhotoRatingRepository:
         """
         self.session = session
 
+    @staticmethod
+    def _apply_rating_delta(photo_id: int, rating: int, count: int) -> Update:
+        """
+        Build an UPDATE that adjusts a photo's rating aggregates in place.
+
+        The sum, count and derived average are computed from the row's current
+        values inside a single statement, so concurrent votes cannot overwrite
+        each other and no aggregate over `photo_ratings` is needed.
+
+        Args:
+            photo_id (int): The ID of the photo.
+            rating (int): The amount to add to `rating_sum`.
+            count (int): The amount to add to `rating_count`.
+
+        Returns:
+            Update: The UPDATE statement.
+        """
+        rating_sum = Photo.rating_sum + rating
+        rating_count = Photo.rating_count + count
+        return (
+            update(Photo)
+            .where(Photo.id == photo_id)
+            .values(
+                rating_sum=rating_sum,
+                rating_count=rating_count,
+                rating=func.round(
+                    cast(rating_sum, Numeric) / func.nullif(rating_count, 0), 2
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
     async def update_average_rating(self, photo_id: int) -> None:
         """
-        Update the average rating for a photo.
+        Recalculate a photo's rating aggregates from all of its ratings.
+
+        Votes keep the aggregates up to date incrementally; this full recount is
+        only needed to repair them after ratings were changed outside the
+        repository.
 
         Args:
             photo_id (int): The ID of the photo to update.
@@ -184,24 +441,36 @@ class PhotoRatingRepository:
         Raises:
             SQLAlchemyError: If an error occurs during the update.
         """
-        # Calculate the average rating for a photo
-        avg_rating = await self.session.scalar(
-            select(func.avg(PhotoRating.rating)).where(PhotoRating.photo_id == photo_id)
+        rating_sum, rating_count = (
+            await self.session.execute(
+                select(
+                    func.coalesce(func.sum(PhotoRating.rating), 0),
+                    func.count(PhotoRating.id),
+                ).where(PhotoRating.photo_id == photo_id)
+            )
+        ).one()
+        await self.session.execute(
+            update(Photo)
+            .where(Photo.id == photo_id)
+            .values(
+                rating_sum=rating_sum,
+                rating_count=rating_count,
+                rating=(
+                    round(float(rating_sum) / rating_count, 2) if rating_count else None
+                ),
+            )
+            .execution_options(synchronize_session=False)
         )
 
-        # Оновлюємо поле average_rating в фото
-        if avg_rating is not None:
-            avg_rating = round(float(avg_rating), 2)
-            photo = await self.session.scalar(select(Photo).where(Photo.id == photo_id))
-            photo.rating = avg_rating
-            await self.session.commit()
-
     async def add_and_update_rating(
         self, photo_id: int, user_id: int, rating: int
     ) -> None:
         """
         Add a rating to a photo and update the average rating.
 
+        The rating row and the photo's aggregates are written in the caller's
+        transaction.
+
         Args:
             photo_id (int): The ID of the photo.
             user_id (int): The ID of the user providing the rating.
@@ -212,18 +481,20 @@ class PhotoRatingRepository:
         """
         # Check if the rating already exists
         existing_rating = await self.session.scalar(
-            select(PhotoRating).where(
+            select(PhotoRating.id).where(
                 PhotoRating.photo_id == photo_id, PhotoRating.user_id == user_id
             )
         )
         if existing_rating:
             raise HTTPException(status_code=400, detail="Rating already exists")
-        else:
-            new_rating = PhotoRating(photo_id=photo_id, user_id=user_id, rating=rating)
-            self.session.add(new_rating)
 
-        await self.session.commit()
-        await self.update_average_rating(photo_id)
+        self.session.add(PhotoRating(photo_id=photo_id, user_id=user_id, rating=rating))
+        try:
+            await self.session.flush()
+        except IntegrityError:
+            # A concurrent vote of the same user got in first.
+            raise HTTPException(status_code=400, detail="Rating already exists")
+        await self.session.execute(self._apply_rating_delta(photo_id, rating, 1))
 
     async def get_rating(self, photo_id: int, user_id: int):
         """
@@ -245,7 +516,7 @@ class PhotoRatingRepository:
 
     async def delete_rating(self, photo_id: int, user_id: int) -> None:
         """
-        Delete a specific user's rating for a photo.
+        Delete a specific user's rating for a photo and update the average rating.
 
         Args:
             photo_id (int): The ID of the photo.
@@ -264,40 +535,47 @@ class PhotoRatingRepository:
             raise HTTPException(status_code=404, detail="Rating not found")
 
         await self.session.delete(rating)
-        await self.session.commit()
-
-        await self.update_average_rating(photo_id)
+        await self.session.flush()
+        await self.session.execute(
+            self._apply_rating_delta(photo_id, -rating.rating, -1)
+        )
 
-    async def get_ratings_by_photo_id(self, photo_id: int):
+    async def get_ratings_by_photo_id(self, photo_id: int, rows: bool = False):
         """
         Retrieve all ratings for a specific photo.
 
         Args:
             photo_id (int): The ID of the photo.
+            rows (bool): Return plain rows instead of `PhotoRating` objects,
+                for read-only use.
 
         Returns:
             list[PhotoRating]: A list of ratings for the photo.
         """
+        query = row_select(PhotoRating) if rows else select(PhotoRating)
         get_rating = await self.session.execute(
-            select(PhotoRating).where(PhotoRating.photo_id == photo_id)
+            query.where(PhotoRating.photo_id == photo_id)
         )
 
-        return get_rating.scalars().all()
+        return get_rating.all() if rows else get_rating.scalars().all()
 
-    async def get_ratings_by_user_id(self, user_id: int):
+    async def get_ratings_by_user_id(self, user_id: int, rows: bool = False):
         """
         Retrieve all ratings provided by a specific user.
 
         Args:
             user_id (int): The ID of the user.
+            rows (bool): Return plain rows instead of `PhotoRating` objects,
+                for read-only use.
 
         Returns:
             list[PhotoRating]: A list of ratings provided by the user.
         """
+        query = row_select(PhotoRating) if rows else select(PhotoRating)
         get_rating = await self.session.execute(
-            select(PhotoRating).where(PhotoRating.user_id == user_id)
+            query.where(PhotoRating.user_id == user_id)
         )
-        return get_rating.scalars().all()
+        return get_rating.all() if rows else get_rating.scalars().all()
 
     async def get_average_rating(self, photo_id: int):
         """
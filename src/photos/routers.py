@@ -1,4 +1,5 @@
-from typing import List, Union
+import asyncio
+from typing import List, Literal, Optional, Union
 
 from fastapi import (
     APIRouter,
@@ -9,16 +10,31 @@ from fastapi import (
     status,
     Query,
     Path,
+    Request,
+    Response,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from cloudinary.utils import cloudinary_url
 
-from config.db import get_db
+from config.db import get_db, get_read_db
+from config.general import settings
 from src.auth.utils import get_current_user, FORALL, FORMODER
-from src.models.models import User
-from src.photos.repos import PhotoRepository, PhotoRatingRepository
+from src.auth.schemas import Principal
+from src.photos.cache import (
+    normalize_transformation,
+    qr_cache,
+    qr_code_key,
+    transform_cache,
+    transform_key,
+)
+from src.photos.repos import (
+    PhotoRepository,
+    PhotoRatingRepository,
+    PHOTOS_PAGE_SIZE,
+    MAX_PHOTOS_PAGE_SIZE,
+)
 from src.photos.schemas import (
     PhotoResponse,
+    PhotoPageResponse,
     PhotoUpdate,
     UrlPhotoResponse,
     PhotoRatingsListResponse,
@@ -26,11 +42,17 @@ from src.photos.schemas import (
     PhotoRatingResponse,
     AverageRatingResponse,
 )
-from src.utils.cloudinary_helper import (
-    upload_photo_to_cloudinary,
-    get_cloudinary_image_id,
+from src.utils.http import content_etag, etag_matches
+from src.utils.storage import storage
+from src.utils.uploads import ingest_upload
+from src.utils.qr_code_helper import (
+    QR_CACHE_CONTROL,
+    QR_DEFAULT_SIZE,
+    QR_MAX_SIZE,
+    QR_MEDIA_TYPES,
+    QR_MIN_SIZE,
+    render_qr_code,
 )
-from src.utils.qr_code_helper import generate_qr_code
 
 photo_router = APIRouter()
 
@@ -49,71 +71,98 @@ async def create_photo(
         None, title="Опис фотографії", description="Опис фотографії"
     ),
     file: UploadFile = File(...),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> PhotoResponse:
-    cloudinary_url = await upload_photo_to_cloudinary(file)
+    upload = await ingest_upload(file)
+    photo_url = await storage.put(upload.file, folder="user_photos", name=upload.sha256)
 
     photo_repo = PhotoRepository(db)
-    new_photo = await photo_repo.create_photo(cloudinary_url, description, user, tags)
+    new_photo = await photo_repo.create_photo(photo_url, description, user, tags)
 
     return new_photo
 
 
 @photo_router.get(
-    "/users_all_photos", response_model=list[PhotoResponse], dependencies=FORALL
+    "/users_all_photos", response_model=PhotoPageResponse, dependencies=FORALL
 )
 async def get_all_photos(
-    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor of the page to fetch"),
+    limit: int = Query(PHOTOS_PAGE_SIZE, ge=1, le=MAX_PHOTOS_PAGE_SIZE),
+    include_total: bool = Query(False, description="Include the total photo count"),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Retrieve all photos uploaded by the current user.
+    Retrieve a page of photos uploaded by the current user.
 
-    This endpoint fetches all photos uploaded by the authenticated user.
+    This endpoint fetches the authenticated user's photos, newest first, one page at a time.
+    Pass `next_cursor` or `prev_cursor` from a response as `cursor` to move between pages.
 
     Args:
-        user (User): The authenticated user making the request.
+        cursor (str, optional): The cursor of the page to fetch; the first page if omitted.
+        limit (int): The page size.
+        include_total (bool): Whether to include the user's total photo count.
+        user (Principal): The authenticated user making the request.
         db (AsyncSession): The database session.
 
     Returns:
-        list[PhotoResponse]: A list of the user's photos.
+        PhotoPageResponse: A page of the user's photos with pagination cursors.
 
     Raises:
         HTTPException: If no photos are found for the user.
     """
     photo_repo = PhotoRepository(db)
-    photos = await photo_repo.get_users_all_photos(user)
-    if not photos:
+    page = await photo_repo.get_photos_page(cursor, limit, owner_id=user.id)
+    if not page.items and cursor is None:
         raise HTTPException(status_code=404, detail="Photos not found")
-    return photos
+    total = await photo_repo.count_photos(owner_id=user.id) if include_total else None
+    return PhotoPageResponse(
+        items=page.items,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+        approximate_total=total,
+    )
 
 
-@photo_router.get(
-    "/users_all_photos", response_model=list[PhotoResponse], dependencies=FORALL
-)
+@photo_router.get("/all_photos", response_model=PhotoPageResponse, dependencies=FORALL)
 async def all_photos(
-    user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor of the page to fetch"),
+    limit: int = Query(PHOTOS_PAGE_SIZE, ge=1, le=MAX_PHOTOS_PAGE_SIZE),
+    include_total: bool = Query(
+        False, description="Include an approximate total photo count"
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Retrieve all photos .
+    Retrieve a page of all photos.
 
-    This endpoint fetches all photos .
+    This endpoint fetches all photos, newest first, one page at a time.
+    Pass `next_cursor` or `prev_cursor` from a response as `cursor` to move between pages.
 
     Args:
-        user (User): The authenticated user making the request.
+        cursor (str, optional): The cursor of the page to fetch; the first page if omitted.
+        limit (int): The page size.
+        include_total (bool): Whether to include an approximate total photo count.
         db (AsyncSession): The database session.
 
     Returns:
-        list[PhotoResponse]: A list of all photos.
+        PhotoPageResponse: A page of photos with pagination cursors.
 
     Raises:
-        HTTPException: If no photos are found .
+        HTTPException: If no photos are found.
     """
     photo_repo = PhotoRepository(db)
-    photos = await photo_repo.get_all_photos()
-    if not photos:
+    page = await photo_repo.get_photos_page(cursor, limit)
+    if not page.items and cursor is None:
         raise HTTPException(status_code=404, detail="Photos not found")
-    return photos
+    total = await photo_repo.count_photos(approximate=True) if include_total else None
+    return PhotoPageResponse(
+        items=page.items,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+        approximate_total=total,
+    )
 
 
 @photo_router.get(
@@ -121,7 +170,7 @@ async def all_photos(
 )
 async def get_photo_url(
     photo_id: int = Path(..., description="ID of the photo"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> UrlPhotoResponse:
     """
     Retrieve the URL of a photo by its ID.
@@ -149,7 +198,7 @@ async def get_photo_url(
 @photo_router.get("/{photo_id}", response_model=PhotoResponse, dependencies=FORALL)
 async def get_photo_by_id(
     photo_id: int = Path(..., description="ID of the photo"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> PhotoResponse:
     """
     Retrieve details of a photo by its ID.
@@ -180,7 +229,7 @@ async def get_photo_by_id(
 async def update_photo_description(
     photo_id: int,
     photo: PhotoUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -191,7 +240,7 @@ async def update_photo_description(
     Args:
         photo_id (int): The ID of the photo.
         photo (PhotoUpdate): The new description for the photo.
-        user (User): The authenticated user making the request.
+        user (Principal): The authenticated user making the request.
         db (AsyncSession): The database session.
 
     Returns:
@@ -209,7 +258,7 @@ async def update_photo_description(
 )
 async def delete_own_photo(
     photo_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -219,7 +268,7 @@ async def delete_own_photo(
 
     Args:
         photo_id (int): The ID of the photo to delete.
-        user (User): The authenticated user making the request.
+        user (Principal): The authenticated user making the request.
         db (AsyncSession): The database session.
 
     Returns:
@@ -243,24 +292,79 @@ async def delete_own_photo(
     return {"detail": "Photo deleted successfully"}
 
 
+async def get_transformed_urls(
+    photo_id: int, transformation: dict, db: AsyncSession
+) -> tuple[str, str]:
+    """
+    Resolve the original and transformed URLs of a photo, using the transform cache.
+
+    Args:
+        photo_id (int): The ID of the photo.
+        transformation (dict): A normalized transformation.
+        db (AsyncSession): The database session, only used on a cache miss.
+
+    Returns:
+        tuple[str, str]: The original and the transformed URL.
+
+    Raises:
+        HTTPException: If the photo does not exist or the transformation is invalid.
+    """
+    key = transform_key(photo_id, transformation)
+    cached = transform_cache.get(key)
+    if cached is not None:
+        return cached
+
+    photo_url = await PhotoRepository(db).get_photo_url(photo_id)
+    if photo_url is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    try:
+        transformed_url = (
+            await storage.transform(photo_url, **transformation)
+            if transformation
+            else photo_url
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    transform_cache.set(key, (photo_url, transformed_url))
+    return photo_url, transformed_url
+
+
 @photo_router.get(
     "/{photo_id}/transform",
     dependencies=FORALL,
 )
 async def transform_photo(
+    request: Request,
     photo_id: int,
-    width: int = Query(None, description="Width of the transformed photo"),
-    height: int = Query(None, description="Height of the transformed photo"),
+    width: int = Query(
+        None,
+        ge=1,
+        le=settings.transform_max_dimension,
+        description="Width of the transformed photo",
+    ),
+    height: int = Query(
+        None,
+        ge=1,
+        le=settings.transform_max_dimension,
+        description="Height of the transformed photo",
+    ),
     crop: str = Query(None, description="Crop mode (e.g., 'fill', 'fit')"),
     effect: str = Query(
         None, description="Effect to apply (e.g., 'sepia', 'grayscale')"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Transform a photo by applying specified parameters (e.g., resizing, cropping, effects).
 
+    Results are cached per photo and transformation, so repeated requests with
+    the same parameters skip the database and the transform. The QR code is not
+    rendered here; the response links to the QR code endpoint instead.
+
     Args:
+        request (Request): The incoming request, used to build the QR code URL.
         photo_id (int): The ID of the photo to transform.
         width (int, optional): The width of the transformed photo.
         height (int, optional): The height of the transformed photo.
@@ -272,46 +376,116 @@ async def transform_photo(
         dict: A dictionary containing the original URL, transformed URL, and QR code URL.
 
     Raises:
-        HTTPException: If the photo does not exist.
-        ValueError: If the Cloudinary URL is invalid.
+        HTTPException: If the photo does not exist or the transformation is invalid.
     """
-    # Retrieve the photo from the database
-    photo_repo = PhotoRepository(db)
-    photo = await photo_repo.get_photo_by_id(photo_id)
-
-    if photo is None:
-        raise HTTPException(status_code=404, detail="Photo not found")
+    transformation = normalize_transformation(
+        width=width, height=height, crop=crop, effect=effect
+    )
+    photo_url, transformed_url = await get_transformed_urls(
+        photo_id, transformation, db
+    )
+    qr_code_url = request.url_for(
+        "get_photo_qr_code", photo_id=photo_id
+    ).include_query_params(**transformation)
 
-    transformation = {
-        "width": width,
-        "height": height,
-        "crop": crop,
-        "effect": effect,
+    return {
+        "original_url": photo_url,
+        "transformed_url": transformed_url,
+        "qr_code_url": str(qr_code_url),
     }
 
-    transformation = {k: v for k, v in transformation.items() if v is not None}
 
-    image_id = get_cloudinary_image_id(photo.url_link)
+@photo_router.get(
+    "/{photo_id}/qr",
+    response_class=Response,
+    dependencies=FORALL,
+    responses={
+        200: {"content": {media_type: {} for media_type in QR_MEDIA_TYPES.values()}},
+        304: {"description": "The cached QR code is still valid"},
+    },
+)
+async def get_photo_qr_code(
+    request: Request,
+    photo_id: int,
+    image_format: Literal["png", "svg"] = Query(
+        "png", alias="format", description="Image format of the QR code"
+    ),
+    size: int = Query(
+        QR_DEFAULT_SIZE,
+        ge=QR_MIN_SIZE,
+        le=QR_MAX_SIZE,
+        description="Approximate width of a PNG QR code in pixels",
+    ),
+    width: int = Query(
+        None,
+        ge=1,
+        le=settings.transform_max_dimension,
+        description="Width of the transformed photo",
+    ),
+    height: int = Query(
+        None,
+        ge=1,
+        le=settings.transform_max_dimension,
+        description="Height of the transformed photo",
+    ),
+    crop: str = Query(None, description="Crop mode (e.g., 'fill', 'fit')"),
+    effect: str = Query(
+        None, description="Effect to apply (e.g., 'sepia', 'grayscale')"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Get a QR code linking to a photo, or to a transformed version of it.
 
-    if not image_id:
-        raise ValueError("Invalid Cloudinary URL")
+    Codes are rendered once and kept in a content-addressed cache. Responses
+    carry a strong ETag and may be cached by the browser; a matching
+    `If-None-Match` gets 304 without a body.
 
-    transformed_url, _ = cloudinary_url(image_id, transformation=transformation)
+    Args:
+        request (Request): The incoming request.
+        photo_id (int): The ID of the photo.
+        image_format (str): "png" or "svg".
+        size (int): The approximate width of a PNG in pixels; SVG codes scale
+            freely and ignore it.
+        width (int, optional): The width of the transformed photo.
+        height (int, optional): The height of the transformed photo.
+        crop (str, optional): The crop mode to apply.
+        effect (str, optional): The effect to apply to the photo.
+        db (AsyncSession): The database session.
 
-    qr_code_data = generate_qr_code(transformed_url)
+    Returns:
+        Response: The QR code image.
 
-    return {
-        "original_url": photo.url_link,
-        "transformed_url": transformed_url,
-        "qr_code_url": qr_code_data,
-    }
+    Raises:
+        HTTPException: If the photo does not exist or the transformation is invalid.
+    """
+    transformation = normalize_transformation(
+        width=width, height=height, crop=crop, effect=effect
+    )
+    _, url = await get_transformed_urls(photo_id, transformation, db)
+    if image_format == "svg":
+        size = None
+
+    key = qr_code_key(url, image_format, size)
+    cached = qr_cache.get(key)
+    if cached is None:
+        image = await asyncio.to_thread(render_qr_code, url, image_format, size)
+        content = image.getvalue()
+        cached = (content_etag(content), content)
+        qr_cache.set(key, cached)
+    etag, content = cached
+
+    headers = {"ETag": etag, "Cache-Control": QR_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content, media_type=QR_MEDIA_TYPES[image_format], headers=headers)
 
 
 @photo_router.post("/rate/{photo_id}", dependencies=FORALL)
 async def rate_photo(
     photo_id: int = Path(..., description="ID of the photo"),
     rating: int = Query(..., ge=1, le=5, description="Rating between 1 and 5"),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -322,7 +496,7 @@ async def rate_photo(
     Args:
         photo_id (int): The ID of the photo to rate.
         rating (int): The rating to assign (1-5).
-        user (User): The authenticated user making the request.
+        user (Principal): The authenticated user making the request.
         db (AsyncSession): The database session.
 
     Returns:
@@ -350,7 +524,7 @@ async def rate_photo(
 )
 async def get_current_photo_ratings(
     photo_id: int = Path(..., description="ID of the photo"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> AverageRatingResponse:
     """
     Retrieve the average rating of a photo.
@@ -408,16 +582,8 @@ async def delete_photo_rating(
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
 
-    rating_repo = PhotoRatingRepository(db)
-    rating = await rating_repo.get_rating(photo_id, user_id)
-    if not rating:
-        raise HTTPException(status_code=404, detail="Rating not found")
-
-    # Delete the rating
-    await rating_repo.delete_rating(photo_id, user_id)
-
-    # Update the average rating
-    await rating_repo.update_average_rating(photo_id)
+    # Delete the rating and update the average rating
+    await PhotoRatingRepository(db).delete_rating(photo_id, user_id)
 
     return {"detail": "Rating deleted successfully."}
 
@@ -432,7 +598,7 @@ async def delete_photo_rating(
 async def get_ratings_by_user_or_photo(
     photo_id: int = Query(None, description="ID of the photo to fetch ratings for"),
     user_id: int = Query(None, description="ID of the user to fetch ratings for"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Retrieve ratings by photo or user.
@@ -455,7 +621,7 @@ async def get_ratings_by_user_or_photo(
 
     # If only photo_id is passed - show all ratings for the photo
     if photo_id and not user_id:
-        ratings = await rating_repo.get_ratings_by_photo_id(photo_id)
+        ratings = await rating_repo.get_ratings_by_photo_id(photo_id, rows=True)
         if not ratings:
             raise HTTPException(
                 status_code=404, detail="No ratings found for this photo"
@@ -464,7 +630,7 @@ async def get_ratings_by_user_or_photo(
 
     # If only user_id is passed - show all ratings of this user
     elif user_id and not photo_id:
-        ratings = await rating_repo.get_ratings_by_user_id(user_id)
+        ratings = await rating_repo.get_ratings_by_user_id(user_id, rows=True)
         if not ratings:
             raise HTTPException(
                 status_code=404, detail="No ratings found for this user"
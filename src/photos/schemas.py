@@ -32,11 +32,21 @@ class PhotoResponse(PhotoBase):
     tags: List[TagResponse]
     rating: Optional[float]
     qr_core_url: Optional[str]
+    thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
+    full_url: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class PhotoPageResponse(BaseModel):
+    items: List[PhotoResponse]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    approximate_total: Optional[int] = None
+
+
 class PhotoUpdate(BaseModel):
     description: str
 
@@ -1,11 +1,18 @@
-from typing import Sequence
+from typing import Iterable, Sequence
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row, Select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 
-from ..models.models import Tag, Photo
+from config.db import on_commit
+from ..models.models import Tag, Photo, photo_tags
+from ..models.loaders import loader_profile, row_select
+from ..web.cache import invalidate_pages
+
+POPULAR_TAGS_LIMIT = 10
+MAX_POPULAR_TAGS_LIMIT = 100
 
 
 class TagRepository:
@@ -33,7 +40,11 @@ class TagRepository:
         :return: A `Tag` object representing the retrieved tag.
         :raises HTTPException: If no tag with the specified name is found.
         """
-        result = await self.db.execute(select(Tag).where(Tag.name == tag_name))
+        result = await self.db.execute(
+            select(Tag)
+            .options(*loader_profile("tag_listing"))
+            .where(Tag.name == tag_name)
+        )
         print("Hello")
         tag = result.scalar_one_or_none()
         if tag:
@@ -60,20 +71,97 @@ class TagRepository:
 
         new_tag = Tag(name=tag_name)
         self.db.add(new_tag)
-        await self.db.commit()
-        await self.db.refresh(new_tag)
+        await self.db.flush()
+        on_commit(self.db, invalidate_pages)
         return new_tag
 
-    async def get_all_tags(self) -> Sequence[Tag]:
+    async def upsert_tags(self, tag_names: Iterable[str]) -> list[int]:
+        """
+        Creates any missing tags and returns the IDs of all given tags.
+
+        All names are inserted with a single `INSERT ... ON CONFLICT DO NOTHING` and
+        their IDs are read back with one `SELECT`, regardless of how many tags there
+        are or how many of them already exist. The caller commits.
+
+        :param tag_names: The names of the tags; duplicates are ignored.
+        :return: The tag IDs, in the order the names were first given.
+        """
+        tag_names = list(dict.fromkeys(tag_names))
+        if not tag_names:
+            return []
+        await self.db.execute(
+            insert(Tag)
+            .values([{"name": tag_name} for tag_name in tag_names])
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+        )
+        rows = await self.db.execute(
+            select(Tag.name, Tag.id).where(Tag.name.in_(tag_names))
+        )
+        tag_ids = dict(rows.all())
+        return [tag_ids[tag_name] for tag_name in tag_names]
+
+    def _listing(self, rows: bool) -> Select:
+        """
+        Starts a query for a list of tags.
+
+        :param rows: Select plain rows instead of `Tag` objects.
+        :return: The query.
+        """
+        if rows:
+            return row_select(Tag)
+        return select(Tag).options(*loader_profile("tag_listing"))
+
+    async def get_all_tags(self, rows: bool = False) -> Sequence[Tag | Row]:
         """
         Retrieves all tags from the database.
 
         This method fetches all tags stored in the database and returns them as a list.
 
+        :param rows: Return plain rows instead of `Tag` objects, for read-only use.
         :return: A sequence of `Tag` objects representing all tags in the database.
         """
-        tags = await self.db.execute(select(Tag))
-        return tags.scalars().all()
+        tags = await self.db.execute(self._listing(rows))
+        return tags.all() if rows else tags.scalars().all()
+
+    async def get_popular_tags(
+        self, limit: int = POPULAR_TAGS_LIMIT, rows: bool = False
+    ) -> Sequence[Tag | Row]:
+        """
+        Retrieves the most used tags.
+
+        Tags are ranked by their maintained `photo_count`, so the query walks the
+        `photo_count` index and reads only `limit` rows instead of aggregating
+        `photo_tags`.
+
+        :param limit: The maximum number of tags to return.
+        :param rows: Return plain rows instead of `Tag` objects, for read-only use.
+        :return: A sequence of `Tag` objects ordered by photo count, highest first.
+        """
+        tags = await self.db.execute(
+            self._listing(rows).order_by(Tag.photo_count.desc(), Tag.id).limit(limit)
+        )
+        return tags.all() if rows else tags.scalars().all()
+
+    async def adjust_photo_counts(self, tag_ids: Iterable[int], delta: int) -> None:
+        """
+        Adds `delta` to the photo counters of the given tags.
+
+        Call this in the same transaction that inserts or deletes the matching
+        `photo_tags` rows; the caller commits. The update is done in SQL so that
+        concurrent uploads do not overwrite each other's increments.
+
+        :param tag_ids: The IDs of the tags whose photos were added or removed.
+        :param delta: The change in photo count, e.g. `1` or `-1`.
+        """
+        tag_ids = list(tag_ids)
+        if not tag_ids or not delta:
+            return
+        await self.db.execute(
+            update(Tag)
+            .where(Tag.id.in_(tag_ids))
+            .values(photo_count=Tag.photo_count + delta)
+            .execution_options(synchronize_session=False)
+        )
 
     async def delete_tag_by_name(self, tag_name: str) -> str:
         """
@@ -88,7 +176,8 @@ class TagRepository:
         tag = await self.get_tag_by_name(tag_name)
 
         await self.db.delete(tag)
-        await self.db.commit()
+        await self.db.flush()
+        on_commit(self.db, invalidate_pages)
         return "Successfully deleted!"
 
     async def update_tag_name(self, tag_name: str, tag_new_name: str) -> Tag:
@@ -105,17 +194,20 @@ class TagRepository:
         tag = await self.get_tag_by_name(tag_name)
 
         tag.name = tag_new_name
-        await self.db.commit()
-        await self.db.refresh(tag)
+        await self.db.flush()
+        on_commit(self.db, invalidate_pages)
         return tag
 
-    async def get_photos_by_tag(self, tag_name: str) -> Sequence[Photo]:
+    async def get_photos_by_tag(
+        self, tag_name: str, profile: str = "photo_summary"
+    ) -> Sequence[Photo]:
         """
         Retrieves all photos associated with a specific tag.
 
         This method fetches a tag by its name and retrieves all photos linked to that tag. If the tag or associated photos are not found, an exception is raised.
 
         :param tag_name: The name of the tag whose photos are to be retrieved.
+        :param profile: The loader profile for the photos' relationships.
         :return: A sequence of `Photo` objects representing the photos associated with the tag.
         :raises HTTPException: If the tag or associated photos are not found.
         """
@@ -125,8 +217,9 @@ class TagRepository:
 
         result = await self.db.execute(
             select(Photo)
-            .options(joinedload(Photo.tags))
-            .where(Photo.id.in_([photo.id for photo in tag.photos]))
+            .options(*loader_profile(profile))
+            .join(photo_tags, photo_tags.c.photo_id == Photo.id)
+            .where(photo_tags.c.tag_id == tag.id)
         )
         photos = result.scalars().unique().all()
         if photos:
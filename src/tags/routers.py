@@ -1,16 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends, APIRouter, Form, status
-from fastapi.templating import Jinja2Templates
+from fastapi import Depends, APIRouter, Form, Query, status
 from fastapi.responses import JSONResponse
 
-from .repos import TagRepository
-from config.db import get_db
-from .schemas import TagResponse
+from .repos import TagRepository, POPULAR_TAGS_LIMIT, MAX_POPULAR_TAGS_LIMIT
+from config.db import get_db, get_read_db
+from .schemas import TagResponse, PopularTagResponse
 from ..auth.utils import FORALL, FORMODER
 from ..photos.schemas import PhotoResponse
 
 tag_router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 @tag_router.post(
@@ -49,7 +47,7 @@ async def create_tag(tag_name: str = Form(...), db: AsyncSession = Depends(get_d
     """,
     response_model=list[TagResponse],
 )
-async def get_all_tags(db: AsyncSession = Depends(get_db)):
+async def get_all_tags(db: AsyncSession = Depends(get_read_db)):
     """
     Endpoint to fetch all tags.
 
@@ -59,7 +57,33 @@ async def get_all_tags(db: AsyncSession = Depends(get_db)):
     :return: A list of `TagResponse` objects representing all tags.
     """
     tag_repo = TagRepository(db)
-    return await tag_repo.get_all_tags()
+    return await tag_repo.get_all_tags(rows=True)
+
+
+@tag_router.get(
+    "/popular",
+    summary="Get the most popular tags",
+    description="""
+    Retrieves the tags attached to the most photos, highest first.
+    Each tag includes the number of photos carrying it.
+    """,
+    response_model=list[PopularTagResponse],
+)
+async def get_popular_tags(
+    limit: int = Query(POPULAR_TAGS_LIMIT, ge=1, le=MAX_POPULAR_TAGS_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Endpoint to fetch the most popular tags.
+
+    Tags are ranked by their maintained photo counters, so the cost depends only on `limit`.
+
+    :param limit: The maximum number of tags to return.
+    :param db: Database session dependency.
+    :return: A list of `PopularTagResponse` objects ordered by photo count.
+    """
+    tag_repo = TagRepository(db)
+    return await tag_repo.get_popular_tags(limit, rows=True)
 
 
 @tag_router.get(
@@ -71,7 +95,7 @@ async def get_all_tags(db: AsyncSession = Depends(get_db)):
     """,
     response_model=TagResponse,
 )
-async def get_tag_by_name(tag_name: str, db: AsyncSession = Depends(get_db)):
+async def get_tag_by_name(tag_name: str, db: AsyncSession = Depends(get_read_db)):
     """
     Endpoint to fetch a tag by its name.
 
@@ -150,7 +174,7 @@ async def update_tag_name(
     """,
     response_model=list[PhotoResponse],
 )
-async def get_photos_by_tag(tag_name: str, db: AsyncSession = Depends(get_db)):
+async def get_photos_by_tag(tag_name: str, db: AsyncSession = Depends(get_read_db)):
     """
     Endpoint to retrieve photos by tag name.
 
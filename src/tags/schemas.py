@@ -11,3 +11,7 @@ class TagBase(BaseModel):
 
 class TagResponse(TagBase):
     pass
+
+
+class PopularTagResponse(TagBase):
+    photo_count: int
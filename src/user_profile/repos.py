@@ -16,9 +16,11 @@ Dependencies:
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.db import on_commit
 from src.models.models import User
 from src.user_profile.schemas import UserProfileUpdate
 from src.auth.repos import UserRepository
+from src.auth.cache import invalidate_principal
 
 
 class UserProfileRepository:
@@ -55,6 +57,7 @@ class UserProfileRepository:
         user = await UserRepository.get_user_by_id(self, user_id)
         if not user:
             return None
+        old_username = user.username
         if user_update.username is not None:
             user.username = user_update.username
         if user_update.first_name is not None:
@@ -68,8 +71,8 @@ class UserProfileRepository:
         if user_update.country is not None:
             user.country = user_update.country
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        on_commit(self.session, invalidate_principal, old_username, user.username)
         return user
 
     async def get_user(self, username: str) -> User:
@@ -103,8 +106,8 @@ class UserProfileRepository:
             return user
         user.is_banned = True
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        on_commit(self.session, invalidate_principal, username)
         return user
 
     async def unban_user(self, username: str) -> User:
@@ -122,6 +125,6 @@ class UserProfileRepository:
             return None
         user.is_banned = False
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        on_commit(self.session, invalidate_principal, username)
         return user
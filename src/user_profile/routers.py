@@ -13,12 +13,9 @@ Dependencies:
 from fastapi import APIRouter, UploadFile, HTTPException, status, Depends, File
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-import cloudinary
-import cloudinary.uploader
 
-from config.db import get_db
-from config.general import settings
-from src.models.models import User, Role, Photo
+from config.db import get_db, on_commit, read_replicas
+from src.models.models import Role, Photo
 from src.user_profile.schemas import (
     UserProfileUpdate,
     UserProfileResponse,
@@ -28,7 +25,13 @@ from src.user_profile.schemas import (
 from src.user_profile.repos import UserProfileRepository
 from src.auth.repos import UserRepository, RoleRepository
 from src.auth.utils import FORADMIN, ACTIVATE, get_current_user
-from src.auth.schemas import RoleEnum
+from src.auth.schemas import RoleEnum, Principal
+from src.auth.cache import principal_cache, invalidate_principal
+from src.utils.jobs import job_worker
+from src.web.cache import page_cache
+from src.web.fragments import fragment_cache
+from src.utils.storage import storage
+from src.utils.uploads import ingest_upload
 
 
 router = APIRouter()
@@ -42,7 +45,7 @@ router = APIRouter()
 async def update_own_profile(
     user_update: UserProfileUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Update the current user's profile with the provided information.
@@ -50,7 +53,7 @@ async def update_own_profile(
     Args:
         user_update (UserProfileUpdate): Data for updating the user profile.
         db (AsyncSession): Database session dependency.
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         UserProfileResponse: Updated profile information.
@@ -82,7 +85,7 @@ async def update_own_profile(
 )
 async def update_own_avatar(
     file: UploadFile = File(),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -90,27 +93,20 @@ async def update_own_avatar(
 
     Args:
         file (UploadFile): The new avatar file.
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated user.
         db (AsyncSession): Database session dependency.
 
     Returns:
         UserAvatarResponse: Updated avatar URL.
     """
-    cloudinary.config(
-        cloud_name=settings.cloudinary_cloud_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
+    upload = await ingest_upload(file)
     try:
-        r = cloudinary.uploader.upload(
-            file.file,
-            public_id=f"avatars/{current_user.username}",
-            overwrite=True,
+        avatar_url = await storage.put(
+            upload.file, folder="avatars", name=str(current_user.id), overwrite=True
+        )
+        src_url = await storage.transform(
+            avatar_url, width=250, height=250, crop="fill"
         )
-        src_url = cloudinary.CloudinaryImage(
-            f"avatars/{current_user.username}"
-        ).build_url(width=250, height=250, crop="fill", version=r.get("version"))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,13 +121,14 @@ async def update_own_avatar(
     "/my_profile", response_model=UserProfileResponse, status_code=status.HTTP_200_OK
 )
 async def get_own_profile(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve the current user's profile information.
 
     Args:
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated user.
         db (AsyncSession): Database session dependency.
 
     Returns:
@@ -169,7 +166,7 @@ async def get_own_profile(
 async def get_user_profile(
     username: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Retrieve profile information for a specific user by their username.
@@ -177,7 +174,7 @@ async def get_user_profile(
     Args:
         username (str): The username of the user whose profile is being requested.
         db (AsyncSession): Database session dependency.
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         UserProfileResponse: The profile information of the specified user.
@@ -218,7 +215,7 @@ async def get_user_profile(
 async def get_user_profile_for_admin(
     username: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Retrieve detailed profile information for a specific user by an admin.
@@ -226,7 +223,7 @@ async def get_user_profile_for_admin(
     Args:
         username (str): The username of the user whose profile is being requested.
         db (AsyncSession): Database session dependency.
-        current_user (User): The currently authenticated admin.
+        current_user (Principal): The currently authenticated admin.
 
     Returns:
         AdminUserProfileResponse: The profile information of the specified user,
@@ -302,18 +299,80 @@ async def change_user_role(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Role not found"
         )
+    username = user.username
     user.role = role_obj
-    await db.commit()
+    on_commit(db, invalidate_principal, username)
     return {"msg": "User role updated successfully"}
 
 
+@router.get(
+    "/admin/principal_cache", dependencies=FORADMIN, status_code=status.HTTP_200_OK
+)
+async def get_principal_cache_stats():
+    """
+    Retrieve the size and hit/miss/eviction counters of this worker's principal cache.
+
+    Returns:
+        dict: The principal cache statistics, including the hit ratio.
+    """
+    return principal_cache.stats()
+
+
+@router.get(
+    "/admin/fragment_cache", dependencies=FORADMIN, status_code=status.HTTP_200_OK
+)
+async def get_fragment_cache_stats():
+    """
+    Retrieve the size and hit/miss/eviction counters of this worker's HTML fragment cache.
+
+    Returns:
+        dict: The fragment cache statistics, including the hit ratio.
+    """
+    return fragment_cache.stats()
+
+
+@router.get("/admin/page_cache", dependencies=FORADMIN, status_code=status.HTTP_200_OK)
+async def get_page_cache_stats():
+    """
+    Retrieve the size and hit/miss/eviction counters of this worker's anonymous page cache.
+
+    Returns:
+        dict: The page cache statistics, including the hit ratio.
+    """
+    return page_cache.stats()
+
+
+@router.get("/admin/jobs", dependencies=FORADMIN, status_code=status.HTTP_200_OK)
+async def get_job_stats():
+    """
+    Retrieve the background job counters of this worker and the outbox size.
+
+    Returns:
+        dict: The worker's running, succeeded, retried and failed counters, and
+        the number of pending, running and failed jobs in the outbox.
+    """
+    return {"worker": job_worker.stats(), "jobs": await job_worker.counts()}
+
+
+@router.get("/admin/replicas", dependencies=FORADMIN, status_code=status.HTTP_200_OK)
+async def get_replica_stats():
+    """
+    Retrieve the health of the read replicas as seen by this worker.
+
+    Returns:
+        dict: Each replica's URL, health and failure count, and the number of
+        read sessions that fell back to the primary.
+    """
+    return read_replicas.stats()
+
+
 @router.put(
     "/admin/ban_user/{username}", dependencies=FORADMIN, status_code=status.HTTP_200_OK
 )
 async def ban_user(
     username: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Ban a specific user by their username.
@@ -321,7 +380,7 @@ async def ban_user(
     Args:
         username (str): The username of the user to ban.
         db (AsyncSession): Database session dependency.
-        current_user (User): The currently authenticated admin.
+        current_user (Principal): The currently authenticated admin.
 
     Returns:
         dict: Confirmation message indicating the user has been banned.
@@ -351,7 +410,7 @@ async def ban_user(
 async def unban_user(
     username: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Unban a specific user by their username.
@@ -359,7 +418,7 @@ async def unban_user(
     Args:
         username (str): The username of the user to unban.
         db (AsyncSession): Database session dependency.
-        current_user (User): The currently authenticated admin.
+        current_user (Principal): The currently authenticated admin.
 
     Returns:
         dict: Confirmation message indicating the user has been unbanned.
@@ -0,0 +1,151 @@
+"""
+In-process TTL + LRU cache.
+
+A small bounded mapping used for per-worker caches. Entries expire after a
+time-to-live (if one is set), and once the cache is full the least recently
+used entry is evicted. Hit, miss, eviction and expiration counters are kept so
+caches can be tuned from their `stats()`.
+
+Each worker process has its own cache, so invalidation only reaches the current
+worker; other workers catch up when their entries expire. Keep TTLs short for
+data that must not stay stale for long.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    A thread-safe cache with per-entry expiry and LRU eviction.
+
+    Args:
+        maxsize (int): The maximum number of entries kept in the cache.
+        ttl (float | None): Default time-to-live of an entry in seconds, or
+            `None` for entries that only leave the cache through eviction.
+        timer (Callable[[], float]): The clock used for expiry.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns a cached value and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned on a miss.
+
+        Returns:
+            Any: The cached value, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= self._timer():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Stores a value, evicting the least recently used entries if full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+            ttl (float | None): Overrides the default time-to-live.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self._timer() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Removes an entry from the cache.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): The value returned if the key is not cached.
+
+        Returns:
+            Any: The removed value, or `default`.
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Removes all entries whose key matches a predicate.
+
+        Args:
+            predicate (Callable[[Hashable], bool]): Returns True for the keys to
+                remove.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes all entries. Counters are kept.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache's size and counters.
+
+        Returns:
+            dict: Size, limits, hit/miss/eviction/expiration counters and the
+            hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,27 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from urllib.parse import urlparse
 
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-from fastapi import UploadFile
+import cloudinary.exceptions
 
+from config.general import settings
 
-async def upload_photo_to_cloudinary(file: UploadFile):
-    file_bytes = await file.read()
+RETRYABLE_UPLOAD_ERRORS = (
+    cloudinary.exceptions.GeneralError,
+    cloudinary.exceptions.RateLimited,
+    ConnectionError,
+)
 
-    response = cloudinary.uploader.upload(file_bytes, folder="user_photos/")
 
-    return response["secure_url"]
+class CloudinaryClient:
+    """
+    Runs the blocking Cloudinary SDK calls off the event loop.
 
+    Uploads are executed in a bounded thread pool, so at most `max_concurrency`
+    transfers run at once per worker and the event loop keeps serving other
+    requests meanwhile. Each attempt is limited to `timeout` seconds, and
+    transient failures (server errors, rate limiting, dropped connections) are
+    retried with exponential backoff.
 
-def generate_transformed_image_url(
-    public_id: str, width: int, height: int, crop_mode="fill"
-):
-    return cloudinary.CloudinaryImage(public_id).build_url(
-        transformation=[
-            {"width": width, "height": height, "crop": crop_mode, "gravity": "auto"}
-        ]
-    )
+    Args:
+        max_concurrency (int): The maximum number of simultaneous uploads.
+        timeout (float): Seconds to wait for a single upload attempt.
+        retries (int): How many times a failed upload is retried.
+        backoff (float): Delay before the first retry in seconds, doubled
+            after every further attempt.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout: float,
+        retries: int = 0,
+        backoff: float = 0.5,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="cloudinary"
+        )
+
+    async def upload(self, file, **options) -> dict:
+        """
+        Uploads a file to Cloudinary without blocking the event loop.
+
+        Args:
+            file: Anything `cloudinary.uploader.upload` accepts: bytes, a file
+                object, a path or a URL.
+            **options: Upload options passed to `cloudinary.uploader.upload`.
+
+        Returns:
+            dict: The Cloudinary upload response.
+
+        Raises:
+            asyncio.TimeoutError: If an attempt takes longer than `timeout`.
+            Exception: Whatever the SDK raised on the last attempt.
+        """
+        for attempt in range(self.retries + 1):
+            if attempt and hasattr(file, "seek"):
+                file.seek(0)
+            try:
+                return await self._call(cloudinary.uploader.upload, file, **options)
+            except RETRYABLE_UPLOAD_ERRORS:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2**attempt)
+
+    async def destroy(self, public_id: str, **options) -> dict:
+        """
+        Deletes an asset from Cloudinary without blocking the event loop.
+
+        Args:
+            public_id (str): The public ID of the asset.
+            **options: Options passed to `cloudinary.uploader.destroy`.
+
+        Returns:
+            dict: The Cloudinary response.
+        """
+        return await self._call(cloudinary.uploader.destroy, public_id, **options)
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self._executor, partial(func, *args, **kwargs)),
+            self.timeout,
+        )
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker threads once pending uploads have finished.
+        """
+        self._executor.shutdown(wait=True)
+
+
+cloudinary_client = CloudinaryClient(
+    max_concurrency=settings.upload_max_concurrency,
+    timeout=settings.upload_timeout_seconds,
+    retries=settings.upload_retries,
+)
 
 
 def get_cloudinary_image_id(url: str) -> str:
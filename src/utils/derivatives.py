@@ -0,0 +1,107 @@
+"""
+Upload-time image derivatives.
+
+Every uploaded photo is rendered once into a fixed set of sizes, so pages never
+have to ship the original to show a small card:
+
+- `thumbnail`: card grids (index, gallery, tag and profile pages).
+- `medium`: the single photo page.
+- `full`: a web-optimized version of the original for full-screen viewing.
+
+Rendering is CPU-bound, so it runs in a process pool and does not hold the
+event loop or the GIL. The original is handed to the pool as a file path and
+decoded by the worker process, so it is never copied through memory. The
+derivatives are stored through the storage backend under the photo's content
+hash.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO
+
+from PIL import Image, ImageOps
+
+from config.general import settings
+from src.utils.storage import storage
+
+DERIVATIVE_SIZES = {"thumbnail": 400, "medium": 1080, "full": 2048}
+JPEG_QUALITY = 85
+
+logger = logging.getLogger(__name__)
+
+derivative_pool = ProcessPoolExecutor(
+    max_workers=settings.derivative_workers,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+def render_derivatives(source: str | Path | BinaryIO) -> dict[str, bytes]:
+    """
+    Renders the derivative sizes of an image.
+
+    Each derivative fits in a square of its size (keeping the aspect ratio and
+    never upscaling) and is encoded as a progressive JPEG.
+
+    Args:
+        source (str | Path | BinaryIO): The path of the original image, or the
+            open file.
+
+    Returns:
+        dict[str, bytes]: The encoded derivatives by size name.
+
+    Raises:
+        PIL.UnidentifiedImageError: If the file is not a supported image.
+    """
+    largest = max(DERIVATIVE_SIZES.values())
+    with Image.open(source) as original:
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        derivatives = {}
+        for name, size in DERIVATIVE_SIZES.items():
+            derivative = image.copy()
+            derivative.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            derivative.save(
+                buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+            derivatives[name] = buffer.getvalue()
+    return derivatives
+
+
+async def create_derivatives(path: str | Path, name: str) -> dict[str, str]:
+    """
+    Renders and stores the derivatives of an uploaded photo.
+
+    Files that cannot be decoded as images get no derivatives; pages then fall
+    back to the original.
+
+    Args:
+        path (str | Path): The path of the original photo.
+        name (str): The name to store the derivatives under, e.g. the photo's
+            content hash.
+
+    Returns:
+        dict[str, str]: The derivative URLs keyed by `Photo` column, e.g.
+        `thumbnail_url`.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        rendered = await loop.run_in_executor(
+            derivative_pool, render_derivatives, str(path)
+        )
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning("Skipping derivatives for %s: %s", name, e)
+        return {}
+    urls = await asyncio.gather(
+        *(
+            storage.put(content, folder=f"derivatives/{size}", name=name)
+            for size, content in rendered.items()
+        )
+    )
+    return {f"{size}_url": url for size, url in zip(rendered, urls)}
@@ -0,0 +1,44 @@
+"""
+HTTP caching helpers.
+
+Responses whose body is known up front carry a strong ETag derived from the
+body; `etag_matches` evaluates a request's `If-None-Match` against it so the
+route can answer 304 Not Modified.
+"""
+
+import hashlib
+
+from fastapi import Request
+
+
+def content_etag(content: bytes) -> str:
+    """
+    Builds a strong ETag from a response body.
+
+    Args:
+        content (bytes): The response body.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Checks whether a request's `If-None-Match` header matches an ETag.
+
+    Weak validators are compared by their opaque tag, as GET requests allow.
+
+    Args:
+        request (Request): The request.
+        etag (str): The quoted ETag of the current representation.
+
+    Returns:
+        bool: Whether the client's copy is current.
+    """
+    if_none_match = {
+        tag.strip().removeprefix("W/")
+        for tag in request.headers.get("if-none-match", "").split(",")
+    }
+    return etag in if_none_match or "*" in if_none_match
@@ -0,0 +1,329 @@
+"""
+Background jobs.
+
+Deferred work is recorded as a `Job` row (the outbox) in the same transaction
+as the change that needs it, so a job exists exactly when that change was
+committed and it survives restarts:
+
+    @job_handler("create_qr_code")
+    async def create_qr_code(photo_id: int, photo_url: str): ...
+
+    enqueue(session, "create_qr_code", photo_id=photo.id, photo_url=url)
+    await session.commit()
+
+`job_worker` is started by the application lifespan. Its tasks claim due jobs
+with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of workers in any
+number of processes can share the table, and run the handler registered under
+the job's name. A claimed job is leased for `settings.job_lease_seconds`; if
+its worker dies the job is claimed again once the lease expires. Failed jobs
+are retried with exponential backoff and marked failed after
+`settings.job_max_attempts` attempts. Handlers may therefore run more than
+once and must be idempotent.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import SessionLocal
+from config.general import settings
+from src.models.models import Job
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+logger = logging.getLogger(__name__)
+
+job_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Registers a coroutine function as the handler of a job name.
+
+    Args:
+        name (str): The job name.
+
+    Returns:
+        Callable[[JobHandler], JobHandler]: A decorator returning the function
+        unchanged.
+    """
+
+    def register(func: JobHandler) -> JobHandler:
+        job_handlers[name] = func
+        return func
+
+    return register
+
+
+def enqueue(session: AsyncSession, name: str, delay: float = 0, **payload: Any) -> Job:
+    """
+    Adds a job to the session; it is stored when the session commits.
+
+    Args:
+        session (AsyncSession): The session of the triggering change.
+        name (str): The name of the job handler.
+        delay (float): Seconds to wait before the job may run.
+        **payload (Any): JSON-serializable keyword arguments of the handler.
+
+    Returns:
+        Job: The new job.
+    """
+    new_job = Job(name=name, payload=payload)
+    if delay:
+        new_job.run_at = _now() + timedelta(seconds=delay)
+    session.add(new_job)
+    return new_job
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobWorker:
+    """
+    Runs the jobs of the outbox with a pool of asyncio tasks.
+
+    Args:
+        session_factory (Callable[[], AsyncSession]): Creates the sessions
+            used to claim and settle jobs.
+        workers (int): The number of jobs run at the same time.
+        poll_interval (float): Seconds an idle task waits before looking for
+            due jobs again.
+        lease (float): Seconds a claimed job is reserved for its worker.
+        max_attempts (int): Attempts after which a failing job is marked failed.
+        backoff (float): Delay before the first retry in seconds, doubled
+            after every further attempt.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        workers: int,
+        poll_interval: float = 1,
+        lease: float = 300,
+        max_attempts: int = 5,
+        backoff: float = 5,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.running = 0
+        self._tasks: list[asyncio.Task] = []
+        self._stopping: asyncio.Event | None = None
+
+    def start(self) -> None:
+        """
+        Starts the worker tasks on the running event loop.
+        """
+        self._stopping = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{number}")
+            for number in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """
+        Lets the running jobs finish, then stops the worker tasks.
+
+        Jobs still running after `timeout` are cancelled; they are claimed
+        again once their lease expires.
+
+        Args:
+            timeout (float | None): Seconds to wait for the running jobs.
+        """
+        if not self._tasks:
+            return
+        self._stopping.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_next(self) -> bool:
+        """
+        Claims and runs one due job.
+
+        Returns:
+            bool: Whether a job was run.
+        """
+        claimed = await self._claim()
+        if claimed is None:
+            return False
+        job_id, name, payload, attempts = claimed
+        self.running += 1
+        try:
+            handler = job_handlers.get(name)
+            if handler is None:
+                raise LookupError(f"No handler for job {name!r}")
+            await handler(**payload)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, name)
+            await self._fail(job_id, attempts, f"{type(e).__name__}: {e}")
+        else:
+            await self._complete(job_id)
+        finally:
+            self.running -= 1
+        return True
+
+    async def counts(self) -> dict[str, int]:
+        """
+        Counts the jobs in the outbox by status.
+
+        Returns:
+            dict[str, int]: The number of pending, running and failed jobs.
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Job.status, func.count()).group_by(Job.status)
+            )
+            counts = dict.fromkeys((PENDING, RUNNING, FAILED), 0)
+            counts.update(dict(result.all()))
+            return counts
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of this worker.
+
+        Returns:
+            dict: The number of worker tasks, running jobs and succeeded,
+            retried and failed attempts.
+        """
+        return {
+            "workers": len(self._tasks),
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        Returns the delay before the next attempt of a job.
+
+        Args:
+            attempts (int): The number of attempts made so far.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return self.backoff * 2 ** (attempts - 1)
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Could not claim a job")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> tuple[int, str, dict, int] | None:
+        now = _now()
+        async with self.session_factory() as session:
+            # A job whose lease expired took its worker down with it; once it
+            # has used up its attempts it is failed rather than run again.
+            expired = await session.execute(
+                update(Job)
+                .where(
+                    Job.status == RUNNING,
+                    Job.locked_until < now,
+                    Job.attempts >= self.max_attempts,
+                )
+                .values(
+                    status=FAILED,
+                    locked_until=None,
+                    last_error="Lease expired: the worker stopped while running it",
+                )
+            )
+            if expired.rowcount:
+                await session.commit()
+                self.failed += expired.rowcount
+                logger.error(
+                    "Failed %d job(s) whose lease expired on the last attempt",
+                    expired.rowcount,
+                )
+            claimed = await session.scalar(
+                select(Job)
+                .where(
+                    or_(
+                        and_(Job.status == PENDING, Job.run_at <= now),
+                        and_(
+                            Job.status == RUNNING,
+                            Job.locked_until < now,
+                            Job.attempts < self.max_attempts,
+                        ),
+                    )
+                )
+                .order_by(Job.run_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if claimed is None:
+                return None
+            job_id, attempts = claimed.id, claimed.attempts + 1
+            name, payload = claimed.name, claimed.payload
+            # Guarded on the attempt count, so a job is claimed only once even
+            # where the database ignores SKIP LOCKED.
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.attempts == attempts - 1)
+                .values(
+                    status=RUNNING,
+                    attempts=attempts,
+                    locked_until=now + timedelta(seconds=self.lease),
+                )
+            )
+            await session.commit()
+            if result.rowcount != 1:
+                return None
+            return job_id, name, payload, attempts
+
+    async def _complete(self, job_id: int) -> None:
+        async with self.session_factory() as session:
+            await session.execute(delete(Job).where(Job.id == job_id))
+            await session.commit()
+        self.succeeded += 1
+
+    async def _fail(self, job_id: int, attempts: int, error: str) -> None:
+        if attempts >= self.max_attempts:
+            values = {"status": FAILED}
+            self.failed += 1
+        else:
+            run_at = _now() + timedelta(seconds=self.retry_delay(attempts))
+            values = {"status": PENDING, "run_at": run_at}
+            self.retried += 1
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(locked_until=None, last_error=error, **values)
+            )
+            await session.commit()
+
+
+job_worker = JobWorker(
+    SessionLocal,
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval_seconds,
+    lease=settings.job_lease_seconds,
+    max_attempts=settings.job_max_attempts,
+    backoff=settings.job_retry_backoff_seconds,
+)
@@ -0,0 +1,331 @@
+"""
+Outgoing email.
+
+Emails are sent through the module-level `mailer`, created once at startup
+over the backend selected with `settings.mail_backend`:
+
+- `SendGridBackend` sends through the SendGrid API with one reusable client.
+- `SMTPBackend` sends over SMTP, e.g. to a local sink such as MailHog or
+  `python -m aiosmtpd -n`, for development and benchmarks.
+- `MemoryBackend` keeps the messages in memory, for tests.
+
+`Mailer.send` does not block the event loop. Messages sent within
+`settings.mail_batch_window_seconds` of each other are handed to the backend
+as one batch, which runs in a bounded thread pool: SendGrid sends the messages
+of a batch that share subject and body in one request, and SMTP sends a batch
+over one connection. Transient failures are retried with exponential backoff;
+a batch that does not finish within `settings.mail_timeout_seconds` is failed
+rather than retried, as its worker thread may still be sending it.
+"""
+
+import asyncio
+import email.message
+import smtplib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.error import URLError
+
+import sendgrid
+from python_http_client import exceptions as http_exceptions
+from sendgrid.helpers.mail import Email, Mail, Personalization, To
+
+from config.general import settings
+
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+RETRYABLE_MAIL_ERRORS = (
+    http_exceptions.TooManyRequestsError,
+    http_exceptions.InternalServerError,
+    http_exceptions.ServiceUnavailableError,
+    http_exceptions.GatewayTimeoutError,
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    URLError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+@dataclass(frozen=True)
+class EmailMessage:
+    to: str
+    subject: str
+    html: str
+
+
+class MailBackend(ABC):
+    """
+    Interface of the mail backends.
+
+    Backends are called from the mailer's worker threads and may block.
+    """
+
+    max_batch_size: int = 1
+
+    @abstractmethod
+    def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """
+        Sends a batch of messages.
+
+        Args:
+            messages (list[EmailMessage]): At most `max_batch_size` messages.
+
+        Returns:
+            list[Exception | None]: For each message, the error that prevented
+            sending it, or None if it was sent.
+        """
+
+
+class SendGridBackend(MailBackend):
+    """
+    Sends through the SendGrid v3 API.
+
+    Messages with the same subject and body are sent in one request, with one
+    personalization per recipient so recipients do not see each other.
+
+    Args:
+        api_key (str): The SendGrid API key.
+        sender (str): The sender address.
+    """
+
+    max_batch_size = SENDGRID_MAX_PERSONALIZATIONS
+
+    def __init__(self, api_key: str, sender: str):
+        self.client = sendgrid.SendGridAPIClient(api_key)
+        self.sender = sender
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        groups: dict[tuple[str, str], list[int]] = {}
+        for index, message in enumerate(messages):
+            groups.setdefault((message.subject, message.html), []).append(index)
+
+        errors: list[Exception | None] = [None] * len(messages)
+        for (subject, html), indexes in groups.items():
+            mail = Mail(
+                from_email=Email(self.sender), subject=subject, html_content=html
+            )
+            for index in indexes:
+                personalization = Personalization()
+                personalization.add_to(To(messages[index].to))
+                mail.add_personalization(personalization)
+            try:
+                self.client.send(mail)
+            except Exception as e:
+                for index in indexes:
+                    errors[index] = e
+        return errors
+
+
+class SMTPBackend(MailBackend):
+    """
+    Sends over SMTP, one connection per batch.
+
+    Args:
+        host (str): The SMTP server host.
+        port (int): The SMTP server port.
+        sender (str): The sender address.
+        timeout (float): Socket timeout in seconds.
+    """
+
+    max_batch_size = 100
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        errors: list[Exception | None] = [None] * len(messages)
+        smtp = None
+        attempted = 0
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            for message in messages:
+                mime = email.message.EmailMessage()
+                mime["From"] = self.sender
+                mime["To"] = message.to
+                mime["Subject"] = message.subject
+                mime.set_content(message.html, subtype="html")
+                try:
+                    smtp.send_message(mime)
+                except (
+                    smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPResponseException,
+                ) as e:
+                    errors[attempted] = e
+                attempted += 1
+            smtp.quit()
+        except Exception as e:
+            # The connection failed: the messages sent before keep their
+            # result and the others get the error.
+            errors[attempted:] = [e] * (len(messages) - attempted)
+        finally:
+            if smtp is not None:
+                smtp.close()
+        return errors
+
+
+class MemoryBackend(MailBackend):
+    """
+    Keeps the sent messages in `outbox` instead of delivering them.
+    """
+
+    max_batch_size = 100
+
+    def __init__(self):
+        self.outbox: list[EmailMessage] = []
+        self.batches = 0
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        self.outbox.extend(messages)
+        self.batches += 1
+        return [None] * len(messages)
+
+
+class Mailer:
+    """
+    Sends emails through a backend without blocking the event loop.
+
+    Args:
+        backend (MailBackend): The backend that delivers the messages.
+        max_concurrency (int): The maximum number of batches sent at once.
+        batch_window (float): Seconds to collect messages into a batch.
+        timeout (float): Seconds to wait for a single batch attempt.
+        retries (int): How many times a transient failure is retried.
+        backoff (float): Delay before the first retry in seconds, doubled
+            after every further attempt.
+    """
+
+    def __init__(
+        self,
+        backend: MailBackend,
+        max_concurrency: int,
+        batch_window: float = 0.05,
+        timeout: float = 30,
+        retries: int = 0,
+        backoff: float = 0.5,
+    ):
+        self.backend = backend
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="mailer"
+        )
+        self._pending: list[tuple[EmailMessage, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._deliveries: set[asyncio.Task] = set()
+
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Sends a message.
+
+        Args:
+            message (EmailMessage): The message.
+
+        Raises:
+            Exception: Whatever the backend raised for the message on the last
+                attempt.
+        """
+        loop = asyncio.get_running_loop()
+        sent = loop.create_future()
+        self._pending.append((message, sent))
+        if len(self._pending) >= self.backend.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        await sent
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._deliver(batch))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, batch: list[tuple[EmailMessage, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            messages = [message for message, _ in batch]
+            sending = loop.run_in_executor(
+                self._executor, self.backend.send_batch, messages
+            )
+            finished, _ = await asyncio.wait({sending}, timeout=self.timeout)
+            if not finished:
+                # The worker thread cannot be stopped and may still deliver the
+                # messages, so they are failed instead of sent a second time.
+                error = TimeoutError(f"Mail batch not sent in {self.timeout}s")
+                for _, sent in batch:
+                    if not sent.done():
+                        sent.set_exception(error)
+                return
+            try:
+                errors = sending.result()
+            except Exception as e:
+                errors = [e] * len(batch)
+
+            retry = []
+            for (message, sent), error in zip(batch, errors):
+                if sent.done():
+                    continue
+                if error is None:
+                    sent.set_result(None)
+                elif attempt < self.retries and isinstance(
+                    error, RETRYABLE_MAIL_ERRORS
+                ):
+                    retry.append((message, sent))
+                else:
+                    sent.set_exception(error)
+            if not retry:
+                return
+            batch = retry
+            await asyncio.sleep(self.backoff * 2**attempt)
+
+    async def shutdown(self) -> None:
+        """
+        Sends the pending messages, waits for the batches being delivered and
+        stops the worker threads.
+        """
+        self._flush()
+        while self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+
+
+def get_mail_backend() -> MailBackend:
+    """
+    Creates the mail backend selected in the settings.
+
+    Returns:
+        MailBackend: The configured backend.
+
+    Raises:
+        ValueError: If `settings.mail_backend` is not a known backend.
+    """
+    if settings.mail_backend == "sendgrid":
+        return SendGridBackend(settings.sendgrid_api, settings.mail_sender)
+    if settings.mail_backend == "smtp":
+        return SMTPBackend(
+            settings.smtp_host,
+            settings.smtp_port,
+            settings.mail_sender,
+            settings.mail_timeout_seconds,
+        )
+    if settings.mail_backend == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown mail backend: {settings.mail_backend}")
+
+
+mailer = Mailer(
+    get_mail_backend(),
+    max_concurrency=settings.mail_max_concurrency,
+    batch_window=settings.mail_batch_window_seconds,
+    timeout=settings.mail_timeout_seconds,
+    retries=settings.mail_retries,
+)
@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) pagination.
+
+Listings are ordered newest first by `(created_at, id)` and paged with a
+`WHERE (created_at, id) < (:created_at, :id)` condition instead of `OFFSET`, so
+every page costs the same no matter how deep it is. Cursors are opaque
+URL-safe strings that encode the boundary row and the paging direction.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: int
+    direction: str
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+def encode_cursor(created_at: datetime, id: int, direction: str) -> str:
+    """
+    Encodes a page boundary into an opaque cursor.
+
+    Args:
+        created_at (datetime): The `created_at` of the boundary row.
+        id (int): The `id` of the boundary row.
+        direction (str): "next" to page towards older rows, "prev" towards newer.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    payload = json.dumps([created_at.isoformat(), id, direction])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        Cursor: The boundary row and paging direction.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return Cursor(datetime.fromisoformat(created_at), int(id), direction)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+async def paginate_keyset(
+    session: AsyncSession,
+    query: Select,
+    model,
+    cursor: str | None,
+    limit: int,
+) -> Page:
+    """
+    Fetches one page of a query ordered newest first by `(created_at, id)`.
+
+    Args:
+        session (AsyncSession): The database session.
+        query (Select): The filtered query for `model`, without ordering or limits.
+        model: The mapped class, which must have `created_at` and `id` columns.
+        cursor (str | None): A cursor from a previous page, or None for the first page.
+        limit (int): The page size.
+
+    Returns:
+        Page: The page's rows with cursors to the neighbouring pages.
+    """
+    created_at_column, id_column = model.created_at, model.id
+    key = tuple_(created_at_column, id_column)
+    boundary = decode_cursor(cursor) if cursor else None
+    backwards = boundary is not None and boundary.direction == "prev"
+
+    if boundary is None:
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+    elif backwards:
+        query = query.where(key > tuple_(boundary.created_at, boundary.id))
+        query = query.order_by(created_at_column.asc(), id_column.asc())
+    else:
+        query = query.where(key < tuple_(boundary.created_at, boundary.id))
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+
+    result = await session.execute(query.limit(limit + 1))
+    items = list(result.scalars().all())
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+
+    if not items:
+        return Page(items, None, None)
+    first, last = items[0], items[-1]
+    has_next = has_more if not backwards else True
+    has_prev = has_more if backwards else boundary is not None
+    return Page(
+        items,
+        encode_cursor(last.created_at, last.id, "next") if has_next else None,
+        encode_cursor(first.created_at, first.id, "prev") if has_prev else None,
+    )
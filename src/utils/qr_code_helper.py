@@ -1,22 +1,73 @@
+import asyncio
+import hashlib
 from io import BytesIO
 import qrcode
+import qrcode.image.svg
 
-import cloudinary.uploader
+from src.utils.storage import storage
 
+QR_BORDER = 4
+QR_BOX_SIZE = 10
+QR_DEFAULT_SIZE = 330
+QR_MIN_SIZE = 64
+QR_MAX_SIZE = 2048
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+QR_CACHE_CONTROL = "private, max-age=86400"
 
-def generate_qr_code(image_url: str):
+
+def render_qr_code(
+    image_url: str, image_format: str = "png", size: int | None = None
+) -> BytesIO:
+    """
+    Renders a QR code of a URL.
+
+    Args:
+        image_url (str): The URL to encode.
+        image_format (str): "png" or "svg".
+        size (int | None): The approximate width of a PNG in pixels; the
+            modules are scaled by a whole factor so the code stays sharp. SVG
+            codes are resolution independent and ignore it.
+
+    Returns:
+        BytesIO: The rewound image.
+    """
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
+        box_size=QR_BOX_SIZE,
+        border=QR_BORDER,
+        image_factory=(
+            qrcode.image.svg.SvgPathImage if image_format == "svg" else None
+        ),
     )
     qr.add_data(image_url)
     qr.make(fit=True)
+    if size and image_format != "svg":
+        qr.box_size = max(1, size // (qr.modules_count + 2 * QR_BORDER))
 
-    img = qr.make_image(fill_color="black", back_color="white")
     img_io = BytesIO()
-    img.save(img_io, "PNG")
+    if image_format == "svg":
+        qr.make_image().save(img_io)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
+        img.save(img_io, "PNG")
     img_io.seek(0)
-    uploaded_image_url = cloudinary.uploader.upload(img_io, folder="qr_codes/")
-    return uploaded_image_url["secure_url"]
+    return img_io
+
+
+async def generate_qr_code(image_url: str) -> str:
+    """
+    Renders a PNG QR code of a URL and stores it.
+
+    The code is stored under a hash of the URL, so generating it again for the
+    same URL reuses the stored file.
+
+    Args:
+        image_url (str): The URL to encode.
+
+    Returns:
+        str: The public URL of the stored QR code.
+    """
+    img_io = await asyncio.to_thread(render_qr_code, image_url)
+    name = hashlib.sha256(image_url.encode()).hexdigest()
+    return await storage.put(img_io, folder="qr_codes", name=name)
@@ -0,0 +1,357 @@
+"""
+Media storage backends.
+
+Photos, avatars and QR codes are stored through a `StorageBackend`, and the
+models keep the public URL that `put` returns. Two backends exist:
+
+- `CloudinaryStorage` uploads to Cloudinary and uses its URL-based transforms.
+- `LocalStorage` writes files under `settings.media_root`. They are served by
+  the static files mount at `settings.media_url`, and transforms are rendered
+  with Pillow and stored next to the originals.
+
+The backend is selected with `settings.storage_backend` ("cloudinary" or
+"local"); the rest of the app only talks to the module-level `storage`.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO
+
+from cloudinary.utils import cloudinary_url
+from PIL import Image, ImageFilter, ImageOps
+
+from config.general import settings
+from src.utils.cloudinary_helper import (
+    CloudinaryClient,
+    cloudinary_client,
+    get_cloudinary_image_id,
+)
+
+IMAGE_SIGNATURES = {
+    ".png": re.compile(rb"\x89PNG\r\n\x1a\n"),
+    ".jpg": re.compile(rb"\xff\xd8\xff"),
+    ".gif": re.compile(rb"GIF8[79]a"),
+    ".webp": re.compile(rb"RIFF....WEBP", re.DOTALL),
+}
+
+SAFE_PATH_PART = re.compile(r"[A-Za-z0-9_-]+")
+
+LOCAL_EFFECTS = {
+    "grayscale": ImageOps.grayscale,
+    "blur": lambda image: image.filter(ImageFilter.BLUR),
+    "sharpen": lambda image: image.filter(ImageFilter.SHARPEN),
+}
+
+
+class StorageBackend(ABC):
+    """
+    Interface of the media storage backends.
+    """
+
+    @abstractmethod
+    async def put(
+        self,
+        file: bytes | BinaryIO,
+        folder: str | None = None,
+        name: str | None = None,
+        overwrite: bool = False,
+    ) -> str:
+        """
+        Stores a file.
+
+        Args:
+            file (bytes | BinaryIO): The file content or an open binary file.
+            folder (str | None): The folder to store the file in.
+            name (str | None): The file name without extension; a unique name
+                is generated if omitted.
+            overwrite (bool): Whether to replace an existing file of that name;
+                otherwise the existing file is kept and its URL returned, so
+                content-addressed names store each file only once.
+
+        Returns:
+            str: The public URL of the stored file.
+        """
+
+    @abstractmethod
+    async def get(self, url: str) -> bytes:
+        """
+        Reads a stored file.
+
+        Args:
+            url (str): The public URL returned by `put`.
+
+        Returns:
+            bytes: The file content.
+        """
+
+    @abstractmethod
+    async def download(self, url: str, file: BinaryIO) -> None:
+        """
+        Copies a stored file into an open file without holding it in memory.
+
+        Args:
+            url (str): The public URL returned by `put`.
+            file (BinaryIO): The file to write the content to.
+        """
+
+    @abstractmethod
+    async def delete(self, url: str) -> None:
+        """
+        Deletes a stored file. Deleting a missing file is not an error.
+
+        Args:
+            url (str): The public URL returned by `put`.
+        """
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """
+        Builds the public URL of a stored file.
+
+        Args:
+            key (str): The file's path within the storage, e.g. "avatars/alice".
+
+        Returns:
+            str: The public URL.
+        """
+
+    @abstractmethod
+    async def transform(self, url: str, **transformation) -> str:
+        """
+        Returns the URL of a resized or filtered version of a stored image.
+
+        Args:
+            url (str): The public URL of the original image.
+            **transformation: Any of `width`, `height`, `crop` ("fill", "fit",
+                "limit" or "scale") and `effect`.
+
+        Returns:
+            str: The public URL of the transformed image.
+
+        Raises:
+            ValueError: If the URL or the transformation is not supported.
+        """
+
+
+class CloudinaryStorage(StorageBackend):
+    """
+    Stores media on Cloudinary.
+
+    Args:
+        client (CloudinaryClient): The client that runs the SDK calls.
+    """
+
+    def __init__(self, client: CloudinaryClient):
+        self.client = client
+
+    async def put(self, file, folder=None, name=None, overwrite=False) -> str:
+        options = {}
+        if name:
+            options["public_id"] = f"{folder}/{name}" if folder else name
+            options["overwrite"] = overwrite
+        elif folder:
+            options["folder"] = folder
+        result = await self.client.upload(file, **options)
+        return result["secure_url"]
+
+    async def get(self, url: str) -> bytes:
+        def download():
+            with urllib.request.urlopen(url, timeout=self.client.timeout) as response:
+                return response.read()
+
+        return await asyncio.to_thread(download)
+
+    async def download(self, url: str, file: BinaryIO) -> None:
+        def copy():
+            with urllib.request.urlopen(url, timeout=self.client.timeout) as response:
+                shutil.copyfileobj(response, file)
+
+        await asyncio.to_thread(copy)
+
+    async def delete(self, url: str) -> None:
+        image_id = get_cloudinary_image_id(url)
+        if image_id:
+            await self.client.destroy(re.sub(r"^v\d+/", "", image_id))
+
+    def url(self, key: str) -> str:
+        return cloudinary_url(key)[0]
+
+    async def transform(self, url: str, **transformation) -> str:
+        image_id = get_cloudinary_image_id(url)
+        if not image_id:
+            raise ValueError("Invalid Cloudinary URL")
+        transformed_url, _ = cloudinary_url(image_id, transformation=transformation)
+        return transformed_url
+
+
+class LocalStorage(StorageBackend):
+    """
+    Stores media on the local filesystem.
+
+    Files are written atomically under `root` and served from `base_url` by the
+    static files mount, so responses are sent straight from disk without
+    passing through the application.
+
+    Args:
+        root (str): The directory the files are stored in.
+        base_url (str): The URL path `root` is served from.
+        max_dimension (int): The largest width or height a transformation
+            may render.
+    """
+
+    def __init__(self, root: str, base_url: str, max_dimension: int = 4000):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.max_dimension = max_dimension
+
+    async def put(self, file, folder=None, name=None, overwrite=False) -> str:
+        return await asyncio.to_thread(self._write, file, folder, name, overwrite)
+
+    async def get(self, url: str) -> bytes:
+        return await asyncio.to_thread(self._path(url).read_bytes)
+
+    async def download(self, url: str, file: BinaryIO) -> None:
+        def copy():
+            with self._path(url).open("rb") as source:
+                shutil.copyfileobj(source, file)
+
+        await asyncio.to_thread(copy)
+
+    async def delete(self, url: str) -> None:
+        await asyncio.to_thread(self._path(url).unlink, missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    async def transform(self, url: str, **transformation) -> str:
+        source = self._path(url)
+        transformation = {k: v for k, v in transformation.items() if v is not None}
+        effect = transformation.get("effect")
+        if effect is not None and effect not in LOCAL_EFFECTS:
+            raise ValueError(f"Unsupported effect: {effect}")
+        for dimension in ("width", "height"):
+            value = transformation.get(dimension)
+            if value is not None and not 1 <= value <= self.max_dimension:
+                raise ValueError(
+                    f"{dimension.capitalize()} must be between 1 and "
+                    f"{self.max_dimension}"
+                )
+        version = (await asyncio.to_thread(source.stat)).st_mtime_ns
+        digest = hashlib.sha256(
+            f"{url}|{version}|{sorted(transformation.items())}".encode()
+        ).hexdigest()[:32]
+        key = f"transformed/{digest}{source.suffix}"
+        target = self.root / key
+        if not target.exists():
+            await asyncio.to_thread(self._render, source, target, **transformation)
+        return self.url(key)
+
+    def _path(self, url: str) -> Path:
+        prefix = f"{self.base_url}/"
+        if not url.startswith(prefix):
+            raise ValueError("Not a local media URL")
+        path = (self.root / url[len(prefix) :].split("?", 1)[0]).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError("Not a local media URL")
+        return path
+
+    def _write(self, file, folder, name, overwrite) -> str:
+        parts = (folder.split("/") if folder else []) + ([name] if name else [])
+        if not all(SAFE_PATH_PART.fullmatch(part) for part in parts):
+            raise ValueError("Invalid folder or file name")
+        directory = (self.root / folder if folder else self.root).resolve()
+        if not directory.is_relative_to(self.root):
+            raise ValueError("Invalid folder or file name")
+        directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp_file:
+            if isinstance(file, (bytes, bytearray)):
+                tmp_file.write(file)
+            else:
+                shutil.copyfileobj(file, tmp_file)
+        with open(tmp_file.name, "rb") as written:
+            head = written.read(16)
+        extension = next(
+            (
+                ext
+                for ext, signature in IMAGE_SIGNATURES.items()
+                if signature.match(head)
+            ),
+            "",
+        )
+        target = (directory / f"{name or uuid.uuid4().hex}{extension}").resolve()
+        if not target.is_relative_to(self.root):
+            os.remove(tmp_file.name)
+            raise ValueError("Invalid folder or file name")
+        if target.exists() and not overwrite:
+            os.remove(tmp_file.name)
+            return self.url(target.relative_to(self.root).as_posix())
+        os.chmod(tmp_file.name, 0o644)
+        os.replace(tmp_file.name, target)
+        return self.url(target.relative_to(self.root).as_posix())
+
+    @staticmethod
+    def _render(
+        source: Path,
+        target: Path,
+        width=None,
+        height=None,
+        crop=None,
+        effect=None,
+        **unsupported,
+    ):
+        if unsupported:
+            raise ValueError(f"Unsupported transformation: {', '.join(unsupported)}")
+        with Image.open(source) as original:
+            image_format = original.format
+            image = ImageOps.exif_transpose(original)
+            if width or height:
+                size = (
+                    width or round(image.width * height / image.height),
+                    height or round(image.height * width / image.width),
+                )
+                if crop == "fill":
+                    image = ImageOps.fit(image, size)
+                elif crop == "fit":
+                    image = ImageOps.contain(image, size)
+                elif crop == "limit":
+                    image.thumbnail(size)
+                else:
+                    image = image.resize(size)
+            if effect:
+                image = LOCAL_EFFECTS[effect](image)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+            image.save(tmp_path, format=image_format)
+            os.replace(tmp_path, target)
+
+
+def get_storage() -> StorageBackend:
+    """
+    Creates the storage backend selected in the settings.
+
+    Returns:
+        StorageBackend: The configured backend.
+
+    Raises:
+        ValueError: If `settings.storage_backend` is not a known backend.
+    """
+    if settings.storage_backend == "cloudinary":
+        return CloudinaryStorage(cloudinary_client)
+    if settings.storage_backend == "local":
+        return LocalStorage(
+            settings.media_root,
+            settings.media_url,
+            max_dimension=settings.transform_max_dimension,
+        )
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+
+storage = get_storage()
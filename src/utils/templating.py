@@ -0,0 +1,102 @@
+"""
+Shared Jinja templates.
+
+Pages (`templates/`) and emails (`src/templates/`) are rendered from one
+`template_env`; `templates` wraps it for `TemplateResponse`. The environment:
+
+- looks templates up by absolute path, so rendering does not depend on the
+  working directory;
+- keeps compiled templates in a bytecode cache shared by the workers and
+  across restarts (`settings.template_cache_dir`, a temporary directory by
+  default);
+- checks template files for changes only when `settings.template_auto_reload`
+  is set, which is meant for development.
+
+`warm_templates` is called by the application lifespan. It compiles every
+template before the first request, so a template with a syntax error stops
+the startup instead of failing a request.
+"""
+
+import logging
+from pathlib import Path
+from typing import Sequence
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
+
+from config.general import settings
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+TEMPLATE_DIRS = (BASE_DIR / "templates", BASE_DIR / "src" / "templates")
+TEMPLATE_EXTENSIONS = ("html",)
+
+logger = logging.getLogger(__name__)
+
+
+def truncatechars(value: str = "1", length: int = 35):
+    if len(value) > length:
+        return value[:length] + "..."
+    return value
+
+
+def create_template_env(
+    directories: Sequence[str | Path],
+    auto_reload: bool = False,
+    cache_dir: str | None = None,
+) -> Environment:
+    """
+    Creates a template environment.
+
+    Args:
+        directories (Sequence[str | Path]): The template directories, searched
+            in order.
+        auto_reload (bool): Whether to recompile templates whose file changed.
+        cache_dir (str | None): The bytecode cache directory; a temporary
+            directory if omitted.
+
+    Returns:
+        Environment: The environment with the app's filters registered.
+    """
+    env = Environment(
+        loader=ChoiceLoader([FileSystemLoader(path) for path in directories]),
+        autoescape=select_autoescape(),
+        auto_reload=auto_reload,
+        bytecode_cache=FileSystemBytecodeCache(cache_dir),
+        cache_size=-1,
+    )
+    env.filters["truncatechars"] = truncatechars
+    return env
+
+
+def warm_templates(env: Environment) -> int:
+    """
+    Compiles and caches all templates of an environment.
+
+    Args:
+        env (Environment): The environment.
+
+    Returns:
+        int: The number of compiled templates.
+
+    Raises:
+        jinja2.TemplateSyntaxError: If a template does not compile.
+    """
+    names = env.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    for name in names:
+        env.get_template(name)
+    logger.info("Compiled %d templates", len(names))
+    return len(names)
+
+
+template_env = create_template_env(
+    TEMPLATE_DIRS,
+    auto_reload=settings.template_auto_reload,
+    cache_dir=settings.template_cache_dir,
+)
+templates = Jinja2Templates(env=template_env)
@@ -0,0 +1,132 @@
+"""
+Upload ingestion.
+
+Uploaded files reach the storage backend as file handles, never as bytes:
+
+1. `UploadSizeLimitMiddleware` rejects request bodies larger than the upload
+   limit with 413, before the form is parsed when a `Content-Length` is sent
+   and as soon as the limit is crossed otherwise.
+2. The multipart parser spools each file to a temporary file that stays in
+   memory up to 1 MB and rolls over to disk beyond that.
+3. `ingest_upload` reads the spooled file in chunks to enforce the per-file
+   limit and compute its SHA-256, then rewinds it and returns the handle.
+
+Peak memory per concurrent upload is therefore bounded by the spool size and
+the chunk size, not by the size of the photo.
+"""
+
+import hashlib
+from typing import BinaryIO, NamedTuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.general import settings
+
+CHUNK_SIZE = 64 * 1024
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class IngestedUpload(NamedTuple):
+    file: BinaryIO
+    size: int
+    sha256: str
+    content_type: str | None
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File is larger than {max_size} bytes",
+    )
+
+
+async def ingest_upload(
+    file: UploadFile, max_size: int | None = None
+) -> IngestedUpload:
+    """
+    Validates an uploaded file and prepares it for the storage backend.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_size (int | None): The size limit in bytes; defaults to
+            `settings.upload_max_bytes`.
+
+    Returns:
+        IngestedUpload: The rewound file handle with its size, SHA-256 and
+        content type.
+
+    Raises:
+        HTTPException: 400 if the file is empty, 413 if it is too large.
+    """
+    max_size = settings.upload_max_bytes if max_size is None else max_size
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while chunk := await file.read(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            raise _too_large(max_size)
+        digest.update(chunk)
+    if not size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file"
+        )
+    await file.seek(0)
+    return IngestedUpload(file.file, size, digest.hexdigest(), file.content_type)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies larger than `max_body_size` with 413.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        max_body_size (int | None): The body size limit in bytes; defaults to
+            the upload limit plus room for the other form fields.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int | None = None):
+        self.app = app
+        self.max_body_size = (
+            settings.upload_max_bytes + FORM_OVERHEAD_BYTES
+            if max_body_size is None
+            else max_body_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            content_length = int(headers.get(b"content-length", 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            response = JSONResponse(
+                {"detail": "Invalid Content-Length header"},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+            await response(scope, receive, send)
+            return
+        if content_length > self.max_body_size:
+            exc = _too_large(self.max_body_size)
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise _too_large(self.max_body_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,96 @@
+"""
+Anonymous page cache.
+
+Web pages that look the same for every visitor who is not logged in opt in
+with the `cached_page` decorator. For requests without an `access_token`
+cookie, the rendered page is kept in `page_cache` under its path and query
+string for `settings.page_cache_ttl_seconds` and served with a strong ETag;
+a matching `If-None-Match` gets 304 Not Modified. Logged-in visitors always
+get a freshly rendered page.
+
+Every write to photos, tags or comments must register `invalidate_pages` with
+`config.db.on_commit`, so pages are dropped once the write is stored. Other
+workers keep their pages until the short TTL expires.
+"""
+
+import functools
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response, status
+
+from config.general import settings
+from src.utils.cache import TTLCache
+from src.utils.http import content_etag, etag_matches
+
+AUTH_COOKIE = "access_token"
+
+page_cache = TTLCache(
+    maxsize=settings.page_cache_max_size,
+    ttl=settings.page_cache_ttl_seconds,
+)
+
+
+def page_key(request: Request) -> str:
+    """
+    Builds the cache key of a page.
+
+    Args:
+        request (Request): The page request.
+
+    Returns:
+        str: The path and the sorted query string.
+    """
+    query = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{query}"
+
+
+def cached_page(
+    endpoint: Callable[..., Awaitable[Response]],
+) -> Callable[..., Awaitable[Response]]:
+    """
+    Serves an HTML route from the page cache for anonymous visitors.
+
+    The route must take the request as a `request` parameter. Only 200
+    responses are cached.
+
+    Args:
+        endpoint (Callable[..., Awaitable[Response]]): The route function.
+
+    Returns:
+        Callable[..., Awaitable[Response]]: The wrapped route function, with
+        the same signature for FastAPI.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs) -> Response:
+        request: Request = kwargs["request"]
+        if not settings.page_cache_ttl_seconds or AUTH_COOKIE in request.cookies:
+            return await endpoint(*args, **kwargs)
+
+        key = page_key(request)
+        cached = page_cache.get(key)
+        if cached is None:
+            response = await endpoint(*args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (content_etag(response.body), response.body, response.media_type)
+            page_cache.set(key, cached)
+        etag, body, media_type = cached
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={settings.page_cache_ttl_seconds}",
+            "Vary": "Cookie",
+        }
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(body, media_type=media_type, headers=headers)
+
+    return wrapper
+
+
+def invalidate_pages() -> None:
+    """
+    Drops all cached pages of this worker.
+    """
+    page_cache.clear()
@@ -0,0 +1,146 @@
+"""
+Rendered HTML fragments.
+
+List pages are assembled from photo cards and the home page sidebar, rendered
+through the `photo_card` and `sidebar` template globals. Each fragment is
+rendered once and then served from `fragment_cache`, keyed by the partial,
+the photo ID and a version. The version is made of the fields the fragment
+shows (description, image, owner, tags, first comment), so an edit of any of
+them produces a new key and a stale card is never served, even by workers
+that did not see the change.
+
+Replaced versions are dropped by LRU eviction and
+`settings.fragment_cache_ttl_seconds`. Changes to a photo should also call
+`invalidate_fragments` so the current worker frees them immediately.
+"""
+
+from typing import Iterable
+
+from markupsafe import Markup
+
+from config.general import settings
+from src.models.models import Comment, Photo, Tag, User
+from src.utils.cache import TTLCache
+from src.utils.templating import template_env
+
+PHOTO_CARD = "partials/photo_card.html"
+PHOTO_CARD_COMPACT = "partials/photo_card_compact.html"
+SIDEBAR = "partials/sidebar.html"
+
+fragment_cache = TTLCache(
+    maxsize=settings.fragment_cache_max_size,
+    ttl=settings.fragment_cache_ttl_seconds,
+)
+
+
+def photo_card_version(photo: Photo, compact: bool = False) -> tuple:
+    """
+    Returns the fields of a photo shown on its card.
+
+    Args:
+        photo (Photo): A photo loaded with the `photo_card` profile.
+        compact (bool): Whether the card is the compact home page variant,
+            which shows no tags and comments.
+
+    Returns:
+        tuple: The version of the card.
+    """
+    version = (
+        photo.description,
+        photo.thumbnail_url or photo.url_link,
+        photo.owner.username,
+    )
+    if compact:
+        return version
+    comment = (
+        (photo.comments[0].user.username, photo.comments[0].content)
+        if photo.comments
+        else None
+    )
+    return version + (tuple(tag.name for tag in photo.tags), comment)
+
+
+def render_fragment(name: str, key: tuple, **context) -> Markup:
+    """
+    Renders a partial template, or returns its cached HTML.
+
+    Args:
+        name (str): The partial template.
+        key (tuple): Identifies the rendered data, including its version.
+        **context: The template context.
+
+    Returns:
+        Markup: The HTML, marked safe for inclusion in the page.
+    """
+    cache_key = (name, *key)
+    html = fragment_cache.get(cache_key)
+    if html is None:
+        html = template_env.get_template(name).render(**context)
+        fragment_cache.set(cache_key, html)
+    return Markup(html)
+
+
+def photo_card(photo: Photo, compact: bool = False) -> Markup:
+    """
+    Renders the card of a photo.
+
+    Args:
+        photo (Photo): A photo loaded with the `photo_card` profile.
+        compact (bool): Whether to render the compact home page variant.
+
+    Returns:
+        Markup: The card HTML.
+    """
+    name = PHOTO_CARD_COMPACT if compact else PHOTO_CARD
+    version = photo_card_version(photo, compact)
+    return render_fragment(name, (photo.id, version), photo=photo)
+
+
+def sidebar(
+    popular_users: Iterable[User],
+    popular_tags: Iterable[Tag],
+    recent_comments: Iterable[Comment],
+) -> Markup:
+    """
+    Renders the home page sidebar.
+
+    Args:
+        popular_users (Iterable[User]): The most active users.
+        popular_tags (Iterable[Tag]): The most used tags.
+        recent_comments (Iterable[Comment]): The latest comments.
+
+    Returns:
+        Markup: The sidebar HTML.
+    """
+    popular_users = list(popular_users)
+    popular_tags = list(popular_tags)
+    recent_comments = list(recent_comments)
+    version = (
+        tuple((user.username, user.avatar_url) for user in popular_users),
+        tuple(tag.name for tag in popular_tags),
+        tuple(
+            (comment.photo_id, comment.user.username, comment.content)
+            for comment in recent_comments
+        ),
+    )
+    return render_fragment(
+        SIDEBAR,
+        (None, version),
+        popular_users=popular_users,
+        popular_tags=popular_tags,
+        recent_comments=recent_comments,
+    )
+
+
+def invalidate_fragments(*photo_ids: int) -> None:
+    """
+    Drops the cached cards of the given photos.
+
+    Args:
+        *photo_ids (int): IDs of photos whose cards are stale.
+    """
+    stale = set(photo_ids)
+    fragment_cache.discard_where(lambda key: key[1] in stale)
+
+
+template_env.globals.update(photo_card=photo_card, sidebar=sidebar)
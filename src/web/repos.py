@@ -1,38 +1,107 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 
-from src.auth.repos import UserRepository
-from src.auth.utils import decode_access_token
+from src.auth.utils import decode_access_token, get_principal
 from src.models.models import Photo, User
 from src.models.models import Comment
+from src.models.loaders import loader_profile
 from src.tags.repos import TagRepository
 
+MAIN_PAGE_PHOTOS = 12
+MAIN_PAGE_SIDEBAR_ITEMS = 3
+
 
 class TagWebRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_all_photos(self):
-        photos = await self.db.execute(select(Photo).order_by(desc(Photo.created_at)))
-        result = photos.scalars().all()
-        print("Photos:", result)
-        return result
+    async def get_latest_photos(self, limit: int = MAIN_PAGE_PHOTOS):
+        """
+        Retrieves the most recently uploaded photos with their owners.
 
-    async def get_data_for_main_page(self):
-        tag_repo = TagRepository(self.db)
+        Args:
+            limit (int): The maximum number of photos to return.
+
+        Returns:
+            list[Photo]: The newest photos, newest first.
+        """
+        photos = await self.db.execute(
+            select(Photo)
+            .options(*loader_profile("photo_tile"))
+            .order_by(desc(Photo.created_at), desc(Photo.id))
+            .limit(limit)
+        )
+        return photos.scalars().all()
+
+    async def get_popular_users(self, limit: int = MAIN_PAGE_SIDEBAR_ITEMS):
+        """
+        Retrieves the users with the most photos.
+
+        Args:
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            list[User]: The users ordered by photo count, highest first.
+        """
+        photo_counts = (
+            select(Photo.owner_id, func.count(Photo.id).label("photo_count"))
+            .group_by(Photo.owner_id)
+            .order_by(desc("photo_count"), Photo.owner_id)
+            .limit(limit)
+            .subquery()
+        )
+        users = await self.db.execute(
+            select(User)
+            .join(photo_counts, photo_counts.c.owner_id == User.id)
+            .order_by(desc(photo_counts.c.photo_count), User.id)
+        )
+        return users.scalars().all()
+
+    async def get_popular_tags(self, limit: int = MAIN_PAGE_SIDEBAR_ITEMS):
+        """
+        Retrieves the tags attached to the most photos.
 
-        users = await self.db.execute(select(User))
-        photos = await self.get_all_photos()
-        popular_tags = await tag_repo.get_all_tags()
-        popular_users = users.scalars().all()
-        recent_comments = await self.get_all_commets()
+        Args:
+            limit (int): The maximum number of tags to return.
+
+        Returns:
+            list[Tag]: The tags ordered by photo count, highest first.
+        """
+        return await TagRepository(self.db).get_popular_tags(limit, rows=True)
+
+    async def get_recent_comments(self, limit: int = MAIN_PAGE_SIDEBAR_ITEMS):
+        """
+        Retrieves the most recent comments with their authors.
+
+        Args:
+            limit (int): The maximum number of comments to return.
+
+        Returns:
+            list[Comment]: The newest comments, newest first.
+        """
+        comments = await self.db.execute(
+            select(Comment)
+            .options(*loader_profile("comment_feed"))
+            .order_by(desc(Comment.created_at), desc(Comment.id))
+            .limit(limit)
+        )
+        return comments.scalars().all()
+
+    async def get_data_for_main_page(self):
+        """
+        Retrieves the bounded data sets rendered on the main page.
 
-        return users, photos, popular_tags, popular_users, recent_comments
+        Returns:
+            tuple: The latest photos, popular users, popular tags and recent
+            comments.
+        """
+        photos = await self.get_latest_photos()
+        popular_users = await self.get_popular_users()
+        popular_tags = await self.get_popular_tags()
+        recent_comments = await self.get_recent_comments()
 
-    async def get_all_commets(self):
-        commets = await self.db.execute(select(Comment))
-        return commets.scalars().all()
+        return photos, popular_users, popular_tags, recent_comments
 
     async def get_current_user_cookies(self, request):
         token = request.cookies.get("access_token")
@@ -41,7 +110,6 @@ class TagWebRepository:
         else:
             return None
         if user is not None:
-            user_repo = UserRepository(self.db)
-            user = await user_repo.get_user_by_username(user.username)
+            user = await get_principal(self.db, user.username)
 
         return user
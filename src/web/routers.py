@@ -1,7 +1,5 @@
-from tempfile import NamedTemporaryFile
 from typing import Optional
 from datetime import datetime
-import os
 
 from fastapi import (
     Depends,
@@ -14,49 +12,37 @@ from fastapi import (
     status,
 )
 from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func
-from sqlalchemy import insert
-from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.utils.cloudinary_helper import upload_photo_to_cloudinary
-from src.utils.qr_code_helper import generate_qr_code
+from src.utils.storage import storage
+from src.utils.templating import templates
+from src.utils.uploads import ingest_upload
+from src.web.cache import cached_page, invalidate_pages
 from src.web.repos import TagWebRepository
+from src.web import fragments  # noqa: F401 - registers photo_card and sidebar
 from src.auth.pass_utils import verify_password
 from src.auth.repos import UserRepository
 from src.auth.utils import create_access_token, create_refresh_token
 from src.comments.repos import CommentsRepository
-from src.models.models import Photo, photo_tags
+from src.models.models import Photo
 from src.photos.repos import PhotoRepository
 from src.tags.repos import TagRepository
-from config.db import get_db
+from config.db import get_db, get_read_db, on_commit, pin_to_primary
 
 router = APIRouter()
 
-templates = Jinja2Templates(directory="templates")
-
-
-def truncatechars(value: str = "1", length: int = 35):
-    if len(value) > length:
-        return value[:length] + "..."
-    return value
-
-
-templates.env.filters["truncatechars"] = truncatechars
-
 
 @router.get("/")
+@cached_page
 async def read_root(
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
 
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
-    users, photos, popular_tags, popular_users, recent_comments = (
+    photos, popular_users, popular_tags, recent_comments = (
         await tag_web_repo.get_data_for_main_page()
     )
     return templates.TemplateResponse(
@@ -82,7 +68,7 @@ async def create_tag(tag_name: str = Form(...), db: AsyncSession = Depends(get_d
 
     tag_repo = TagRepository(db)
     await tag_repo.create_tag(name=tag_name)
-    return RedirectResponse("/web/tags/", status_code=302)
+    return pin_to_primary(RedirectResponse("/web/tags/", status_code=302))
 
 
 @router.get(
@@ -91,7 +77,8 @@ async def create_tag(tag_name: str = Form(...), db: AsyncSession = Depends(get_d
     description="""This endpoint retrieves all tags stored in the database.
     It returns a list of all tag objects.""",
 )
-async def get_all_tags(request: Request, db: AsyncSession = Depends(get_db)):
+@cached_page
+async def get_all_tags(request: Request, db: AsyncSession = Depends(get_read_db)):
     error_message = request.query_params.get("error", "")
     if error_message == "no_permission":
         return HTMLResponse(
@@ -99,7 +86,7 @@ async def get_all_tags(request: Request, db: AsyncSession = Depends(get_db)):
         )
 
     tag_repo = TagRepository(db)
-    tags = await tag_repo.get_all_tags()
+    tags = await tag_repo.get_all_tags(rows=True)
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
     return templates.TemplateResponse(
@@ -126,15 +113,21 @@ async def delete_tag_by_name(
     tag_repo = TagRepository(db)
     await tag_repo.delete_tag_by_name(tag_name)
 
-    return RedirectResponse("/web/tags/", status_code=302)
+    return pin_to_primary(RedirectResponse("/web/tags/", status_code=302))
 
 
 @router.get("/tags/{tag_name}/photos/")
+@cached_page
 async def get_photos_by_tag(
-    request: Request, tag_name: str, db: AsyncSession = Depends(get_db)
+    request: Request,
+    tag_name: str,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     tag_repo = TagRepository(db)
-    photos = await tag_repo.get_photos_by_tag(tag_name)
+    tag = await tag_repo.get_tag_by_name(tag_name)
+    photo_repo = PhotoRepository(db)
+    page = await photo_repo.get_photos_page(cursor, tag_id=tag.id, profile="photo_card")
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
     return templates.TemplateResponse(
@@ -142,7 +135,9 @@ async def get_photos_by_tag(
         {
             "request": request,
             "title": tag_name.capitalize(),
-            "photos": photos,
+            "photos": page.items,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
             "user": user,
         },
     )
@@ -154,14 +149,21 @@ async def login(request: Request):
 
 
 @router.get("/page/{username}")
-async def page(request: Request, username: str, db: AsyncSession = Depends(get_db)):
+async def page(
+    request: Request,
+    username: str,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
     user_repo = UserRepository(db)
     user_page = await user_repo.get_user_by_username(username)
     date_obj = datetime.fromisoformat(str(user_page.created_at))
     date_of_registration = date_obj.strftime("%d-%m-%Y")
     photo_repo = PhotoRepository(db)
-    photos = await photo_repo.get_users_all_photos(user_page)
-    amount_of_photos = len(photos)
+    photos_page = await photo_repo.get_photos_page(
+        cursor, owner_id=user_page.id, profile="photo_card"
+    )
+    amount_of_photos = await photo_repo.count_photos(owner_id=user_page.id)
 
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
@@ -171,7 +173,9 @@ async def page(request: Request, username: str, db: AsyncSession = Depends(get_d
             "request": request,
             "user_page": user_page,
             "user": user,
-            "photos": photos,
+            "photos": photos_page.items,
+            "next_cursor": photos_page.next_cursor,
+            "prev_cursor": photos_page.prev_cursor,
             "Date_reg": date_of_registration,
             "amount_of_photos": amount_of_photos,
         },
@@ -179,11 +183,12 @@ async def page(request: Request, username: str, db: AsyncSession = Depends(get_d
 
 
 @router.get("/photo/{photo_id}")
+@cached_page
 async def photo_page(
-    request: Request, photo_id: int, db: AsyncSession = Depends(get_db)
+    request: Request, photo_id: int, db: AsyncSession = Depends(get_read_db)
 ):
     photo_repo = PhotoRepository(db)
-    photo = await photo_repo.get_photo_by_id(photo_id)
+    photo = await photo_repo.get_photo_by_id(photo_id, profile="photo_detail")
 
     if not photo:
         raise HTTPException(
@@ -191,7 +196,6 @@ async def photo_page(
             detail=f"Photo with id {photo_id} not found",
         )
 
-    photo.created_at = photo.created_at.isoformat()
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
     return templates.TemplateResponse(
@@ -200,7 +204,7 @@ async def photo_page(
 
 
 @router.get("/photos/upload_photo/")
-async def upload_photo(request: Request, db: AsyncSession = Depends(get_db)):
+async def upload_photo(request: Request, db: AsyncSession = Depends(get_read_db)):
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
     return templates.TemplateResponse(
@@ -222,63 +226,35 @@ async def upload_photo(
     if user is None:
         return RedirectResponse(url="/web/tags/?error=no_permission", status_code=302)
 
-    if tags:
-        tags = [tag.strip() for tag in tags.split(",")]
+    tags = [tag.strip() for tag in tags.split(",")] if tags else []
 
     if len(tags) > 5:
         raise HTTPException(status_code=400, detail="Maximum of 5 tags allowed")
 
+    upload = await ingest_upload(file)
     try:
-        with NamedTemporaryFile(delete=False) as tmp_file:
-            tmp_file.write(file.file.read())
-            tmp_file_path = tmp_file.name
-            cloudinary_url = await upload_photo_to_cloudinary(file)
-    except Exception as e:
-        if os.path.exists(tmp_file_path):
-            os.remove(tmp_file_path)
-        raise HTTPException(
-            status_code=500, detail=f"Error uploading to Cloudinary: {str(e)}"
+        photo_url = await storage.put(
+            upload.file, folder="user_photos", name=upload.sha256
         )
-    finally:
-        tmp_file.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error uploading photo: {str(e)}")
 
-    qr_core_url = generate_qr_code(cloudinary_url)
     new_photo = Photo(
-        url_link=cloudinary_url,
+        url_link=photo_url,
         description=description,
         owner_id=user.id,
-        qr_core_url=qr_core_url,
     )
 
     db.add(new_photo)
-    await db.commit()
-    await db.refresh(new_photo)
+    await db.flush()
+    photo_repo = PhotoRepository(db)
+    await photo_repo.add_tags(new_photo.id, tags)
+    photo_repo.enqueue_photo_jobs(new_photo.id, photo_url)
+    on_commit(db, invalidate_pages)
 
-    tag_repo = TagRepository(db)
-    if tags:
-        for tag in tags:
-            new_tag = await tag_repo.get_tag_by_name(tag)
-            if new_tag:
-                await db.refresh(new_photo)
-                await db.refresh(new_tag)
-                stmt = insert(photo_tags).values(
-                    photo_id=new_photo.id, tag_id=new_tag.id
-                )
-                await db.execute(stmt)
-            else:
-                tag = await tag_repo.create_tag(tag)
-                await db.refresh(new_photo)
-                await db.refresh(tag)
-                stmt = insert(photo_tags).values(photo_id=new_photo.id, tag_id=tag.id)
-                await db.execute(stmt)
-
-    await db.commit()
-    await db.refresh(new_photo)
-
-    if os.path.exists(tmp_file_path):
-        os.remove(tmp_file_path)
-
-    return RedirectResponse(f"/web/page/{user.username}", status_code=302)
+    return pin_to_primary(
+        RedirectResponse(f"/web/page/{user.username}", status_code=302)
+    )
 
 
 @router.post("/photos/delete/{photo_id}")
@@ -289,12 +265,14 @@ async def delete_photo_by_id(
     user = await tag_web_repo.get_current_user_cookies(request)
 
     photo_repo = PhotoRepository(db)
-    photo = await photo_repo.get_photo_by_id(photo_id)
+    photo = await photo_repo.get_photo_by_id(photo_id, profile="photo_card")
     username = photo.owner.username
     if photo:
         if user.id == photo.owner.id or user.role_id not in [1, 2]:
             await photo_repo.delete_photo(photo_id)
-            return RedirectResponse(url=f"/web/page/{username}", status_code=302)
+            return pin_to_primary(
+                RedirectResponse(url=f"/web/page/{username}", status_code=302)
+            )
         else:
             return RedirectResponse(
                 url="/web/tags/?error=no_permission", status_code=302
@@ -313,7 +291,9 @@ async def create_comment_html(
     if user:
         comment_repo = CommentsRepository(db)
         await comment_repo.create_comment(user.id, photo_id, comment_content)
-        return RedirectResponse(url=f"/web/photo/{photo_id}", status_code=302)
+        return pin_to_primary(
+            RedirectResponse(url=f"/web/photo/{photo_id}", status_code=302)
+        )
     else:
         return RedirectResponse(url="/web/tags/?error=no_permission", status_code=302)
 
@@ -331,14 +311,16 @@ async def delete_own_comment_html(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
         )
-    if comment.user_id != user.id or user.role not in [1, 2]:
+    if comment.user_id != user.id and user.role_id not in [1, 2]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You cannot delete this comment",
         )
     await comment_repo.delete_comment(comment_id)
 
-    return RedirectResponse(url=f"/web/photo/{comment.photo_id}", status_code=302)
+    return pin_to_primary(
+        RedirectResponse(url=f"/web/photo/{comment.photo_id}", status_code=302)
+    )
 
 
 @router.post("/login/login")
@@ -374,41 +356,23 @@ async def logout():
 
 @router.get("/photos/photos/")
 async def get_photos(
-    request: Request, page: int = 1, db: AsyncSession = Depends(get_db)
+    request: Request,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     tag_web_repo = TagWebRepository(db)
     user = await tag_web_repo.get_current_user_cookies(request)
 
-    photos_per_page = 20
-    offset = (page - 1) * photos_per_page
-
-    photos_query = (
-        select(Photo)
-        .options(
-            selectinload(Photo.owner),
-            selectinload(Photo.tags),
-            selectinload(Photo.comments),
-        )
-        .order_by(Photo.created_at.desc())
-        .offset(offset)
-        .limit(photos_per_page)
-    )
-    result = await db.execute(photos_query)
-    photos = result.scalars().all()
-
-    total_photos_query = select(func.count(Photo.id))
-    total_photos_result = await db.execute(total_photos_query)
-    total_photos = total_photos_result.scalar()
-
-    total_pages = (total_photos + photos_per_page - 1) // photos_per_page
+    photo_repo = PhotoRepository(db)
+    page = await photo_repo.get_photos_page(cursor, profile="photo_card")
     return templates.TemplateResponse(
         "all_photos.html",
         {
             "title": "Photos",
             "request": request,
-            "photos": photos,
-            "current_page": page,
-            "total_pages": total_pages,
+            "photos": page.items,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
             "user": user,
         },
     )
@@ -38,8 +38,9 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(created_user.role_id, mock_user_role.id)
         self.assertFalse(created_user.is_active)
         self.mock_session.add.assert_called_once_with(created_user)
-        self.mock_session.commit.assert_called_once()
-        self.mock_session.refresh.assert_called_once_with(created_user)
+        self.mock_session.flush.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
+        self.mock_session.refresh.assert_not_called()
         mock_get_role_by_name.assert_called_once_with(RoleEnum.ADMIN)
 
     @patch("src.auth.repos.AsyncSession")
@@ -129,7 +130,8 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
             "test@example.com", new_avatar_url
         )
         self.assertEqual(updated_user.avatar_url, new_avatar_url)
-        self.mock_session.commit.assert_called_once()
+        self.mock_session.flush.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
         self.mock_session.add.assert_called_once_with(updated_user)
 
     @patch("src.auth.repos.UserRepository.get_user_by_email")
@@ -139,8 +141,8 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
         await self.user_repo.activate_user(mock_user)
         assert mock_user.is_active is True
         self.mock_session.add.assert_called_once_with(mock_user)
-        self.mock_session.commit.assert_called_once()
-        self.mock_session.refresh.assert_called_once_with(mock_user)
+        self.mock_session.flush.assert_awaited_once()
+        self.mock_session.refresh.assert_not_called()
 
     @patch("src.auth.repos.UserRepository.get_user_by_email")
     async def test_update_user_password(self, MockGetUserByEmail):
@@ -153,7 +155,8 @@ class TestUserRepository(unittest.IsolatedAsyncioTestCase):
         new_hashed_password = "new_hashed_password"
         await self.user_repo.update_user_password(mock_user, new_hashed_password)
         self.assertEqual(mock_user.hashed_password, new_hashed_password)
-        self.mock_session.commit.assert_called_once()
+        self.mock_session.flush.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
         self.mock_session.add.assert_not_called()
 
 
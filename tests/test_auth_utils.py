@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException, status
+
+from src.auth.cache import principal_cache, invalidate_principal
+from src.auth.schemas import Principal, RoleEnum
+from src.auth.utils import (
+    RoleChecker,
+    check_user_banned,
+    create_access_token,
+    get_current_user,
+)
+
+
+def make_principal(**kwargs):
+    data = dict(
+        id=1,
+        username="testuser",
+        email="test@example.com",
+        role_name=RoleEnum.USER.value,
+        is_active=True,
+        is_banned=False,
+    )
+    data.update(kwargs)
+    return Principal(**data)
+
+
+class TestGetCurrentUser(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        principal_cache.clear()
+
+    @patch("src.auth.utils.UserRepository.get_principal_by_username")
+    async def test_get_current_user(self, mock_get_principal):
+        principal = make_principal()
+        mock_get_principal.return_value = principal
+        token = create_access_token(data={"sub": "testuser"})
+        result = await get_current_user(token, AsyncMock())
+        self.assertEqual(result, principal)
+        mock_get_principal.assert_awaited_once_with("testuser")
+
+    @patch("src.auth.utils.UserRepository.get_principal_by_username")
+    async def test_get_current_user_cached(self, mock_get_principal):
+        principal = make_principal()
+        mock_get_principal.return_value = principal
+        token = create_access_token(data={"sub": "testuser"})
+        await get_current_user(token, AsyncMock())
+        result = await get_current_user(token, AsyncMock())
+        self.assertEqual(result, principal)
+        mock_get_principal.assert_awaited_once_with("testuser")
+
+        invalidate_principal("testuser")
+        await get_current_user(token, AsyncMock())
+        self.assertEqual(mock_get_principal.await_count, 2)
+
+    @patch("src.auth.utils.UserRepository.get_principal_by_username")
+    async def test_get_current_user_invalid_token(self, mock_get_principal):
+        with self.assertRaises(HTTPException) as context:
+            await get_current_user("invalid", AsyncMock())
+        self.assertEqual(context.exception.status_code, status.HTTP_401_UNAUTHORIZED)
+        mock_get_principal.assert_not_called()
+
+
+class TestRoleChecker(unittest.IsolatedAsyncioTestCase):
+
+    async def test_allowed_role(self):
+        principal = make_principal(role_name=RoleEnum.MODERATOR.value)
+        checker = RoleChecker([RoleEnum.ADMIN, RoleEnum.MODERATOR])
+        user, is_admin_or_moderator = await checker(principal)
+        self.assertEqual(user, principal)
+        self.assertTrue(is_admin_or_moderator)
+
+    async def test_forbidden_role(self):
+        checker = RoleChecker([RoleEnum.ADMIN])
+        with self.assertRaises(HTTPException) as context:
+            await checker(make_principal())
+        self.assertEqual(context.exception.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_check_user_banned(self):
+        with self.assertRaises(HTTPException) as context:
+            await check_user_banned(make_principal(is_banned=True))
+        self.assertEqual(context.exception.status_code, status.HTTP_403_FORBIDDEN)
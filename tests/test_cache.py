@@ -0,0 +1,91 @@
+import unittest
+
+from src.photos.cache import (
+    invalidate_transforms,
+    normalize_transformation,
+    transform_cache,
+    transform_key,
+)
+from src.utils.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expires_entries(self):
+        timer = FakeTimer()
+        cache = TTLCache(maxsize=10, ttl=30, timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        timer.now = 45
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_pop(self):
+        cache = TTLCache(maxsize=10)
+        cache.set("a", 1)
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIsNone(cache.pop("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_discard_where(self):
+        cache = TTLCache(maxsize=10)
+        for key in ("a1", "a2", "b1"):
+            cache.set(key, 1)
+        self.assertEqual(cache.discard_where(lambda key: key.startswith("a")), 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("b1"), 1)
+
+
+class TestTransformCache(unittest.TestCase):
+
+    def tearDown(self):
+        transform_cache.clear()
+
+    def test_normalized_keys_match(self):
+        first = normalize_transformation(width=100, height=None, crop="Fill ")
+        second = normalize_transformation(crop="fill", width=100, effect=None)
+        self.assertEqual(first, {"crop": "fill", "width": 100})
+        self.assertEqual(transform_key(1, first), transform_key(1, second))
+        self.assertNotEqual(transform_key(1, first), transform_key(2, second))
+
+    def test_invalidate_transforms(self):
+        transform_cache.set(transform_key(1, {"width": 10}), "a")
+        transform_cache.set(transform_key(1, {}), "b")
+        transform_cache.set(transform_key(2, {}), "c")
+        invalidate_transforms(1)
+        self.assertEqual(len(transform_cache), 1)
+        self.assertEqual(transform_cache.get(transform_key(2, {})), "c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import time
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+import cloudinary.exceptions
+
+from src.utils.cloudinary_helper import CloudinaryClient
+
+
+class TestCloudinaryClient(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = CloudinaryClient(
+            max_concurrency=2, timeout=1, retries=2, backoff=0
+        )
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload(self, mock_upload):
+        mock_upload.return_value = {"secure_url": "https://cloudinary.com/a.jpg"}
+        result = await self.client.upload(b"image", folder="user_photos/")
+        self.assertEqual(result["secure_url"], "https://cloudinary.com/a.jpg")
+        mock_upload.assert_called_once_with(b"image", folder="user_photos/")
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload_does_not_block_event_loop(self, mock_upload):
+        mock_upload.side_effect = lambda *args, **kwargs: time.sleep(0.3) or {}
+        started = time.monotonic()
+        upload = asyncio.create_task(self.client.upload(b"image"))
+        await asyncio.sleep(0.01)
+        self.assertLess(time.monotonic() - started, 0.2)
+        await upload
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload_retries_transient_errors(self, mock_upload):
+        file = BytesIO(b"image")
+        mock_upload.side_effect = [
+            cloudinary.exceptions.GeneralError("Server error"),
+            {"secure_url": "https://cloudinary.com/a.jpg"},
+        ]
+        file.read()
+        result = await self.client.upload(file)
+        self.assertEqual(result["secure_url"], "https://cloudinary.com/a.jpg")
+        self.assertEqual(mock_upload.call_count, 2)
+        self.assertEqual(file.tell(), 0)
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload_gives_up_after_retries(self, mock_upload):
+        mock_upload.side_effect = cloudinary.exceptions.RateLimited("Slow down")
+        with self.assertRaises(cloudinary.exceptions.RateLimited):
+            await self.client.upload(b"image")
+        self.assertEqual(mock_upload.call_count, 3)
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload_does_not_retry_client_errors(self, mock_upload):
+        mock_upload.side_effect = cloudinary.exceptions.BadRequest("Invalid image")
+        with self.assertRaises(cloudinary.exceptions.BadRequest):
+            await self.client.upload(b"image")
+        mock_upload.assert_called_once()
+
+    @patch("cloudinary.uploader.upload")
+    async def test_upload_timeout(self, mock_upload):
+        mock_upload.side_effect = lambda *args, **kwargs: time.sleep(0.3) or {}
+        self.client.timeout = 0.05
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.upload(b"image")
+        mock_upload.assert_called_once()
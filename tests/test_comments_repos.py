@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import AsyncMock, MagicMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.models import Comment
 from src.comments.repos import CommentsRepository
+from src.web.cache import invalidate_pages
 
 
 class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
@@ -14,8 +15,7 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
         # Arrange
         mock_session = MagicMock()
         mock_session.add = MagicMock()
-        mock_session.commit = AsyncMock()
-        mock_session.refresh = AsyncMock()
+        mock_session.flush = AsyncMock()
 
         repo = CommentsRepository(mock_session)
         user_id = 1
@@ -26,7 +26,9 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
         expected_comment = Comment(user_id=user_id, photo_id=photo_id, content=content)
 
         # Mock повернення ID для коментаря
-        mock_session.refresh.side_effect = lambda obj: setattr(obj, "id", 1)
+        mock_session.flush.side_effect = lambda: setattr(
+            mock_session.add.call_args[0][0], "id", 1
+        )
 
         # Act
         result = await repo.create_comment(user_id, photo_id, content)
@@ -38,8 +40,8 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
             mock_session.add.call_args[0][0], Comment
         )  # Перевіряємо тип об'єкта
 
-        mock_session.commit.assert_awaited_once()
-        mock_session.refresh.assert_awaited_once()
+        mock_session.flush.assert_awaited_once()
+        mock_session.commit.assert_not_called()
 
         # Перевіряємо атрибути поверненого об'єкта
         self.assertEqual(result.user_id, user_id)
@@ -47,11 +49,20 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.content, content)
         self.assertEqual(result.id, 1)
 
+    @patch("src.comments.repos.on_commit")
+    async def test_create_comment_invalidates_pages_on_commit(self, on_commit):
+        mock_session = MagicMock()
+        mock_session.flush = AsyncMock()
+
+        await CommentsRepository(mock_session).create_comment(1, 2, "Test comment")
+
+        on_commit.assert_called_once_with(mock_session, invalidate_pages)
+
     async def test_create_comment_sqlalchemy_error(self):
         # Arrange
         mock_session = MagicMock()
         mock_session.add = MagicMock()
-        mock_session.commit = AsyncMock(
+        mock_session.flush = AsyncMock(
             side_effect=SQLAlchemyError("DB error")
         )  # Симуляція помилки
 
@@ -65,8 +76,7 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
             await repo.create_comment(user_id, photo_id, content)
 
         mock_session.add.assert_called_once()  # Перевірка, що add викликався
-        mock_session.commit.assert_awaited_once()  # commit теж викликано
-        mock_session.refresh.assert_not_called()  # refresh не викликано через помилку
+        mock_session.flush.assert_awaited_once()  # flush теж викликано
 
     async def test_get_comments_by_user_success(self):
         # Arrange
@@ -133,6 +143,7 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
             id=1, user_id=1, photo_id=2, content="Old content", updated_at=None
         )
         mock_session.get.return_value = comment
+        mock_session.info = {}
 
         repo = CommentsRepository(mock_session)
         comment_id = 1
@@ -144,7 +155,8 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
 
         # Assert
         mock_session.get.assert_awaited_once_with(Comment, comment_id)
-        mock_session.commit.assert_awaited_once()
+        mock_session.flush.assert_awaited_once()
+        mock_session.commit.assert_not_called()
         self.assertEqual(result.content, new_content)
         self.assertIsNotNone(result.updated_at)
 
@@ -168,6 +180,7 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
         mock_session = AsyncMock()
         comment = Comment(id=1, user_id=1, photo_id=2, content="Content to delete")
         mock_session.get.return_value = comment
+        mock_session.info = {}
 
         repo = CommentsRepository(mock_session)
         comment_id = 1
@@ -178,7 +191,8 @@ class TestCommentsRepository(unittest.IsolatedAsyncioTestCase):
         # Assert
         mock_session.get.assert_awaited_once_with(Comment, comment_id)
         mock_session.delete.assert_awaited_once_with(comment)
-        mock_session.commit.assert_awaited_once()
+        mock_session.flush.assert_awaited_once()
+        mock_session.commit.assert_not_called()
 
     async def test_delete_comment_not_found(self):
         # Arrange
@@ -0,0 +1,82 @@
+import io
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from src.utils.derivatives import (
+    DERIVATIVE_SIZES,
+    create_derivatives,
+    render_derivatives,
+)
+from src.utils.storage import LocalStorage
+
+
+def make_image(size=(3000, 1500), mode="RGB", image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, size).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class TestRenderDerivatives(unittest.TestCase):
+
+    def test_sizes(self):
+        derivatives = render_derivatives(io.BytesIO(make_image()))
+        self.assertEqual(set(derivatives), set(DERIVATIVE_SIZES))
+        for name, size in DERIVATIVE_SIZES.items():
+            image = Image.open(io.BytesIO(derivatives[name]))
+            self.assertEqual(image.format, "JPEG")
+            self.assertEqual(image.size, (size, size // 2))
+
+    def test_does_not_upscale(self):
+        derivatives = render_derivatives(
+            io.BytesIO(make_image((300, 200), mode="RGBA"))
+        )
+        for content in derivatives.values():
+            image = Image.open(io.BytesIO(content))
+            self.assertEqual(image.size, (300, 200))
+            self.assertEqual(image.mode, "RGB")
+
+
+class TestCreateDerivatives(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.media_root.name, "/media")
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        patcher_storage = patch("src.utils.derivatives.storage", self.storage)
+        patcher_pool = patch("src.utils.derivatives.derivative_pool", self.pool)
+        patcher_storage.start()
+        patcher_pool.start()
+        self.addCleanup(patcher_storage.stop)
+        self.addCleanup(patcher_pool.stop)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.media_root.cleanup()
+
+    def write_original(self, content):
+        path = Path(self.media_root.name) / "original"
+        path.write_bytes(content)
+        return path
+
+    async def test_stores_derivatives(self):
+        path = self.write_original(make_image((800, 600)))
+        urls = await create_derivatives(path, "abc")
+        self.assertEqual(
+            urls,
+            {
+                "thumbnail_url": "/media/derivatives/thumbnail/abc.jpg",
+                "medium_url": "/media/derivatives/medium/abc.jpg",
+                "full_url": "/media/derivatives/full/abc.jpg",
+            },
+        )
+        thumbnail = await self.storage.get(urls["thumbnail_url"])
+        self.assertEqual(Image.open(io.BytesIO(thumbnail)).size, (400, 300))
+
+    async def test_skips_non_images(self):
+        path = self.write_original(b"not an image")
+        self.assertEqual(await create_derivatives(path, "abc"), {})
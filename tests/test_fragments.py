@@ -0,0 +1,104 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.utils.templating import template_env
+from src.web.fragments import (
+    PHOTO_CARD,
+    fragment_cache,
+    invalidate_fragments,
+    photo_card,
+    sidebar,
+)
+
+
+def make_photo(photo_id=1, description="sunset", tags=("sea",), comments=()):
+    return SimpleNamespace(
+        id=photo_id,
+        description=description,
+        thumbnail_url=f"/media/thumbnail/{photo_id}.jpg",
+        url_link=f"/media/{photo_id}.jpg",
+        owner=SimpleNamespace(username="alice"),
+        tags=[SimpleNamespace(name=name) for name in tags],
+        comments=list(comments),
+    )
+
+
+class TestPhotoCard(unittest.TestCase):
+
+    def setUp(self):
+        fragment_cache.clear()
+
+    def tearDown(self):
+        fragment_cache.clear()
+
+    def test_renders_card(self):
+        html = photo_card(make_photo(description="<b>sunset</b>"))
+        self.assertIn('href="/web/photo/1"', html)
+        self.assertIn("#sea", html)
+        self.assertIn("&lt;b&gt;sunset&lt;/b&gt;", html)
+
+    def test_card_is_rendered_once(self):
+        template = template_env.get_template(PHOTO_CARD)
+        with patch.object(template, "render", wraps=template.render) as render:
+            first = photo_card(make_photo())
+            second = photo_card(make_photo())
+        self.assertEqual(first, second)
+        render.assert_called_once()
+
+    def test_changed_fields_render_a_new_card(self):
+        photo_card(make_photo())
+        changes = [
+            make_photo(description="dawn"),
+            make_photo(tags=("sea", "sky")),
+            make_photo(
+                comments=[
+                    SimpleNamespace(user=SimpleNamespace(username="bob"), content="wow")
+                ]
+            ),
+        ]
+        for photo in changes:
+            self.assertNotEqual(photo_card(photo), photo_card(make_photo()))
+        self.assertIn("wow", photo_card(changes[-1]))
+
+    def test_compact_card_is_cached_separately(self):
+        full = photo_card(make_photo())
+        compact = photo_card(make_photo(), compact=True)
+        self.assertNotEqual(full, compact)
+        self.assertNotIn("card-tags", compact)
+        self.assertEqual(len(fragment_cache), 2)
+
+    def test_invalidate_drops_cards_of_photo(self):
+        photo_card(make_photo(photo_id=1))
+        photo_card(make_photo(photo_id=1), compact=True)
+        photo_card(make_photo(photo_id=2))
+        invalidate_fragments(1)
+        self.assertEqual(len(fragment_cache), 1)
+
+
+class TestSidebar(unittest.TestCase):
+
+    def setUp(self):
+        fragment_cache.clear()
+
+    def tearDown(self):
+        fragment_cache.clear()
+
+    def test_sidebar_is_cached_by_content(self):
+        users = [SimpleNamespace(username="alice", avatar_url=None)]
+        tags = [SimpleNamespace(name="sea")]
+        comments = [
+            SimpleNamespace(
+                photo_id=1, user=SimpleNamespace(username="bob"), content="nice"
+            )
+        ]
+        html = sidebar(users, tags, comments)
+        self.assertIn("#sea", html)
+        self.assertEqual(sidebar(users, tags, comments), html)
+        self.assertEqual(len(fragment_cache), 1)
+        sidebar(users, [SimpleNamespace(name="sky")], comments)
+        self.assertEqual(len(fragment_cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import Base
+from src.comments.repos import CommentsRepository
+from src.models.models import Tag
+from src.photos.repos import PhotoRatingRepository, PhotoRepository
+from src.tags.repos import TagRepository
+from src.web.repos import TagWebRepository
+
+
+class TestHotQueriesUseIndexes(unittest.IsolatedAsyncioTestCase):
+    """
+    Runs the statements the repositories build through SQLite's
+    `EXPLAIN QUERY PLAN` against the schema of the models, which declares the
+    same indexes as the migrations.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        Base.metadata.create_all(cls.engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def setUp(self):
+        self.session = AsyncMock(spec=AsyncSession)
+        self.session.execute.return_value = MagicMock()
+
+    def executed(self):
+        return self.session.execute.await_args.args[0]
+
+    def assertUsesIndexes(self, statement, sorted_by_index=True):
+        sql = statement.compile(
+            dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        with self.engine.connect() as conn:
+            plan = [
+                row.detail for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+            ]
+        for step in plan:
+            if step.startswith(("SCAN", "SEARCH")):
+                self.assertIn("USING", step, plan)
+            if sorted_by_index:
+                self.assertNotIn("TEMP B-TREE", step, plan)
+
+    async def test_photos_page(self):
+        await PhotoRepository(self.session).get_photos_page()
+        self.assertUsesIndexes(self.executed())
+
+    async def test_photos_page_of_owner(self):
+        await PhotoRepository(self.session).get_photos_page(owner_id=1)
+        self.assertUsesIndexes(self.executed())
+
+    async def test_photos_page_of_tag(self):
+        await PhotoRepository(self.session).get_photos_page(tag_id=1)
+        # Only the photos of the tag are sorted.
+        self.assertUsesIndexes(self.executed(), sorted_by_index=False)
+
+    async def test_photos_by_tag(self):
+        repo = TagRepository(self.session)
+        repo.get_tag_by_name = AsyncMock(return_value=Tag(id=1, name="cats"))
+        await repo.get_photos_by_tag("cats")
+        self.assertUsesIndexes(self.executed())
+
+    async def test_comments_by_photo_and_user(self):
+        repo = CommentsRepository(self.session)
+        await repo.get_comments_by_photo(1)
+        self.assertUsesIndexes(self.executed())
+        await repo.get_comments_by_user(1)
+        self.assertUsesIndexes(self.executed())
+
+    async def test_recent_comments(self):
+        await TagWebRepository(self.session).get_recent_comments()
+        self.assertUsesIndexes(self.executed())
+
+    async def test_rating_existence_check(self):
+        self.session.scalar.return_value = 1
+        with self.assertRaises(HTTPException):
+            await PhotoRatingRepository(self.session).add_and_update_rating(1, 2, 4)
+        self.assertUsesIndexes(self.session.scalar.await_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
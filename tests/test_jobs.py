@@ -0,0 +1,166 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config.db import Base
+from src.models.models import Job
+from src.utils.jobs import (
+    FAILED,
+    PENDING,
+    RUNNING,
+    JobWorker,
+    enqueue,
+    job_handler,
+    job_handlers,
+)
+
+
+def make_session_factory():
+    session = AsyncMock()
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = session
+    return session_factory, session
+
+
+class TestEnqueue(unittest.TestCase):
+
+    def test_adds_job_to_session(self):
+        session = MagicMock()
+        new_job = enqueue(session, "send_email", email="a@x.io", email_body="hi")
+        session.add.assert_called_once_with(new_job)
+        self.assertIsInstance(new_job, Job)
+        self.assertEqual(new_job.name, "send_email")
+        self.assertEqual(new_job.payload, {"email": "a@x.io", "email_body": "hi"})
+        self.assertIsNone(new_job.run_at)
+
+    def test_delay(self):
+        new_job = enqueue(MagicMock(), "send_email", delay=60)
+        self.assertGreater(new_job.run_at, datetime.now(timezone.utc))
+
+
+class TestJobWorker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.session_factory, self.session = make_session_factory()
+        self.worker = JobWorker(
+            self.session_factory, workers=2, poll_interval=0.01, max_attempts=3
+        )
+        self.handler = AsyncMock()
+        job_handler("test_job")(self.handler)
+        self.addCleanup(job_handlers.pop, "test_job")
+
+    def claim(self, name="test_job", attempts=1):
+        return patch.object(
+            self.worker,
+            "_claim",
+            new_callable=AsyncMock,
+            return_value=(7, name, {"value": 1}, attempts),
+        )
+
+    async def test_runs_claimed_job(self):
+        with self.claim():
+            self.assertTrue(await self.worker.run_next())
+        self.handler.assert_awaited_once_with(value=1)
+        self.assertEqual(self.worker.stats()["succeeded"], 1)
+        self.session.commit.assert_awaited_once()
+
+    async def test_nothing_to_run(self):
+        with patch.object(self.worker, "_claim", new_callable=AsyncMock) as claim:
+            claim.return_value = None
+            self.assertFalse(await self.worker.run_next())
+
+    async def test_failed_job_is_retried_with_backoff(self):
+        self.handler.side_effect = ConnectionError("down")
+        with self.claim(attempts=2), self.assertLogs("src.utils.jobs", "ERROR"):
+            await self.worker.run_next()
+        params = self.session.execute.await_args.args[0].compile().params
+        self.assertEqual(params["status"], PENDING)
+        self.assertEqual(params["last_error"], "ConnectionError: down")
+        self.assertGreater(params["run_at"], datetime.now(timezone.utc))
+        self.assertEqual(self.worker.stats()["retried"], 1)
+
+    async def test_job_fails_after_max_attempts(self):
+        self.handler.side_effect = ConnectionError("down")
+        with self.claim(attempts=3), self.assertLogs("src.utils.jobs", "ERROR"):
+            await self.worker.run_next()
+        params = self.session.execute.await_args.args[0].compile().params
+        self.assertEqual(params["status"], FAILED)
+        self.assertEqual(self.worker.stats()["failed"], 1)
+
+    async def test_unknown_job_fails(self):
+        with self.claim(name="missing"), self.assertLogs("src.utils.jobs", "ERROR"):
+            await self.worker.run_next()
+        params = self.session.execute.await_args.args[0].compile().params
+        self.assertIn("LookupError", params["last_error"])
+
+    def test_retry_delay(self):
+        self.assertEqual(
+            [self.worker.retry_delay(attempts) for attempts in (1, 2, 3)],
+            [5, 10, 20],
+        )
+
+    async def test_start_and_stop(self):
+        with patch.object(self.worker, "run_next", new_callable=AsyncMock) as run:
+            run.return_value = False
+            self.worker.start()
+            self.assertEqual(self.worker.stats()["workers"], 2)
+            await asyncio.sleep(0.05)
+            await self.worker.stop(timeout=1)
+        self.assertEqual(self.worker.stats()["workers"], 0)
+        run.assert_awaited()
+
+
+class TestExpiredLeases(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession)
+        self.worker = JobWorker(self.session_factory, workers=1, max_attempts=3)
+        async with self.session_factory() as session:
+            enqueue(session, "test_job")
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def expire_lease(self):
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job).values(
+                    locked_until=datetime.now(timezone.utc) - timedelta(seconds=1)
+                )
+            )
+            await session.commit()
+
+    async def job(self):
+        async with self.session_factory() as session:
+            return await session.get(Job, 1)
+
+    async def test_job_that_keeps_losing_its_lease_fails(self):
+        for attempts in (1, 2, 3):
+            claimed = await self.worker._claim()
+            self.assertEqual(claimed[3], attempts)
+            self.assertIsNone(await self.worker._claim())
+            await self.expire_lease()
+
+        with self.assertLogs("src.utils.jobs", "ERROR"):
+            self.assertIsNone(await self.worker._claim())
+        job = await self.job()
+        self.assertEqual((job.status, job.attempts), (FAILED, 3))
+        self.assertIsNone(job.locked_until)
+        self.assertIn("Lease expired", job.last_error)
+        self.assertEqual(self.worker.stats()["failed"], 1)
+
+    async def test_expired_lease_is_reclaimed_before_max_attempts(self):
+        await self.worker._claim()
+        await self.expire_lease()
+        self.assertEqual(await self.worker._claim(), (1, "test_job", {}, 2))
+        job = await self.job()
+        self.assertEqual((job.status, job.attempts), (RUNNING, 2))
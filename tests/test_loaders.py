@@ -0,0 +1,22 @@
+import unittest
+
+from sqlalchemy import inspect
+
+from src.models.loaders import LOADER_PROFILES, loader_profile
+from src.models.models import User, Photo, Comment, Tag, PhotoRating, Role
+
+
+class TestLoaderProfiles(unittest.TestCase):
+
+    def test_relationships_are_not_loaded_implicitly(self):
+        for model in (User, Photo, Comment, Tag, PhotoRating, Role):
+            for relationship in inspect(model).relationships:
+                self.assertEqual(relationship.lazy, "raise", str(relationship))
+
+    def test_loader_profile_returns_options(self):
+        self.assertIs(loader_profile("photo_card"), LOADER_PROFILES["photo_card"])
+        self.assertEqual(len(loader_profile("auth")), 1)
+
+    def test_unknown_loader_profile(self):
+        with self.assertRaises(ValueError):
+            loader_profile("everything")
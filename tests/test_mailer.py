@@ -0,0 +1,194 @@
+import asyncio
+import smtplib
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from python_http_client.exceptions import BadRequestsError
+
+from src.utils.mailer import (
+    EmailMessage,
+    Mailer,
+    MemoryBackend,
+    SendGridBackend,
+    SMTPBackend,
+)
+
+
+def make_message(to="a@x.io", subject="Verify", html="<p>hi</p>"):
+    return EmailMessage(to=to, subject=subject, html=html)
+
+
+class TestMailer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend()
+        self.mailer = Mailer(self.backend, max_concurrency=2, batch_window=0.01)
+
+    async def asyncTearDown(self):
+        await self.mailer.shutdown()
+
+    async def test_send_delivers_message(self):
+        await self.mailer.send(make_message())
+        self.assertEqual(self.backend.outbox, [make_message()])
+
+    async def test_concurrent_sends_are_batched(self):
+        messages = [make_message(to=f"user{i}@x.io") for i in range(5)]
+        await asyncio.gather(*(self.mailer.send(message) for message in messages))
+        self.assertEqual(self.backend.outbox, messages)
+        self.assertEqual(self.backend.batches, 1)
+
+    async def test_full_batch_is_sent_without_waiting(self):
+        self.backend.max_batch_size = 2
+        self.mailer.batch_window = 60
+        messages = [make_message(to=f"user{i}@x.io") for i in range(2)]
+        await asyncio.wait_for(
+            asyncio.gather(*(self.mailer.send(message) for message in messages)), 1
+        )
+        self.assertEqual(self.backend.outbox, messages)
+
+    async def test_transient_errors_are_retried(self):
+        backend = MagicMock(max_batch_size=10)
+        backend.send_batch.side_effect = [[ConnectionError("reset")], [None]]
+        mailer = Mailer(
+            backend, max_concurrency=1, batch_window=0, retries=1, backoff=0
+        )
+        await mailer.send(make_message())
+        await mailer.shutdown()
+        self.assertEqual(backend.send_batch.call_count, 2)
+
+    async def test_only_failed_messages_are_retried(self):
+        backend = MagicMock(max_batch_size=10)
+        backend.send_batch.side_effect = [[None, ConnectionError("reset")], [None]]
+        mailer = Mailer(
+            backend, max_concurrency=1, batch_window=0, retries=1, backoff=0
+        )
+        first, second = make_message(to="a@x.io"), make_message(to="b@x.io")
+        await asyncio.gather(mailer.send(first), mailer.send(second))
+        await mailer.shutdown()
+        self.assertEqual(backend.send_batch.call_args.args[0], [second])
+
+    async def test_permanent_errors_are_raised(self):
+        backend = MagicMock(max_batch_size=10)
+        error = BadRequestsError(400, "Bad Request", b"", {})
+        backend.send_batch.return_value = [error]
+        mailer = Mailer(
+            backend, max_concurrency=1, batch_window=0, retries=2, backoff=0
+        )
+        with self.assertRaises(BadRequestsError):
+            await mailer.send(make_message())
+        await mailer.shutdown()
+        backend.send_batch.assert_called_once()
+
+    async def test_shutdown_sends_pending_messages(self):
+        self.mailer.batch_window = 60
+        sending = asyncio.create_task(self.mailer.send(make_message()))
+        await asyncio.sleep(0)
+        await self.mailer.shutdown()
+        self.assertTrue(sending.done())
+        self.assertEqual(self.backend.outbox, [make_message()])
+
+    async def test_timed_out_batch_is_not_retried(self):
+        release = threading.Event()
+        backend = MagicMock(max_batch_size=10)
+        backend.send_batch.side_effect = lambda messages: release.wait() and [None]
+        mailer = Mailer(
+            backend,
+            max_concurrency=1,
+            batch_window=0,
+            timeout=0.01,
+            retries=2,
+            backoff=0,
+        )
+        with self.assertRaises(TimeoutError):
+            await mailer.send(make_message())
+        release.set()
+        await mailer.shutdown()
+        backend.send_batch.assert_called_once()
+
+    async def test_backend_exception_fails_the_batch(self):
+        backend = MagicMock(max_batch_size=10)
+        backend.send_batch.side_effect = ValueError("boom")
+        mailer = Mailer(backend, max_concurrency=1, batch_window=0)
+        results = await asyncio.gather(
+            mailer.send(make_message(to="a@x.io")),
+            mailer.send(make_message(to="b@x.io")),
+            return_exceptions=True,
+        )
+        await mailer.shutdown()
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+class TestSendGridBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = SendGridBackend("key", "noreply@x.io")
+        self.backend.client = MagicMock()
+
+    def test_same_content_is_sent_in_one_request(self):
+        messages = [make_message(to="a@x.io"), make_message(to="b@x.io")]
+        errors = self.backend.send_batch(messages)
+        self.assertEqual(errors, [None, None])
+        self.backend.client.send.assert_called_once()
+        mail = self.backend.client.send.call_args.args[0].get()
+        recipients = [p["to"][0]["email"] for p in mail["personalizations"]]
+        self.assertCountEqual(recipients, ["a@x.io", "b@x.io"])
+        self.assertEqual(mail["from"]["email"], "noreply@x.io")
+
+    def test_different_content_is_sent_separately(self):
+        messages = [make_message(html="<p>1</p>"), make_message(html="<p>2</p>")]
+        self.backend.send_batch(messages)
+        self.assertEqual(self.backend.client.send.call_count, 2)
+
+    def test_errors_are_reported_per_message(self):
+        error = ConnectionError("reset")
+        self.backend.client.send.side_effect = [None, error]
+        messages = [make_message(html="<p>1</p>"), make_message(html="<p>2</p>")]
+        self.assertEqual(self.backend.send_batch(messages), [None, error])
+
+
+class TestSMTPBackend(unittest.TestCase):
+
+    @patch("src.utils.mailer.smtplib.SMTP")
+    def test_batch_is_sent_over_one_connection(self, smtp_class):
+        smtp = smtp_class.return_value
+        smtp.send_message.side_effect = [
+            None,
+            smtplib.SMTPRecipientsRefused({"b@x.io": (550, b"no")}),
+        ]
+        backend = SMTPBackend("localhost", 1025, "noreply@x.io")
+        errors = backend.send_batch(
+            [make_message(to="a@x.io"), make_message(to="b@x.io")]
+        )
+        smtp_class.assert_called_once_with("localhost", 1025, timeout=30)
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], smtplib.SMTPRecipientsRefused)
+        sent = smtp.send_message.call_args_list[0].args[0]
+        self.assertEqual(sent["To"], "a@x.io")
+        self.assertEqual(sent["From"], "noreply@x.io")
+        self.assertEqual(sent.get_content_type(), "text/html")
+        smtp.quit.assert_called_once()
+
+    @patch("src.utils.mailer.smtplib.SMTP")
+    def test_disconnect_fails_the_remaining_messages(self, smtp_class):
+        smtp = smtp_class.return_value
+        error = smtplib.SMTPServerDisconnected("gone")
+        smtp.send_message.side_effect = [None, error]
+        backend = SMTPBackend("localhost", 1025, "noreply@x.io")
+        errors = backend.send_batch(
+            [make_message(to=f"user{i}@x.io") for i in range(3)]
+        )
+        self.assertEqual(errors, [None, error, error])
+        self.assertEqual(smtp.send_message.call_count, 2)
+        smtp.close.assert_called_once()
+
+    @patch("src.utils.mailer.smtplib.SMTP")
+    def test_connection_failure_fails_the_batch(self, smtp_class):
+        error = ConnectionRefusedError("refused")
+        smtp_class.side_effect = error
+        backend = SMTPBackend("localhost", 1025, "noreply@x.io")
+        self.assertEqual(backend.send_batch([make_message()] * 2), [error, error])
+
+
+if __name__ == "__main__":
+    unittest.main()
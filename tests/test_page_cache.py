@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+
+from src.utils.http import content_etag
+from src.web.cache import cached_page, invalidate_pages, page_cache
+
+
+class TestCachedPage(unittest.TestCase):
+
+    def setUp(self):
+        page_cache.clear()
+        self.renders = 0
+        app = FastAPI()
+
+        @app.get("/page/{name}")
+        @cached_page
+        async def page(request: Request, name: str, sort: str = "new"):
+            self.renders += 1
+            if name == "missing":
+                raise HTTPException(status_code=404)
+            if name == "forbidden":
+                return HTMLResponse("<h3>no</h3>", status_code=403)
+            return HTMLResponse(f"<h1>{name} {sort} {self.renders}</h1>")
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        page_cache.clear()
+
+    def test_anonymous_page_is_rendered_once(self):
+        first = self.client.get("/page/home")
+        second = self.client.get("/page/home")
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(first.text, second.text)
+        self.assertEqual(first.headers["etag"], content_etag(first.content))
+        self.assertEqual(first.headers["vary"], "Cookie")
+        self.assertTrue(first.headers["content-type"].startswith("text/html"))
+
+    def test_query_string_is_part_of_key(self):
+        self.client.get("/page/home", params={"sort": "new"})
+        self.client.get("/page/home", params={"sort": "old"})
+        self.assertEqual(self.renders, 2)
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get("/page/home").headers["etag"]
+        response = self.client.get("/page/home", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_stale_etag_gets_page(self):
+        self.client.get("/page/home")
+        response = self.client.get("/page/home", headers={"If-None-Match": '"old"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_logged_in_visitor_is_not_cached(self):
+        self.client.cookies.set("access_token", "token")
+        self.client.get("/page/home")
+        response = self.client.get("/page/home")
+        self.assertEqual(self.renders, 2)
+        self.assertNotIn("etag", response.headers)
+        self.assertEqual(len(page_cache), 0)
+
+    def test_errors_are_not_cached(self):
+        self.assertEqual(self.client.get("/page/missing").status_code, 404)
+        self.assertEqual(self.client.get("/page/forbidden").status_code, 403)
+        self.client.get("/page/forbidden")
+        self.assertEqual(self.renders, 3)
+        self.assertEqual(len(page_cache), 0)
+
+    def test_invalidate_pages_renders_again(self):
+        self.client.get("/page/home")
+        invalidate_pages()
+        response = self.client.get("/page/home")
+        self.assertEqual(self.renders, 2)
+        self.assertIn("2", response.text)
+
+    @patch("src.web.cache.settings.page_cache_ttl_seconds", 0)
+    def test_disabled_cache_renders_every_time(self):
+        self.client.get("/page/home")
+        self.client.get("/page/home")
+        self.assertEqual(self.renders, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
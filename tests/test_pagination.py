@@ -0,0 +1,136 @@
+import unittest
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config.db import Base
+from src.models.models import Photo
+from src.utils.pagination import (
+    Cursor,
+    decode_cursor,
+    encode_cursor,
+    paginate_keyset,
+)
+
+# Photos 3-5 share a timestamp, so their order comes from the id alone.
+CREATED_AT = {
+    1: datetime(2024, 1, 1),
+    2: datetime(2024, 1, 1),
+    3: datetime(2024, 1, 2),
+    4: datetime(2024, 1, 2),
+    5: datetime(2024, 1, 2),
+    6: datetime(2024, 1, 3),
+    7: datetime(2024, 1, 4),
+}
+
+
+class TestCursor(unittest.TestCase):
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 5, 17, 12, 30, 15, 123456)
+        cursor = encode_cursor(created_at, 42, "next")
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), Cursor(created_at, 42, "next"))
+
+    def test_invalid_cursor(self):
+        bad_direction = encode_cursor(datetime(2024, 1, 1), 1, "sideways")
+        for cursor in ("not-a-cursor", "", bad_direction):
+            with self.assertRaises(HTTPException) as context:
+                decode_cursor(cursor)
+            self.assertEqual(context.exception.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestPaginateKeyset(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )()
+        self.session.add_all(
+            Photo(id=id, url_link=f"{id}.jpg", owner_id=1, created_at=created_at)
+            for id, created_at in CREATED_AT.items()
+        )
+        await self.session.commit()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def page(self, cursor=None, limit=3):
+        return await paginate_keyset(self.session, select(Photo), Photo, cursor, limit)
+
+    def ids(self, page):
+        return [photo.id for photo in page.items]
+
+    async def test_pages_forward_newest_first(self):
+        first = await self.page()
+        self.assertEqual(self.ids(first), [7, 6, 5])
+        self.assertIsNone(first.prev_cursor)
+        self.assertEqual(
+            decode_cursor(first.next_cursor), Cursor(CREATED_AT[5], 5, "next")
+        )
+
+        second = await self.page(first.next_cursor)
+        self.assertEqual(self.ids(second), [4, 3, 2])
+        self.assertEqual(
+            decode_cursor(second.prev_cursor), Cursor(CREATED_AT[4], 4, "prev")
+        )
+
+        last = await self.page(second.next_cursor)
+        self.assertEqual(self.ids(last), [1])
+        self.assertIsNone(last.next_cursor)
+        self.assertIsNotNone(last.prev_cursor)
+
+    async def test_pages_backward(self):
+        first = await self.page()
+        second = await self.page(first.next_cursor)
+        last = await self.page(second.next_cursor)
+
+        back = await self.page(last.prev_cursor)
+        self.assertEqual(self.ids(back), [4, 3, 2])
+        self.assertIsNotNone(back.next_cursor)
+        self.assertIsNotNone(back.prev_cursor)
+
+        start = await self.page(back.prev_cursor)
+        self.assertEqual(self.ids(start), [7, 6, 5])
+        self.assertIsNone(start.prev_cursor)
+        self.assertEqual(start.next_cursor, first.next_cursor)
+
+    async def test_ties_on_created_at_are_split_by_id(self):
+        seen = []
+        cursor = None
+        while True:
+            page = await self.page(cursor, limit=2)
+            seen.extend(self.ids(page))
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, [7, 6, 5, 4, 3, 2, 1])
+
+        # Starting inside the tie skips only the rows at or after the boundary.
+        cursor = encode_cursor(CREATED_AT[4], 4, "next")
+        self.assertEqual(self.ids(await self.page(cursor)), [3, 2, 1])
+        cursor = encode_cursor(CREATED_AT[4], 4, "prev")
+        self.assertEqual(self.ids(await self.page(cursor)), [7, 6, 5])
+
+    async def test_look_ahead_detects_last_page(self):
+        exact = await self.page(limit=7)
+        self.assertEqual(self.ids(exact), [7, 6, 5, 4, 3, 2, 1])
+        self.assertIsNone(exact.next_cursor)
+
+        one_short = await self.page(limit=6)
+        self.assertEqual(len(one_short.items), 6)
+        self.assertIsNotNone(one_short.next_cursor)
+        rest = await self.page(one_short.next_cursor, limit=6)
+        self.assertEqual(self.ids(rest), [1])
+        self.assertIsNone(rest.next_cursor)
+
+    async def test_empty_page(self):
+        page = await self.page(encode_cursor(CREATED_AT[1], 1, "next"))
+        self.assertEqual(page, ([], None, None))
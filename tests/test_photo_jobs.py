@@ -0,0 +1,60 @@
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from src.models.models import Photo
+from src.photos.jobs import create_photo_derivatives, delete_photo_files
+from src.photos.repos import photo_file_urls
+
+
+class TestPhotoJobs(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        repo_patcher = patch("src.photos.jobs.PhotoRepository")
+        storage_patcher = patch("src.photos.jobs.storage", new_callable=AsyncMock)
+        self.photo_repo = repo_patcher.start().return_value
+        self.storage = storage_patcher.start()
+        self.addCleanup(repo_patcher.stop)
+        self.addCleanup(storage_patcher.stop)
+        self.photo_repo.set_derivative_urls = AsyncMock()
+        self.photo_repo.get_file_urls_in_use = AsyncMock(return_value=set())
+
+    @patch("src.photos.jobs.create_derivatives", new_callable=AsyncMock)
+    async def test_create_photo_derivatives(self, create_derivatives):
+        self.storage.download.side_effect = lambda url, file: file.write(b"image")
+
+        async def read_original(path, name):
+            self.assertEqual(Path(path).read_bytes(), b"image")
+            return {"thumbnail_url": "t.jpg"}
+
+        create_derivatives.side_effect = read_original
+
+        await create_photo_derivatives(3, "/media/user_photos/abc.jpg")
+
+        self.assertEqual(
+            self.storage.download.await_args.args[0], "/media/user_photos/abc.jpg"
+        )
+        path, name = create_derivatives.await_args.args
+        self.assertEqual(Path(path).suffix, ".jpg")
+        self.assertFalse(Path(path).exists())
+        self.assertEqual(name, "abc")
+        self.photo_repo.set_derivative_urls.assert_awaited_once_with(
+            3, {"thumbnail_url": "t.jpg"}
+        )
+
+    @patch("src.photos.jobs.create_derivatives", new_callable=AsyncMock)
+    async def test_no_derivatives(self, create_derivatives):
+        create_derivatives.return_value = {}
+        await create_photo_derivatives(3, "/media/user_photos/abc.bin")
+        self.photo_repo.set_derivative_urls.assert_not_awaited()
+
+    async def test_delete_photo_files_keeps_shared_files(self):
+        self.photo_repo.get_file_urls_in_use.return_value = {"shared.jpg"}
+
+        await delete_photo_files(["shared.jpg", "qr.png"])
+
+        self.storage.delete.assert_awaited_once_with("qr.png")
+
+    def test_photo_file_urls(self):
+        photo = Photo(url_link="a.jpg", thumbnail_url="t.jpg", qr_core_url="q.png")
+        self.assertEqual(photo_file_urls(photo), ["a.jpg", "t.jpg", "q.png"])
@@ -0,0 +1,85 @@
+import io
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from config.db import get_db, get_read_db
+from main import app
+from src.auth.schemas import Principal, RoleEnum
+from src.auth.utils import get_current_user
+from src.photos.cache import qr_cache, transform_cache
+
+PHOTO_URL = "https://res.cloudinary.com/demo/image/upload/v1/user_photos/a.jpg"
+
+
+class TestPhotoQrCode(unittest.TestCase):
+
+    def setUp(self):
+        app.dependency_overrides[get_db] = lambda: AsyncMock()
+        app.dependency_overrides[get_read_db] = lambda: AsyncMock()
+        app.dependency_overrides[get_current_user] = lambda: Principal(
+            id=1,
+            username="alice",
+            email="alice@example.com",
+            role_name=RoleEnum.USER.value,
+            is_active=True,
+            is_banned=False,
+        )
+        patcher = patch(
+            "src.photos.repos.PhotoRepository.get_photo_url",
+            new_callable=AsyncMock,
+            return_value=PHOTO_URL,
+        )
+        self.get_photo_url = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+        transform_cache.clear()
+        qr_cache.clear()
+
+    def test_png(self):
+        response = self.client.get("/photos/1/qr", params={"size": 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertIn("max-age", response.headers["cache-control"])
+        image = Image.open(io.BytesIO(response.content))
+        self.assertLessEqual(image.width, 200)
+        self.assertGreater(image.width, 150)
+
+        again = self.client.get("/photos/1/qr", params={"size": 200})
+        self.assertEqual(again.content, response.content)
+        self.assertEqual(again.headers["etag"], response.headers["etag"])
+        self.get_photo_url.assert_awaited_once_with(1)
+
+    def test_not_modified(self):
+        etag = self.client.get("/photos/1/qr").headers["etag"]
+        response = self.client.get("/photos/1/qr", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_svg(self):
+        response = self.client.get("/photos/1/qr", params={"format": "svg"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/svg+xml")
+        self.assertIn(b"<svg", response.content)
+
+    def test_encodes_transformed_url(self):
+        plain = self.client.get("/photos/1/qr").headers["etag"]
+        transformed = self.client.get("/photos/1/qr", params={"width": 100})
+        self.assertEqual(transformed.status_code, 200)
+        self.assertNotEqual(transformed.headers["etag"], plain)
+
+    def test_rejects_oversize_transformation(self):
+        for params in ({"width": 100000, "height": 100000}, {"width": 0}):
+            response = self.client.get("/photos/1/qr", params=params)
+            self.assertEqual(response.status_code, 422)
+        self.get_photo_url.assert_not_awaited()
+
+    def test_missing_photo(self):
+        self.get_photo_url.return_value = None
+        self.assertEqual(self.client.get("/photos/2/qr").status_code, 404)
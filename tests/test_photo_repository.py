@@ -2,8 +2,10 @@ import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from src.photos.repos import PhotoRepository, Photo, User
-from sqlalchemy.exc import SQLAlchemyError
+from src.photos.repos import PhotoRepository, PhotoRatingRepository, Photo, User
+from src.models.models import PhotoRating
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 
 class TestPhotoRepository(unittest.IsolatedAsyncioTestCase):
@@ -22,7 +24,9 @@ class TestPhotoRepository(unittest.IsolatedAsyncioTestCase):
             user_id=1,
         )
         self.assertEqual(updated_photo.description, "New description")
-        self.mock_session.commit.assert_called_once()
+        self.mock_session.flush.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
+        self.mock_session.refresh.assert_not_called()
 
     async def test_get_photo_by_id(self):
         mock_photo = MagicMock(spec=Photo)
@@ -70,3 +74,72 @@ class TestPhotoRepository(unittest.IsolatedAsyncioTestCase):
             await self.photo_repo.create_photo(
                 "http://example.com", "test", User(id=1), []
             )
+
+    async def test_add_tags(self):
+        with patch(
+            "src.photos.repos.TagRepository.upsert_tags", return_value=[1, 2]
+        ) as mock_upsert, patch(
+            "src.photos.repos.TagRepository.adjust_photo_counts"
+        ) as mock_adjust:
+            linked = MagicMock()
+            linked.scalars.return_value.all.return_value = [1, 2]
+            self.mock_session.execute.return_value = linked
+
+            tag_ids = await self.photo_repo.add_tags(7, [" cats ", "dogs", " "])
+
+        self.assertEqual(tag_ids, [1, 2])
+        mock_upsert.assert_awaited_once_with(["cats", "dogs"])
+        self.mock_session.execute.assert_awaited_once()
+        mock_adjust.assert_awaited_once_with([1, 2], 1)
+        self.mock_session.commit.assert_not_called()
+
+
+class TestPhotoRatingRepository(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.mock_session = AsyncMock(spec=AsyncSession)
+        self.rating_repo = PhotoRatingRepository(session=self.mock_session)
+
+    async def test_add_and_update_rating(self):
+        self.mock_session.scalar.return_value = None
+
+        await self.rating_repo.add_and_update_rating(photo_id=1, user_id=2, rating=4)
+
+        self.mock_session.add.assert_called_once()
+        update_stmt = self.mock_session.execute.await_args.args[0]
+        self.assertIn("rating_sum=(photos.rating_sum +", str(update_stmt))
+        self.assertIn("rating_count=(photos.rating_count +", str(update_stmt))
+        self.mock_session.execute.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
+
+    async def test_add_existing_rating(self):
+        self.mock_session.scalar.return_value = 1
+
+        with self.assertRaises(HTTPException):
+            await self.rating_repo.add_and_update_rating(1, 2, 4)
+
+        self.mock_session.add.assert_not_called()
+        self.mock_session.commit.assert_not_called()
+
+    async def test_concurrent_duplicate_rating(self):
+        self.mock_session.scalar.return_value = None
+        self.mock_session.flush.side_effect = IntegrityError("INSERT", {}, Exception())
+
+        with self.assertRaises(HTTPException) as context:
+            await self.rating_repo.add_and_update_rating(1, 2, 4)
+
+        self.assertEqual(context.exception.status_code, 400)
+        self.mock_session.execute.assert_not_called()
+
+    async def test_delete_rating(self):
+        rating = PhotoRating(photo_id=1, user_id=2, rating=4)
+        self.mock_session.scalar.return_value = rating
+
+        await self.rating_repo.delete_rating(photo_id=1, user_id=2)
+
+        self.mock_session.delete.assert_awaited_once_with(rating)
+        update_stmt = self.mock_session.execute.await_args.args[0]
+        params = update_stmt.compile().params
+        self.assertEqual(params["rating_sum_1"], -4)
+        self.assertEqual(params["rating_count_1"], -1)
+        self.mock_session.execute.assert_awaited_once()
+        self.mock_session.commit.assert_not_called()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from src.photos.qr_codes import backfill_qr_codes, create_qr_code
+
+
+class TestQrCodes(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        repo_patcher = patch("src.photos.qr_codes.PhotoRepository")
+        generate_patcher = patch(
+            "src.photos.qr_codes.generate_qr_code", new_callable=AsyncMock
+        )
+        self.photo_repo = repo_patcher.start().return_value
+        self.generate_qr_code = generate_patcher.start()
+        self.addCleanup(repo_patcher.stop)
+        self.addCleanup(generate_patcher.stop)
+        self.generate_qr_code.side_effect = lambda url: f"qr:{url}"
+        self.photo_repo.set_qr_code_urls = AsyncMock()
+
+    async def test_create_qr_code(self):
+        await create_qr_code(1, "a.jpg")
+        self.generate_qr_code.assert_awaited_once_with("a.jpg")
+        self.photo_repo.set_qr_code_urls.assert_awaited_once_with({1: "qr:a.jpg"})
+
+    async def test_backfill(self):
+        self.photo_repo.get_photos_without_qr_code = AsyncMock(
+            side_effect=[[(1, "a.jpg"), (2, "b.jpg")], [(5, "c.jpg")], []]
+        )
+
+        def generate(url):
+            if url == "b.jpg":
+                raise ConnectionError("down")
+            return f"qr:{url}"
+
+        self.generate_qr_code.side_effect = generate
+
+        with self.assertLogs("src.photos.qr_codes", level="WARNING"):
+            filled = await backfill_qr_codes(concurrency=2, batch_size=2)
+
+        self.assertEqual(filled, 2)
+        self.assertEqual(
+            [
+                call.args
+                for call in self.photo_repo.get_photos_without_qr_code.await_args_list
+            ],
+            [(0, 2), (2, 2), (5, 2)],
+        )
+        self.assertEqual(
+            [call.args[0] for call in self.photo_repo.set_qr_code_urls.await_args_list],
+            [{1: "qr:a.jpg"}, {5: "qr:c.jpg"}],
+        )
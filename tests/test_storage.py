@@ -0,0 +1,144 @@
+import io
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+
+from PIL import Image
+
+from src.utils.storage import CloudinaryStorage, LocalStorage
+
+
+def make_image(size=(40, 20), image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (255, 0, 0)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class TestLocalStorage(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.media_root.name, "/media/")
+
+    def tearDown(self):
+        self.media_root.cleanup()
+
+    async def test_put_get_delete(self):
+        content = make_image()
+        url = await self.storage.put(io.BytesIO(content), folder="user_photos")
+        self.assertTrue(url.startswith("/media/user_photos/"))
+        self.assertTrue(url.endswith(".png"))
+        self.assertEqual(await self.storage.get(url), content)
+        copy = io.BytesIO()
+        await self.storage.download(url, copy)
+        self.assertEqual(copy.getvalue(), content)
+
+        await self.storage.delete(url)
+        with self.assertRaises(FileNotFoundError):
+            await self.storage.get(url)
+        await self.storage.delete(url)
+
+    async def test_put_named(self):
+        url = await self.storage.put(make_image(), folder="avatars", name="alice")
+        self.assertEqual(url, "/media/avatars/alice.png")
+        kept = await self.storage.put(
+            make_image((10, 10)), folder="avatars", name="alice"
+        )
+        self.assertEqual(kept, url)
+        self.assertEqual(await self.storage.get(url), make_image())
+
+        replaced = await self.storage.put(
+            make_image((10, 10)), folder="avatars", name="alice", overwrite=True
+        )
+        self.assertEqual(replaced, url)
+        self.assertEqual(await self.storage.get(url), make_image((10, 10)))
+
+    async def test_put_rejects_traversing_paths(self):
+        for folder, name in (
+            ("avatars", "../../escaped"),
+            ("avatars", "page.html"),
+            ("../escaped", "a"),
+            ("/tmp", "a"),
+        ):
+            with self.assertRaises(ValueError):
+                await self.storage.put(
+                    make_image(), folder=folder, name=name, overwrite=True
+                )
+        self.assertEqual(list(self.storage.root.iterdir()), [])
+
+    async def test_put_nested_folder(self):
+        url = await self.storage.put(make_image(), folder="derivatives/thumbnail")
+        self.assertTrue(url.startswith("/media/derivatives/thumbnail/"))
+
+    async def test_transform(self):
+        url = await self.storage.put(make_image(image_format="JPEG"), folder="p")
+        transformed = await self.storage.transform(
+            url, width=10, height=10, crop="fill", effect="grayscale"
+        )
+        self.assertTrue(transformed.startswith("/media/transformed/"))
+        image = Image.open(io.BytesIO(await self.storage.get(transformed)))
+        self.assertEqual(image.size, (10, 10))
+        self.assertEqual(image.mode, "L")
+        self.assertEqual(
+            await self.storage.transform(
+                url, crop="fill", width=10, height=10, effect="grayscale"
+            ),
+            transformed,
+        )
+
+    async def test_transform_rejects_unsupported_effect(self):
+        url = await self.storage.put(make_image(), folder="p")
+        with self.assertRaises(ValueError):
+            await self.storage.transform(url, effect="cartoonify")
+
+    async def test_transform_rejects_oversize_dimensions(self):
+        storage = LocalStorage(self.media_root.name, "/media/", max_dimension=100)
+        url = await storage.put(make_image(), folder="p")
+        for transformation in ({"width": 101}, {"height": 100000}, {"width": 0}):
+            with self.assertRaises(ValueError):
+                await storage.transform(url, **transformation)
+        self.assertFalse((storage.root / "transformed").exists())
+
+    async def test_rejects_foreign_urls(self):
+        for url in ("https://example.com/a.png", "/media/../secret"):
+            with self.assertRaises(ValueError):
+                await self.storage.get(url)
+
+
+class TestCloudinaryStorage(unittest.IsolatedAsyncioTestCase):
+
+    async def test_put_options(self):
+        client = AsyncMock()
+        client.upload.return_value = {"secure_url": "https://cloudinary.com/a.jpg"}
+        storage = CloudinaryStorage(client)
+
+        self.assertEqual(
+            await storage.put(b"image", folder="user_photos"),
+            "https://cloudinary.com/a.jpg",
+        )
+        client.upload.assert_awaited_with(b"image", folder="user_photos")
+
+        await storage.put(b"image", folder="avatars", name="alice", overwrite=True)
+        client.upload.assert_awaited_with(
+            b"image", public_id="avatars/alice", overwrite=True
+        )
+
+    async def test_transform(self):
+        storage = CloudinaryStorage(AsyncMock())
+        url = await storage.transform(
+            "https://res.cloudinary.com/demo/image/upload/v12/avatars/alice.jpg",
+            width=250,
+            height=250,
+            crop="fill",
+        )
+        self.assertIn("/image/upload/c_fill,h_250,w_250/v12/avatars/alice", url)
+        with self.assertRaises(ValueError):
+            await storage.transform("https://example.com/alice.jpg", width=10)
+
+    async def test_delete(self):
+        client = AsyncMock()
+        storage = CloudinaryStorage(client)
+        await storage.delete(
+            "https://res.cloudinary.com/demo/image/upload/v12/avatars/alice.jpg"
+        )
+        client.destroy.assert_awaited_once_with("avatars/alice")
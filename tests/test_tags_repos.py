@@ -23,8 +23,9 @@ class TestTagRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(new_tag.id, None)
 
         mock_db.add(new_tag)
-        mock_db.commit.assert_called_once_with()
-        mock_db.refresh.assert_called_once_with(new_tag)
+        mock_db.flush.assert_called_once_with()
+        mock_db.commit.assert_not_called()
+        mock_db.refresh.assert_not_called()
 
     async def test_create_tag_when_tag_exists(self):
         mock_db = AsyncMock(AsyncSession)
@@ -102,6 +103,22 @@ class TestTagRepository(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(existing_tags, [mock_existing_tag, mock_existing_tag2])
 
+    async def test_get_all_tags_as_rows(self):
+        mock_db = AsyncMock(AsyncSession)
+        mock_result = Mock()
+        mock_result.all.return_value = [(1, "cats", 3)]
+        mock_db.execute.return_value = mock_result
+
+        tags = await TagRepository(mock_db).get_all_tags(rows=True)
+
+        self.assertEqual(tags, [(1, "cats", 3)])
+        mock_result.scalars.assert_not_called()
+        query = mock_db.execute.await_args.args[0]
+        self.assertEqual(
+            [column.name for column in query.selected_columns],
+            ["id", "name", "photo_count"],
+        )
+
     async def test_delete_tag_by_name_when_tag_exist(self):
         mock_db = AsyncMock(AsyncSession)
 
@@ -116,7 +133,8 @@ class TestTagRepository(unittest.IsolatedAsyncioTestCase):
         await tag_repo.delete_tag_by_name(mock_existing_tag.name)
 
         mock_db.delete.assert_called_once_with(mock_existing_tag)
-        mock_db.commit.assert_called_once()
+        mock_db.flush.assert_called_once()
+        mock_db.commit.assert_not_called()
 
     async def test_delete_tag_by_name_when_tag_does_not_exist(self):
         mock_db = AsyncMock(AsyncSession)
@@ -156,8 +174,9 @@ class TestTagRepository(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(updated_tag.name, "existing_tag2")
         self.assertEqual(updated_tag.id, 1)
 
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_existing_tag)
+        mock_db.flush.assert_called_once()
+        mock_db.commit.assert_not_called()
+        mock_db.refresh.assert_not_called()
 
     async def test_update_tag_name_when_tag_does_not_exist(self):
         mock_db = AsyncMock(AsyncSession)
@@ -210,6 +229,63 @@ class TestTagRepository(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(photos, [mock_existing_photo1, mock_existing_photo2])
 
+    async def test_get_popular_tags(self):
+        mock_db = AsyncMock(AsyncSession)
+        popular = [Tag(id=2, name="cats", photo_count=7), Tag(id=1, name="dogs")]
+
+        mock_result = Mock()
+        mock_result.scalars.return_value.all.return_value = popular
+        mock_db.execute.return_value = mock_result
+
+        tag_repo = TagRepository(mock_db)
+        tags = await tag_repo.get_popular_tags(2)
+
+        self.assertEqual(tags, popular)
+        query = str(mock_db.execute.call_args.args[0])
+        self.assertIn("ORDER BY tags.photo_count DESC", query)
+        self.assertIn("LIMIT", query)
+
+    async def test_adjust_photo_counts(self):
+        mock_db = AsyncMock(AsyncSession)
+        tag_repo = TagRepository(mock_db)
+
+        await tag_repo.adjust_photo_counts([1, 2], -1)
+
+        statement = mock_db.execute.call_args.args[0]
+        self.assertIn("SET photo_count=(tags.photo_count", str(statement))
+        mock_db.commit.assert_not_called()
+
+    async def test_adjust_photo_counts_without_tags(self):
+        mock_db = AsyncMock(AsyncSession)
+        tag_repo = TagRepository(mock_db)
+
+        await tag_repo.adjust_photo_counts([], 1)
+
+        mock_db.execute.assert_not_called()
+
+    async def test_upsert_tags(self):
+        mock_db = AsyncMock(AsyncSession)
+
+        mock_ids = Mock()
+        mock_ids.all.return_value = [("dogs", 2), ("cats", 1)]
+        mock_db.execute.side_effect = [Mock(), mock_ids]
+
+        tag_repo = TagRepository(mock_db)
+        tag_ids = await tag_repo.upsert_tags(["cats", "dogs", "cats"])
+
+        self.assertEqual(tag_ids, [1, 2])
+        self.assertEqual(mock_db.execute.await_count, 2)
+        upsert = str(mock_db.execute.await_args_list[0].args[0])
+        self.assertIn("ON CONFLICT (name) DO NOTHING", upsert)
+        mock_db.commit.assert_not_called()
+
+    async def test_upsert_no_tags(self):
+        mock_db = AsyncMock(AsyncSession)
+        tag_repo = TagRepository(mock_db)
+
+        self.assertEqual(await tag_repo.upsert_tags([]), [])
+        mock_db.execute.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
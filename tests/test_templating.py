@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from jinja2 import TemplateSyntaxError
+
+from src.utils.templating import (
+    TEMPLATE_DIRS,
+    create_template_env,
+    truncatechars,
+    warm_templates,
+)
+
+
+class TestTemplateEnv(unittest.TestCase):
+
+    def setUp(self):
+        self.template_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.template_dir.name)
+
+    def tearDown(self):
+        self.template_dir.cleanup()
+        self.cache_dir.cleanup()
+
+    def write(self, name, source):
+        (self.path / name).write_text(source)
+
+    def test_warm_templates_compiles_all_templates(self):
+        self.write("a.html", "{{ name }}")
+        self.write("b.html", "{{ name | truncatechars(2) }}")
+        env = create_template_env([self.path], cache_dir=self.cache_dir.name)
+        self.assertEqual(warm_templates(env), 2)
+        self.assertEqual(len(env.cache), 2)
+        self.assertTrue(any(Path(self.cache_dir.name).iterdir()))
+
+    def test_warm_templates_fails_on_syntax_error(self):
+        self.write("broken.html", "{% if name %}")
+        env = create_template_env([self.path], cache_dir=self.cache_dir.name)
+        with self.assertRaises(TemplateSyntaxError):
+            warm_templates(env)
+
+    def test_templates_are_not_reloaded_by_default(self):
+        self.write("a.html", "old")
+        env = create_template_env([self.path], cache_dir=self.cache_dir.name)
+        self.assertEqual(env.get_template("a.html").render(), "old")
+        self.write("a.html", "new")
+        self.assertEqual(env.get_template("a.html").render(), "old")
+
+    def test_auto_reload_picks_up_changes(self):
+        self.write("a.html", "old")
+        env = create_template_env(
+            [self.path], auto_reload=True, cache_dir=self.cache_dir.name
+        )
+        env.get_template("a.html")
+        self.write("a.html", "a newer template")
+        self.assertEqual(env.get_template("a.html").render(), "a newer template")
+
+    def test_html_is_autoescaped(self):
+        self.write("a.html", "{{ name }}")
+        env = create_template_env([self.path], cache_dir=self.cache_dir.name)
+        self.assertEqual(env.get_template("a.html").render(name="<b>"), "&lt;b&gt;")
+
+    def test_app_templates_compile(self):
+        env = create_template_env(TEMPLATE_DIRS, cache_dir=self.cache_dir.name)
+        self.assertGreater(warm_templates(env), 0)
+        env.get_template("email.html")
+        env.get_template("index.html")
+
+
+class TestTruncatechars(unittest.TestCase):
+
+    def test_truncates_long_values(self):
+        self.assertEqual(truncatechars("abcdef", 3), "abc...")
+
+    def test_keeps_short_values(self):
+        self.assertEqual(truncatechars("abc", 3), "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
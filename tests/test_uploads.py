@@ -0,0 +1,74 @@
+import hashlib
+import unittest
+from io import BytesIO
+
+from fastapi import FastAPI, File, HTTPException, UploadFile, status
+from fastapi.testclient import TestClient
+
+from src.utils.uploads import UploadSizeLimitMiddleware, ingest_upload
+
+
+class TestIngestUpload(unittest.IsolatedAsyncioTestCase):
+
+    async def test_ingest_upload(self):
+        content = b"x" * 200_000
+        file = UploadFile(file=BytesIO(content), filename="a.jpg")
+        upload = await ingest_upload(file, max_size=len(content))
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+        self.assertIs(upload.file, file.file)
+        self.assertEqual(upload.file.read(), content)
+
+    async def test_ingest_upload_too_large(self):
+        file = UploadFile(file=BytesIO(b"x" * 101), filename="a.jpg")
+        with self.assertRaises(HTTPException) as context:
+            await ingest_upload(file, max_size=100)
+        self.assertEqual(
+            context.exception.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    async def test_ingest_upload_empty(self):
+        file = UploadFile(file=BytesIO(b""), filename="a.jpg")
+        with self.assertRaises(HTTPException) as context:
+            await ingest_upload(file)
+        self.assertEqual(context.exception.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestUploadSizeLimitMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(UploadSizeLimitMiddleware, max_body_size=1000)
+
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            return {"size": len(await file.read())}
+
+        self.client = TestClient(app)
+
+    def test_small_body(self):
+        response = self.client.post("/upload", files={"file": ("a", b"x" * 100)})
+        self.assertEqual(response.json(), {"size": 100})
+
+    def test_content_length_too_large(self):
+        response = self.client.post("/upload", files={"file": ("a", b"x" * 2000)})
+        self.assertEqual(response.status_code, 413)
+
+    def test_invalid_content_length(self):
+        for content_length in ("abc", "-1"):
+            response = self.client.post(
+                "/upload", content=b"x", headers={"Content-Length": content_length}
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_streamed_body_too_large(self):
+        def chunks():
+            for _ in range(10):
+                yield b"x" * 200
+
+        response = self.client.post(
+            "/upload",
+            content=chunks(),
+            headers={"Content-Type": "multipart/form-data; boundary=x"},
+        )
+        self.assertEqual(response.status_code, 413)